@@ -45,9 +45,90 @@ app.config["MAIL_PASSWORD"] = os.environ.get("MAIL_PASSWORD")
 app.config["MAIL_DEFAULT_SENDER"] = app.config["MAIL_USERNAME"] or None
 app.config["MAIL_RECIENT"] = os.environ.get("MAIL_RECIPIENT")
 
+# --- Konfiguracja kolejki maili (flask mail-worker) ---
+app.config["MAIL_QUEUE_BATCH_SIZE"] = int(os.environ.get("MAIL_QUEUE_BATCH_SIZE", 50))
+app.config["MAIL_QUEUE_MAX_ATTEMPTS"] = int(os.environ.get("MAIL_QUEUE_MAX_ATTEMPTS", 5))
+app.config["MAIL_QUEUE_BACKOFF_SECONDS"] = int(
+    os.environ.get("MAIL_QUEUE_BACKOFF_SECONDS", 30)
+)
+# Po tym czasie wiadomość zarezerwowana przez niedziałający worker wraca do kolejki
+app.config["MAIL_QUEUE_LOCK_TIMEOUT"] = 600
+
 # --- Konfiguracja paginacji ---
 app.config["POSTS_PER_PAGE"] = 9
+app.config["USERS_PER_PAGE"] = 50
+app.config["ADMIN_ITEMS_PER_PAGE"] = 50
 app.config["IMAGES_PER_PAGE"] = 8
+app.config["SEARCH_RESULTS_PER_PAGE"] = 20
+
+# --- Konfiguracja cache fragmentów stron ---
+app.config["CACHE_ENABLED"] = os.environ.get("CACHE_ENABLED", "true").lower() in [
+    "true",
+    "on",
+    "1",
+]
+# "memory" (osobny cache w każdym workerze) lub "redis"
+app.config["CACHE_BACKEND"] = os.environ.get("CACHE_BACKEND", "memory")
+app.config["CACHE_REDIS_URL"] = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+app.config["CACHE_DEFAULT_TTL"] = int(os.environ.get("CACHE_DEFAULT_TTL", 300))
+app.config["CACHE_MAX_ENTRIES"] = 512
+
+# --- Konfiguracja cache HTTP (ETag / Last-Modified / 304) ---
+# Wyłączenie usuwa walidatory - strony zawsze są renderowane od nowa
+app.config["HTTP_CACHE_ENABLED"] = os.environ.get(
+    "HTTP_CACHE_ENABLED", "true"
+).lower() in ["true", "on", "1"]
+
+# --- Konfiguracja plików statycznych (flask assets-build) ---
+# Katalog z plikami z hashem w nazwie, wersjami .gz/.br i manifest.json
+app.config["ASSETS_FOLDER"] = os.environ.get("ASSETS_FOLDER") or os.path.join(
+    app.root_path, "static", "dist"
+)
+
+# --- Konfiguracja hashowania haseł ---
+# Format werkzeug; po zmianie hasła są przeliczane przy logowaniu
+app.config["PASSWORD_HASH_METHOD"] = os.environ.get(
+    "PASSWORD_HASH_METHOD", "scrypt:32768:8:1"
+)
+app.config["PASSWORD_SALT_LENGTH"] = int(os.environ.get("PASSWORD_SALT_LENGTH", 16))
+# Wątki liczące hashe w każdym workerze i liczba żądań czekających na wolny wątek
+app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+app.config["PASSWORD_HASH_QUEUE"] = int(os.environ.get("PASSWORD_HASH_QUEUE", 16))
+app.config["PASSWORD_HASH_TIMEOUT"] = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+
+# --- Konfiguracja filtra nazw użytkowników ---
+# Model ML (profanity_check) rozstrzyga tylko niejednoznaczne dopasowania listy słów
+app.config["PROFANITY_ML_FALLBACK"] = os.environ.get(
+    "PROFANITY_ML_FALLBACK", "true"
+).lower() in ["true", "on", "1"]
+
+# --- Konfiguracja przechowywania obrazów ---
+# Pliki używane (przesłane lub odświeżone) w tym czasie nie są usuwane,
+# nawet jeśli żaden rekord jeszcze się do nich nie odwołuje
+app.config["MEDIA_GC_GRACE_SECONDS"] = int(os.environ.get("MEDIA_GC_GRACE_SECONDS", 3600))
+# Przesłane pliki w pełnej rozdzielczości (z EXIF, w tym GPS) - poza static,
+# żeby nie było do nich adresu URL
+app.config["IMAGE_ORIGINALS_FOLDER"] = os.environ.get(
+    "IMAGE_ORIGINALS_FOLDER"
+) or os.path.join(app.instance_path, "post_pics_originals")
+
+# --- Konfiguracja metryk wydajności ---
+# Nagłówek Server-Timing (widoczny w narzędziach deweloperskich przeglądarki)
+app.config["SERVER_TIMING_ENABLED"] = os.environ.get(
+    "SERVER_TIMING_ENABLED", "true"
+).lower() in ["true", "on", "1"]
+# Jedna linia JSON w logu (poziom INFO) na każde żądanie
+app.config["REQUEST_LOG_ENABLED"] = os.environ.get(
+    "REQUEST_LOG_ENABLED", "true"
+).lower() in ["true", "on", "1"]
+# Bez tokenu /metrics jest dostępne tylko dla zalogowanych administratorów
+app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN")
+# Wykrywanie N+1 i wolnych zapytań (ostrzeżenia w logu i w /metrics)
+app.config["QUERY_AUDIT_ENABLED"] = os.environ.get(
+    "QUERY_AUDIT_ENABLED", "true"
+).lower() in ["true", "on", "1"]
+app.config["QUERY_REPEAT_THRESHOLD"] = int(os.environ.get("QUERY_REPEAT_THRESHOLD", 10))
+app.config["SLOW_QUERY_MS"] = int(os.environ.get("SLOW_QUERY_MS", 250))
 
 # --- Konfiguracja Języków ---
 app.config["LANGUAGES"] = {"pl": "Polski", "en": "English"}
@@ -76,7 +157,7 @@ app.jinja_env.globals["format_datetime"] = format_datetime
 
 # --- WAŻNE: Importy tras i modeli MUSZĄ BYĆ PONIŻEJ ---
 # To rozwiązuje problem cyklicznego importu
-from app import routes, models
+from app import routes, models, mail_queue, profanity, images, media, fixtures, metrics, search, http_cache, assets
 
 
 # --- Komenda CLI do ustawiania pierwszego admina ---
@@ -86,7 +167,9 @@ def init_admin_command():
     """Nadaje uprawnienia administratora użytkownikowi z ADMIN_EMAIL."""
     admin_email = os.environ.get("ADMIN_EMAIL")
     if admin_email:
-        user = models.User.query.filter_by(email=admin_email).first()
+        user = models.User.query.filter_by(
+            email_lower=models.normalize_identity(admin_email)
+        ).first()
         if user:
             if not user.is_admin:
                 user.is_admin = True
@@ -0,0 +1,169 @@
+# app/assets.py
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+import click
+from flask import request, send_from_directory, url_for
+
+from app import app
+
+# --- Pliki statyczne z odciskiem treści ---
+# `flask assets-build` kopiuje pliki z ASSET_DIRS do ASSETS_FOLDER pod nazwami
+# z hashem treści (css/main.css -> css/main.3f2a9c1e0b7d.css), zapisuje
+# manifest.json oraz wersje .gz i .br plików tekstowych. Szablony budują
+# adresy przez asset_url(), a /assets/ serwuje pliki z nagłówkiem
+# "immutable" - zmiana pliku zmienia jego nazwę, więc cache nie musi pytać
+# o aktualność. Bez manifestu (np. lokalnie) asset_url() zwraca zwykły
+# adres /static/.
+
+ASSET_DIRS = ("css", "js", "images")
+# Źródła (np. wejście Tailwinda) nie są publikowane
+SKIP_DIRS = ("css/src",)
+# Kompresujemy tylko pliki tekstowe - obrazy PNG/JPG są już skompresowane
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".map")
+# Od najlepszej: kodowanie -> rozszerzenie pliku
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+MANIFEST = "manifest.json"
+HASH_LENGTH = 12
+MAX_AGE = 365 * 24 * 3600
+
+_manifest = None
+
+
+def _brotli():
+    # Opcjonalna zależność - bez niej powstają tylko wersje .gz
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _fingerprinted(name, data):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def _source_files(source):
+    for directory in ASSET_DIRS:
+        for root, dirs, files in os.walk(os.path.join(source, directory)):
+            relative = os.path.relpath(root, source).replace(os.sep, "/")
+            dirs[:] = sorted(
+                name for name in dirs if f"{relative}/{name}" not in SKIP_DIRS
+            )
+            for name in sorted(files):
+                yield f"{relative}/{name}", os.path.join(root, name)
+
+
+def build_assets(source=None, output=None):
+    """Buduje ASSETS_FOLDER od nowa; zwraca manifest {nazwa: nazwa z hashem}."""
+    source = source or app.static_folder
+    output = output or app.config["ASSETS_FOLDER"]
+    brotli = _brotli()
+    shutil.rmtree(output, ignore_errors=True)
+    manifest = {}
+    for name, path in _source_files(source):
+        with open(path, "rb") as f:
+            data = f.read()
+        hashed = _fingerprinted(name, data)
+        target = os.path.join(output, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(data)
+        if name.endswith(COMPRESSIBLE):
+            variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants[".br"] = brotli.compress(data, quality=11)
+            for suffix, compressed in variants.items():
+                # Mały plik może po kompresji urosnąć
+                if len(compressed) < len(data):
+                    with open(target + suffix, "wb") as f:
+                        f.write(compressed)
+        manifest[name] = hashed
+    with open(os.path.join(output, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    _reset_manifest()
+    return manifest
+
+
+def _reset_manifest():
+    global _manifest
+    _manifest = None
+
+
+def manifest():
+    """Manifest z ASSETS_FOLDER (pusty, jeśli pliki nie zostały zbudowane).
+
+    Wczytywany raz; w trybie debug przy każdym użyciu, żeby działał
+    z `flask assets-build` uruchamianym w trakcie pracy.
+    """
+    global _manifest
+    if _manifest is None or app.debug:
+        path = os.path.join(app.config["ASSETS_FOLDER"], MANIFEST)
+        try:
+            with open(path, encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except FileNotFoundError:
+            _manifest = {}
+    return _manifest
+
+
+def manifest_version():
+    """Skrót manifestu - zmienia się, gdy zmieni się którykolwiek plik."""
+    return hashlib.sha1(
+        json.dumps(manifest(), sort_keys=True).encode("utf-8")
+    ).hexdigest()[:HASH_LENGTH]
+
+
+def asset_url(filename):
+    """Zamiennik url_for("static", ...) dla plików z ASSET_DIRS."""
+    hashed = manifest().get(filename)
+    if hashed is None:
+        return url_for("static", filename=filename)
+    return url_for("assets", filename=hashed)
+
+
+app.jinja_env.globals["asset_url"] = asset_url
+
+
+def _encoding_for(filename):
+    """Najlepsze kodowanie akceptowane przez klienta, dla którego jest plik."""
+    directory = app.config["ASSETS_FOLDER"]
+    for encoding, suffix in ENCODINGS:
+        if request.accept_encodings[encoding] and os.path.isfile(
+            os.path.join(directory, filename + suffix)
+        ):
+            return encoding, suffix
+    return None, ""
+
+
+@app.route("/assets/<path:filename>")
+def assets(filename):
+    encoding, suffix = _encoding_for(filename)
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response = send_from_directory(
+        app.config["ASSETS_FOLDER"],
+        filename + suffix,
+        mimetype=mimetype,
+        max_age=MAX_AGE,
+    )
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.immutable = True
+    return response
+
+
+# --- Komenda CLI ---
+@app.cli.command("assets-build")
+def assets_build_command():
+    """Buduje pliki statyczne z hashem w nazwie (uruchamiać po `npm run build`)."""
+    built = build_assets()
+    click.echo(f"Zapisano plików: {len(built)} w {app.config['ASSETS_FOLDER']}.")
+    if _brotli() is None:
+        click.echo("Brak pakietu brotli - pominięto wersje .br.")
@@ -0,0 +1,66 @@
+# app/bulk.py
+
+from datetime import timedelta
+
+from sqlalchemy import func, update
+
+from app import db
+from app.lifecycle import delete_rows
+from app.models import Post, Tournament
+
+# --- Operacje hurtowe panelu admina ---
+# Każda operacja to jedno zapytanie na tabelę (bez wczytywania rekordów),
+# commit wykonuje widok - cała operacja jest jedną transakcją.
+
+BULK_ACTIONS = ("delete", "archive", "unarchive", "shift")
+MAX_SHIFT_DAYS = 3650
+
+DATE_COLUMNS = {
+    Post: (Post.date_posted,),
+    Tournament: (Tournament.start_date, Tournament.end_date),
+}
+
+
+def shifted(column, days):
+    """Wyrażenie SQL: data przesunięta o `days` dni."""
+    if db.engine.dialect.name == "sqlite":
+        # SQLite przechowuje daty jako tekst; ułamki sekund przepisujemy bez
+        # zmian, żeby format zgadzał się z zapisywanym przez SQLAlchemy
+        return func.strftime("%Y-%m-%d %H:%M:%S", column, f"{days:+d} days").concat(
+            func.substr(column, 20)
+        )
+    return column + timedelta(days=days)
+
+
+def bulk_delete(model, ids):
+    counts = delete_rows(model, model.id.in_(ids), commit=False)
+    return counts.get(model.__tablename__, 0)
+
+
+def set_archived(model, ids, archived=True):
+    result = db.session.execute(
+        update(model).where(model.id.in_(ids)).values(archived=archived)
+    )
+    return result.rowcount
+
+
+def shift_dates(model, ids, days):
+    if not -MAX_SHIFT_DAYS <= days <= MAX_SHIFT_DAYS:
+        raise ValueError(f"Przesunięcie poza zakresem: {days} dni")
+    values = {column.key: shifted(column, days) for column in DATE_COLUMNS[model]}
+    result = db.session.execute(
+        update(model).where(model.id.in_(ids)).values(**values),
+        execution_options={"synchronize_session": "fetch"},
+    )
+    return result.rowcount
+
+
+def apply_bulk_action(model, action, ids, days=None):
+    """Wykonuje akcję z BULK_ACTIONS na rekordach `ids`; zwraca liczbę zmienionych."""
+    if action == "delete":
+        return bulk_delete(model, ids)
+    if action in ("archive", "unarchive"):
+        return set_archived(model, ids, action == "archive")
+    if action == "shift":
+        return shift_dates(model, ids, days)
+    raise ValueError(f"Nieznana akcja: {action}")
@@ -0,0 +1,251 @@
+# app/cache.py
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import render_template
+from markupsafe import Markup
+from sqlalchemy import event
+
+from app import app, db, get_locale
+
+
+# --- Backendy cache ---
+class LRUCache:
+    """Cache LRU z TTL w pamięci procesu.
+
+    Każdy worker gunicorna ma własną kopię, więc zmiany zrobione w innym
+    workerze są widoczne dopiero po upływie TTL. Przy wielu workerach
+    lepiej użyć RedisCache.
+    """
+
+    # Generacje regionów widzi tylko ten proces
+    shared = False
+
+    def __init__(self, max_entries=512, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def generation(self, region):
+        return self._generations.get(region, 0)
+
+    def bump(self, region):
+        with self._lock:
+            self._generations[region] = self._generations.get(region, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generations.clear()
+
+
+class RedisCache:
+    """Cache współdzielony przez workery (Redis lub zgodny serwer, np. Valkey)."""
+
+    shared = True
+
+    def __init__(self, url, default_ttl=300, prefix="ipba:fragment:"):
+        # Opcjonalna zależność - potrzebna tylko przy CACHE_BACKEND=redis
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self._client.get(self.prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self._client.set(self.prefix + key, value, ex=ttl or self.default_ttl)
+
+    def generation(self, region):
+        return int(self._client.get(self.prefix + "gen:" + region) or 0)
+
+    def bump(self, region):
+        self._client.incr(self.prefix + "gen:" + region)
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+
+# --- Cache fragmentów stron ---
+# Modele, których zmiana unieważnia dany region cache.
+INVALIDATION_RULES = {
+    "Post": ("index", "news", "post"),
+    "Tournament": ("index", "tournaments"),
+    "TournamentWinner": ("index", "tournaments"),
+}
+# Zmiana nazwy użytkownika jest widoczna przy postach i zwycięzcach
+USERNAME_REGIONS = ("index", "tournaments", "post")
+
+
+class FragmentCache:
+    """Przechowuje wyrenderowane fragmenty szablonów.
+
+    Klucz zawiera region, numer generacji regionu, język i dodatkowe części
+    (np. numer strony). Commit zmieniający model z INVALIDATION_RULES zwiększa
+    generację regionu, przez co stare wpisy przestają być używane.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.enabled = True
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config["CACHE_ENABLED"]
+        if app.config["CACHE_BACKEND"] == "redis":
+            self.backend = RedisCache(
+                app.config["CACHE_REDIS_URL"], default_ttl=app.config["CACHE_DEFAULT_TTL"]
+            )
+        else:
+            self.backend = LRUCache(
+                max_entries=app.config["CACHE_MAX_ENTRIES"],
+                default_ttl=app.config["CACHE_DEFAULT_TTL"],
+            )
+        _register_invalidation_hooks(self)
+
+    def render(self, region, template_name, context_factory, key=()):
+        """Zwraca fragment z cache albo renderuje go z `context_factory()`.
+
+        Zapytania do bazy powinny być wykonywane w `context_factory`, żeby przy
+        trafieniu w cache nie były wykonywane wcale.
+        """
+        if not self.enabled:
+            return Markup(render_template(template_name, **context_factory()))
+
+        parts = (region, self.backend.generation(region), get_locale(), *key)
+        cache_key = ":".join(str(part) for part in parts)
+        html = self.backend.get(cache_key)
+        if html is None:
+            self._count(region, "misses")
+            html = render_template(template_name, **context_factory())
+            self.backend.set(cache_key, html)
+        else:
+            self._count(region, "hits")
+        return Markup(html)
+
+    def get_or_set(self, region, name, factory):
+        """Zapamiętuje w regionie wartość zapisywalną w JSON, np. liczbę postów.
+
+        Wartość jest unieważniana razem z fragmentami regionu.
+        """
+        if not self.enabled:
+            return factory()
+
+        cache_key = f"{region}:{self.backend.generation(region)}:value:{name}"
+        value = self.backend.get(cache_key)
+        if value is None:
+            result = factory()
+            self.backend.set(cache_key, json.dumps(result))
+            return result
+        return json.loads(value)
+
+    def generation(self, region):
+        return self.backend.generation(region)
+
+    def invalidate(self, *regions):
+        for region in regions:
+            self.backend.bump(region)
+
+    def clear(self):
+        self.backend.clear()
+        with self._stats_lock:
+            self._stats.clear()
+
+    def stats(self):
+        with self._stats_lock:
+            return {region: dict(counts) for region, counts in self._stats.items()}
+
+    def _count(self, region, kind):
+        with self._stats_lock:
+            counts = self._stats.setdefault(region, {"hits": 0, "misses": 0})
+            counts[kind] += 1
+
+
+def _regions_for(model_name):
+    return INVALIDATION_RULES.get(model_name, ())
+
+
+def _register_invalidation_hooks(cache):
+    @event.listens_for(db.session, "after_flush")
+    def collect_flushed(session, flush_context):
+        regions = session.info.setdefault("invalidate_regions", set())
+        for obj in session.new | session.deleted:
+            regions.update(_regions_for(type(obj).__name__))
+        for obj in session.dirty:
+            if not session.is_modified(obj):
+                continue
+            name = type(obj).__name__
+            regions.update(_regions_for(name))
+            if name == "User" and db.inspect(obj).attrs.username.history.has_changes():
+                regions.update(USERNAME_REGIONS)
+        for obj in session.deleted:
+            if type(obj).__name__ == "User":
+                regions.update(USERNAME_REGIONS)
+
+    @event.listens_for(db.session, "do_orm_execute")
+    def collect_bulk(orm_execute_state):
+        # Hurtowe UPDATE/DELETE (np. Query.delete()) omijają flush
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        if not orm_execute_state.execution_options.get("invalidate_fragments", True):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None:
+            return
+        name = mapper.class_.__name__
+        regions = orm_execute_state.session.info.setdefault("invalidate_regions", set())
+        regions.update(_regions_for(name))
+        if name == "User":
+            regions.update(USERNAME_REGIONS)
+
+    @event.listens_for(db.session, "after_commit")
+    def invalidate_committed(session):
+        regions = session.info.pop("invalidate_regions", None)
+        if regions:
+            cache.invalidate(*regions)
+
+    @event.listens_for(db.session, "after_rollback")
+    def discard_rolled_back(session):
+        session.info.pop("invalidate_regions", None)
+
+
+def today_key():
+    """Listy turniejów dzielą się na nadchodzące i przeszłe według dzisiejszej daty."""
+    return datetime.utcnow().date().isoformat()
+
+
+fragment_cache = FragmentCache(app)
+
@@ -0,0 +1,248 @@
+# app/exports.py
+
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import timedelta
+from xml.sax.saxutils import escape
+
+from flask import Response, stream_with_context
+from sqlalchemy import extract, select
+
+from app import db
+from app.models import Tournament, TournamentRegistration, User
+
+FIELDS = [
+    "username",
+    "first_name",
+    "last_name",
+    "tournament_id",
+    "tournament_title",
+    "tournament_start_date",
+    "registration_date",
+    "paid",
+]
+BATCH_SIZE = 1000
+
+
+# --- Dane ---
+def registrations_query(
+    tournament_id=None, season=None, registered_from=None, registered_to=None
+):
+    """Jedno zapytanie z JOIN-ami - bez doczytywania gracza dla każdego zapisu.
+
+    `season` to rok rozpoczęcia turnieju, `registered_from`/`registered_to`
+    to daty (włącznie) zapisu.
+    """
+    stmt = (
+        select(
+            User.username,
+            User.first_name,
+            User.last_name,
+            Tournament.id.label("tournament_id"),
+            Tournament.title.label("tournament_title"),
+            Tournament.start_date,
+            TournamentRegistration.registration_date,
+        )
+        .join(User, TournamentRegistration.user_id == User.id)
+        .join(Tournament, TournamentRegistration.tournament_id == Tournament.id)
+        .order_by(
+            Tournament.start_date,
+            Tournament.id,
+            TournamentRegistration.registration_date,
+        )
+    )
+    if tournament_id is not None:
+        stmt = stmt.where(TournamentRegistration.tournament_id == tournament_id)
+    if season is not None:
+        stmt = stmt.where(extract("year", Tournament.start_date) == season)
+    if registered_from is not None:
+        stmt = stmt.where(TournamentRegistration.registration_date >= registered_from)
+    if registered_to is not None:
+        stmt = stmt.where(
+            TournamentRegistration.registration_date < registered_to + timedelta(days=1)
+        )
+    return stmt
+
+
+def registration_records(stmt):
+    """Zwraca zapisy jako słowniki, pobierając z bazy po BATCH_SIZE wierszy."""
+    rows = db.session.execute(stmt.execution_options(yield_per=BATCH_SIZE))
+    for row in rows:
+        yield {
+            "username": row.username,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "tournament_id": row.tournament_id,
+            "tournament_title": row.tournament_title,
+            "tournament_start_date": row.start_date.strftime("%Y-%m-%d"),
+            "registration_date": row.registration_date.strftime("%Y-%m-%d %H:%M:%S"),
+            "paid": False,
+        }
+
+
+# --- Formaty ---
+def _batched(records, size=BATCH_SIZE):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_json(records):
+    """Tablica JSON jak dotychczas, ale wysyłana kawałkami."""
+    yield "["
+    separator = "\n"
+    for batch in _batched(records):
+        for record in batch:
+            yield separator + "  " + json.dumps(record, ensure_ascii=False)
+            separator = ",\n"
+    yield "\n]\n"
+
+
+def write_jsonl(records):
+    for batch in _batched(records):
+        yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+
+
+def _csv_safe(value):
+    # Arkusze traktują komórki zaczynające się od =, +, - lub @ jak formuły
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return value
+
+
+def write_csv(records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM - Excel poprawnie rozpoznaje polskie znaki
+    yield "\ufeff"
+    writer.writerow(FIELDS)
+    for batch in _batched(records):
+        writer.writerows([_csv_safe(record[field]) for field in FIELDS] for record in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _ChunkSink:
+    """Strumień bez seek(), do którego zipfile zapisuje archiwum kawałkami."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Zapisy" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+# Znaki sterujące niedozwolone w XML
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_cell(value):
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, int):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_XML_ILLEGAL.sub("", str(value or "")))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+def write_xlsx(records):
+    """Arkusz XLSX (SpreadsheetML) tworzony i wysyłany w trakcie pobierania z bazy.
+
+    Napisy zapisywane są bezpośrednio w komórkach (inlineStr), więc nie trzeba
+    budować w pamięci tabeli współdzielonych napisów.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            sheet.write(_xlsx_row(FIELDS).encode("utf-8"))
+            for batch in _batched(records):
+                sheet.write(
+                    "".join(
+                        _xlsx_row(record[field] for field in FIELDS) for record in batch
+                    ).encode("utf-8")
+                )
+                yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    "json": (write_json, "application/json"),
+    "jsonl": (write_jsonl, "application/x-ndjson"),
+    "csv": (write_csv, "text/csv; charset=utf-8"),
+    "xlsx": (
+        write_xlsx,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+}
+
+
+def export_response(stmt, fmt, filename):
+    """Odpowiedź HTTP wysyłana w trakcie generowania pliku."""
+    writer, mimetype = EXPORT_FORMATS[fmt]
+    body = writer(registration_records(stmt))
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment;filename={filename}.{fmt}"},
+    )
@@ -0,0 +1,391 @@
+# app/fixtures.py
+
+import csv
+import io
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta
+
+import click
+from faker import Faker
+from sqlalchemy import func, select, text
+
+from app import app, db
+from app.cache import fragment_cache
+from app.models import (
+    POST_EXCERPT_LENGTH,
+    TOURNAMENT_EXCERPT_LENGTH,
+    Post,
+    SearchDocument,
+    Tournament,
+    TournamentRegistration,
+    TournamentWinner,
+    User,
+    normalize_identity,
+    plain_excerpt,
+    plain_text,
+)
+from app.passwords import hash_password
+from app.search import document_values
+
+# --- Generator danych testowych ---
+# Wiersze generowane są partiami w procesach potomnych (Faker jest wolny),
+# a zapisywane w procesie głównym hurtowym INSERT-em (w PostgreSQL przez COPY).
+# Każda partia ma własne ziarno losowania zależne od --seed, rodzaju danych
+# i numeru partii, więc wynik nie zależy od liczby procesów (ale zależy
+# od --batch-size).
+
+BATCH_SIZE = 5000
+# Hasło wszystkich wygenerowanych kont (hashowane raz)
+FIXTURE_PASSWORD = "Haslo123!"
+# Co który wygenerowany użytkownik jest administratorem (autorem postów;
+# bez administratorów autorem jest pierwszy użytkownik, jak w manage_posts.py)
+ADMIN_EVERY = 1000
+# Zakres dat: posty i turnieje z ostatnich lat, zapisy na najbliższe turnieje
+HISTORY_DAYS = 3 * 365
+UPCOMING_DAYS = 90
+
+COLUMNS = {
+    "user": (
+        "id", "username", "email", "password_hash", "first_name", "last_name",
+        "is_admin", "email_verified", "username_lower", "email_lower",
+    ),
+    "post": (
+        "id", "title", "date_posted", "content", "excerpt", "user_id",
+        "image_file", "image_status", "archived", "updated_at",
+    ),
+    "tournament": (
+        "id", "title", "description", "excerpt", "banner_image", "banner_status",
+        "start_date", "end_date", "max_players", "registered_count", "location",
+        "archived", "updated_at",
+    ),
+    "tournament_registration": ("user_id", "tournament_id", "registration_date"),
+    "tournament_winner": ("placing", "user_id", "tournament_id"),
+    "search_document": ("kind", "item_id", "title_terms", "body_terms"),
+}
+TABLES = {
+    "user": User.__table__,
+    "post": Post.__table__,
+    "tournament": Tournament.__table__,
+    "tournament_registration": TournamentRegistration.__table__,
+    "tournament_winner": TournamentWinner.__table__,
+    "search_document": SearchDocument.__table__,
+}
+
+
+# --- Generowanie wierszy (procesy potomne) ---
+def _random_source(seed, kind, chunk):
+    rng = random.Random(f"{seed}:{kind}:{chunk}")
+    fake = Faker("pl_PL")
+    fake.seed_instance(f"{seed}:{kind}:{chunk}")
+    return rng, fake
+
+
+def _user_rows(rng, fake, start_id, count, context):
+    rows = []
+    for user_id in range(start_id, start_id + count):
+        # id w nazwie gwarantuje unikalność nazwy i adresu e-mail
+        username = f"{fake.user_name()[:12]}.{user_id}"
+        email = f"{username}@{fake.free_email_domain()}"
+        rows.append(
+            {
+                "id": user_id,
+                "username": username,
+                "email": email,
+                "password_hash": context["password_hash"],
+                "first_name": fake.first_name()[:30],
+                "last_name": fake.last_name()[:30],
+                "is_admin": user_id % ADMIN_EVERY == 0,
+                "email_verified": rng.random() < 0.9,
+                "username_lower": normalize_identity(username),
+                "email_lower": normalize_identity(email),
+            }
+        )
+    return {"user": rows}
+
+
+def _post_rows(rng, fake, start_id, count, context):
+    now = context["now"]
+    rows, documents = [], []
+    for post_id in range(start_id, start_id + count):
+        title = fake.sentence(nb_words=6)[:100]
+        content = "".join(
+            f"<p>{paragraph}</p>" for paragraph in fake.paragraphs(nb=rng.randint(3, 7))
+        )
+        # Nowszych postów jest więcej niż starych
+        date_posted = now - timedelta(
+            seconds=int(rng.random() ** 2 * HISTORY_DAYS * 86400)
+        )
+        rows.append(
+            {
+                "id": post_id,
+                "title": title,
+                "date_posted": date_posted,
+                "content": content,
+                "excerpt": plain_excerpt(content, POST_EXCERPT_LENGTH),
+                "user_id": rng.choice(context["authors"]),
+                "image_file": "default.png",
+                "image_status": "ready",
+                "archived": False,
+                "updated_at": date_posted,
+            }
+        )
+        # Wpis indeksu wyszukiwania - wstawianie przez Core omija app.search
+        documents.append(document_values("post", post_id, title, plain_text(content)))
+    return {"post": rows, "search_document": documents}
+
+
+def _tournament_rows(rng, fake, start_id, count, context):
+    now, players = context["now"], context["players"]
+    tournaments, registrations, winners, documents = [], [], [], []
+    for tournament_id in range(start_id, start_id + count):
+        start_date = now + timedelta(
+            days=rng.randint(-HISTORY_DAYS, UPCOMING_DAYS), hours=rng.choice((9, 10))
+        )
+        max_players = rng.choices((16, 32, 64), weights=(3, 5, 2))[0]
+        finished = start_date < now
+        # Przeszłe turnieje są zwykle prawie pełne, na przyszłe trwają zapisy
+        fill = rng.betavariate(5, 2) if finished else rng.betavariate(2, 3)
+        entrants = rng.sample(players, min(round(max_players * fill), len(players)))
+        for user_id in entrants:
+            registered = start_date - timedelta(minutes=rng.randint(60, 60 * 24 * 60))
+            registrations.append(
+                {
+                    "user_id": user_id,
+                    "tournament_id": tournament_id,
+                    "registration_date": min(registered, now),
+                }
+            )
+        if finished:
+            for placing, user_id in enumerate(entrants[:3], start=1):
+                winners.append(
+                    {"placing": placing, "user_id": user_id, "tournament_id": tournament_id}
+                )
+
+        description = "".join(
+            f"<p>{paragraph}</p>" for paragraph in fake.paragraphs(nb=rng.randint(4, 8))
+        )
+        title = f"{fake.city()} Badminton Open {start_date.year}"[:120]
+        location = f"{fake.city()}, {fake.street_name()}"[:100]
+        tournaments.append(
+            {
+                "id": tournament_id,
+                "title": title,
+                "description": description,
+                "excerpt": plain_excerpt(description, TOURNAMENT_EXCERPT_LENGTH),
+                "banner_image": "default.png",
+                "banner_status": "ready",
+                "start_date": start_date,
+                "end_date": start_date + timedelta(days=rng.randint(1, 3)),
+                "max_players": max_players,
+                "registered_count": len(entrants),
+                "location": location,
+                "archived": False,
+                "updated_at": now,
+            }
+        )
+        body = f"{location} {plain_text(description)}"
+        documents.append(document_values("tournament", tournament_id, title, body))
+    return {
+        "tournament": tournaments,
+        "tournament_registration": registrations,
+        "tournament_winner": winners,
+        "search_document": documents,
+    }
+
+
+GENERATORS = {"user": _user_rows, "post": _post_rows, "tournament": _tournament_rows}
+
+# Wspólne dane (np. lista wszystkich graczy) przekazywane raz na proces,
+# a nie z każdą partią
+_context = None
+
+
+def _init_worker(context):
+    global _context
+    _context = context
+
+
+def _generate_chunk(task):
+    kind, seed, chunk, start_id, count = task
+    rng, fake = _random_source(seed, kind, chunk)
+    return count, GENERATORS[kind](rng, fake, start_id, count, _context)
+
+
+# --- Zapis do bazy ---
+def _copy_rows(connection, table_name, rows):
+    """PostgreSQL: COPY ... FROM STDIN - kilkukrotnie szybsze niż INSERT."""
+    columns = COLUMNS[table_name]
+    buffer = io.StringIO()
+    # Napisy w cudzysłowach, None bez - COPY odróżnia wtedy NULL od pustego napisu
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for row in rows:
+        values = (row[column] for column in columns)
+        writer.writerow(
+            value.isoformat() if isinstance(value, datetime) else value for value in values
+        )
+    buffer.seek(0)
+    quoted = ", ".join(f'"{column}"' for column in columns)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f'COPY "{table_name}" ({quoted}) FROM STDIN WITH (FORMAT csv)', buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _insert_rows(connection, tables):
+    # Kolejność kluczy w `tables` zachowuje zależności (turnieje przed zapisami)
+    for table_name, rows in tables.items():
+        if not rows:
+            continue
+        if connection.dialect.name == "postgresql":
+            _copy_rows(connection, table_name, rows)
+        else:
+            connection.execute(TABLES[table_name].insert(), rows)
+
+
+def _reset_sequences(connection):
+    """Po wstawieniu jawnych id przesuwa sekwencje PostgreSQL za największe id."""
+    if connection.dialect.name != "postgresql":
+        return
+    for table_name in TABLES:
+        connection.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table_name}\"', 'id'), "
+                f'COALESCE((SELECT MAX(id) FROM "{table_name}"), 0) + 1, false)'
+            )
+        )
+
+
+def _next_id(model):
+    return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _tasks(kind, seed, start_id, count, batch_size):
+    for chunk, offset in enumerate(range(0, count, batch_size)):
+        yield kind, seed, chunk, start_id + offset, min(batch_size, count - offset)
+
+
+def generate(
+    users=0,
+    posts=0,
+    tournaments=0,
+    seed=0,
+    processes=None,
+    batch_size=BATCH_SIZE,
+    on_progress=None,
+):
+    """Generuje dane testowe; zwraca liczbę wstawionych wierszy w każdej tabeli.
+
+    `on_progress(rodzaj, gotowe, wszystkie)` wywoływane jest przed pierwszą
+    i po każdej partii.
+    Wymaga kontekstu aplikacji.
+    """
+    # Daty liczone od dzisiejszej północy - to samo ziarno daje te same dane w ciągu dnia
+    now = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    first_user = _next_id(User)
+    authors = db.session.scalars(select(User.id).where(User.is_admin)).all()
+    authors += [
+        user_id
+        for user_id in range(first_user, first_user + users)
+        if user_id % ADMIN_EVERY == 0
+    ]
+    if users:
+        players = range(first_user, first_user + users)
+    else:
+        players = db.session.scalars(select(User.id)).all()
+    if posts and not authors:
+        first = db.session.scalar(select(func.min(User.id)))
+        authors = [first] if first is not None else list(players[:1])
+    if posts and not authors:
+        raise click.ClickException("Brak użytkowników, którzy mogliby być autorami postów.")
+
+    context = {
+        "now": now,
+        "password_hash": hash_password(FIXTURE_PASSWORD),
+        "authors": authors,
+        "players": players,
+    }
+    plan = [
+        ("user", users, first_user),
+        ("tournament", tournaments, _next_id(Tournament)),
+        ("post", posts, _next_id(Post)),
+    ]
+    db.session.close()
+
+    counts = dict.fromkeys(TABLES, 0)
+    pool = None
+    if processes != 1:
+        # "spawn" - procesy potomne nie dziedziczą połączeń z bazą rodzica
+        pool = multiprocessing.get_context("spawn").Pool(
+            processes, initializer=_init_worker, initargs=(context,)
+        )
+    else:
+        _init_worker(context)
+    try:
+        for kind, count, start_id in plan:
+            if not count:
+                continue
+            tasks = _tasks(kind, seed, start_id, count, batch_size)
+            chunks = pool.imap(_generate_chunk, tasks) if pool else map(_generate_chunk, tasks)
+            done = 0
+            if on_progress:
+                on_progress(kind, done, count)
+            for generated, tables in chunks:
+                with db.engine.begin() as connection:
+                    _insert_rows(connection, tables)
+                for table_name, rows in tables.items():
+                    counts[table_name] += len(rows)
+                done += generated
+                if on_progress:
+                    on_progress(kind, done, count)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        _init_worker(None)
+
+    with db.engine.begin() as connection:
+        _reset_sequences(connection)
+    # Wstawianie przez Core omija zdarzenia sesji, które unieważniają cache
+    fragment_cache.invalidate("index", "news", "tournaments", "post")
+    return counts
+
+
+# --- Komenda CLI ---
+@app.cli.command("generate-data")
+@click.option("--users", default=0, show_default=True, help="Liczba użytkowników.")
+@click.option("--posts", default=0, show_default=True, help="Liczba postów.")
+@click.option("--tournaments", default=0, show_default=True, help="Liczba turniejów (z zapisami i zwycięzcami).")
+@click.option("--seed", default=0, show_default=True, help="Ziarno losowania - te same parametry dają te same dane.")
+@click.option("--processes", default=None, type=int, help="Liczba procesów generujących (domyślnie liczba rdzeni).")
+@click.option("--batch-size", default=BATCH_SIZE, show_default=True, help="Liczba wierszy w jednej partii.")
+def generate_data_command(users, posts, tournaments, seed, processes, batch_size):
+    """Wypełnia bazę dużą ilością danych testowych (np. do testów wydajności)."""
+    started = time.perf_counter()
+    kind_started = {}
+
+    def report(kind, done, total):
+        if done == 0:
+            kind_started[kind] = time.perf_counter()
+            return
+        rate = done / max(time.perf_counter() - kind_started[kind], 1e-6)
+        click.echo(f"\r  {kind:<12} {done:>10}/{total} ({rate:,.0f} wierszy/s)", nl=False)
+        if done == total:
+            click.echo()
+
+    counts = generate(
+        users=users,
+        posts=posts,
+        tournaments=tournaments,
+        seed=seed,
+        processes=processes,
+        batch_size=batch_size,
+        on_progress=report,
+    )
+    for table_name, count in counts.items():
+        click.echo(f"{table_name:<24} {count:>10}")
+    click.echo(f"Gotowe w {time.perf_counter() - started:.1f} s. Hasło kont: {FIXTURE_PASSWORD}")
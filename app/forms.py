@@ -12,12 +12,24 @@ from wtforms import (
     TextAreaField,
     DateField,
     IntegerField,
+    Field,
+    SelectField,
 )
-from wtforms.validators import DataRequired, Length, Email, EqualTo, ValidationError
-from wtforms_sqlalchemy.fields import QuerySelectField
+from wtforms.validators import (
+    DataRequired,
+    Length,
+    Email,
+    EqualTo,
+    NumberRange,
+    Optional,
+    ValidationError,
+)
+from wtforms.widgets import HiddenInput
 from flask_babel import lazy_gettext as _l
-from profanity_check import predict
-from app.models import User
+from app.bulk import MAX_SHIFT_DAYS
+from app.models import User, normalize_identity
+from app.queries import taken_identities
+from app.profanity import is_profane
 from flask_wtf.file import FileField, FileAllowed
 import bleach
 
@@ -49,9 +61,45 @@ def bleach_clean_text(data):
     return bleach.clean(data, tags=allowed_tags, strip=True)
 
 
-def get_users():
-    """Funkcja pomocnicza do pobierania użytkowników do formularza."""
-    return User.query
+class UserLookupField(Field):
+    """Id użytkownika wybranego z podpowiedzi (/admin/users/lookup).
+
+    W przeciwieństwie do listy rozwijanej nie wczytuje wszystkich
+    użytkowników - walidacja to jedno zapytanie o przesłane id. `data`
+    to obiekt `User` lub None.
+    """
+
+    widget = HiddenInput()
+
+    def __init__(self, label=None, validators=None, query_factory=None, **kwargs):
+        super().__init__(label, validators, **kwargs)
+        # Opcjonalne zawężenie dozwolonych użytkowników (np. do zapisanych graczy)
+        self.query_factory = query_factory
+        self._user_id = None
+
+    def _value(self):
+        if self.data is not None:
+            return str(self.data.id)
+        return str(self._user_id) if self._user_id is not None else ""
+
+    def process_formdata(self, valuelist):
+        self.data = None
+        self._user_id = None
+        if valuelist and valuelist[0]:
+            try:
+                self._user_id = int(valuelist[0])
+            except ValueError:
+                pass
+
+    def pre_validate(self, form):
+        if self._user_id is None:
+            if self.data is None:
+                raise ValidationError(_l("Wybierz użytkownika z listy."))
+            return
+        query = self.query_factory() if self.query_factory else User.query
+        self.data = query.filter(User.id == self._user_id).first()
+        if self.data is None:
+            raise ValidationError(_l("Nieprawidłowy użytkownik."))
 
 
 # --- Validators ---
@@ -59,7 +107,7 @@ def get_users():
 
 def validate_username_profanity(form, field):
     username_text = field.data.lower()
-    if predict([username_text])[0] == 1:
+    if is_profane(username_text):
         raise ValidationError(_l("Nazwa użytkownika zawiera niedozwolone słowa."))
 
 
@@ -92,13 +140,8 @@ class AddWinnerForm(FlaskForm):
     """Formularz do dodawania zwycięzcy do turnieju."""
 
     placing = IntegerField(_l("Miejsce"), validators=[DataRequired()])
-    # Używamy QuerySelectField, aby stworzyć listę rozwijaną z użytkownikami
-    user = QuerySelectField(
-        _l("Użytkownik"),
-        query_factory=get_users,
-        get_label="username",
-        allow_blank=False,
-    )
+    # Id użytkownika wybranego z podpowiedzi zamiast listy wszystkich użytkowników
+    user = UserLookupField(_l("Użytkownik"))
     submit = SubmitField(_l("Dodaj zwycięzcę"))
 
 
@@ -138,19 +181,19 @@ class RegistrationForm(FlaskForm):
     )
     submit = SubmitField(_l("Zarejestruj się"))
 
-    def validate_username(self, username):
-        user = User.query.filter_by(username=username.data).first()
-        if user:
-            raise ValidationError(
+    def validate(self, extra_validators=None):
+        valid = super().validate(extra_validators)
+        # Nazwa i e-mail sprawdzane jednym zapytaniem, bez wielkości liter
+        taken = taken_identities(email=self.email.data, username=self.username.data)
+        if "username" in taken:
+            self.username.errors.append(
                 _l("Ta nazwa użytkownika jest już zajęta. Proszę wybrać inną.")
             )
-
-    def validate_email(self, email):
-        user = User.query.filter_by(email=email.data).first()
-        if user:
-            raise ValidationError(
+        if "email" in taken:
+            self.email.errors.append(
                 _l("Ten adres email jest już zajęty. Proszę wybrać inny.")
             )
+        return valid and not taken
 
 
 class LoginForm(FlaskForm):
@@ -231,8 +274,9 @@ class UpdateAccountForm(FlaskForm):
         self.original_username = original_username
 
     def validate_username(self, username):
-        if username.data != self.original_username:
-            if User.query.filter_by(username=username.data).first():
+        # Zmiana wielkości liter we własnej nazwie jest dozwolona
+        if normalize_identity(username.data) != normalize_identity(self.original_username):
+            if taken_identities(username=username.data):
                 raise ValidationError(
                     _l("Ta nazwa użytkownika jest już zajęta. Proszę wybrać inną.")
                 )
@@ -289,6 +333,33 @@ class DeleteForm(FlaskForm):
     submit = SubmitField(_l("Usuń"))
 
 
+class BulkActionForm(FlaskForm):
+    """Akcja na zaznaczonych wierszach listy (id przesyłane jako pola "ids")."""
+
+    action = SelectField(
+        _l("Akcja"),
+        choices=[
+            ("archive", _l("Archiwizuj")),
+            ("unarchive", _l("Przywróć z archiwum")),
+            ("shift", _l("Przesuń daty")),
+            ("delete", _l("Usuń")),
+        ],
+    )
+    days = IntegerField(
+        _l("Liczba dni"),
+        validators=[Optional(), NumberRange(min=-MAX_SHIFT_DAYS, max=MAX_SHIFT_DAYS)],
+    )
+    submit = SubmitField(_l("Wykonaj"))
+
+    def validate(self, extra_validators=None):
+        if not super().validate(extra_validators):
+            return False
+        if self.action.data == "shift" and not self.days.data:
+            self.days.errors.append(_l("Podaj liczbę dni przesunięcia."))
+            return False
+        return True
+
+
 class ConfirmPasswordForm(FlaskForm):
     password = PasswordField(_l("Hasło administratora"), validators=[DataRequired()])
     submit = SubmitField(_l("Potwierdź operację"))
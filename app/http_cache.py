@@ -0,0 +1,259 @@
+# app/http_cache.py
+
+import hashlib
+import os
+from datetime import datetime, time
+from functools import wraps
+
+from flask import make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event, func, inspect, or_, select, update
+from werkzeug.http import is_resource_modified
+
+from app import app, db, get_locale
+from app.assets import manifest_version
+from app.cache import fragment_cache, today_key
+from app.models import Post, Tournament, TournamentRegistration, TournamentWinner, User
+
+# --- Warunkowe GET (ETag / Last-Modified / 304) ---
+# Walidatory liczone są z wersji wierszy (kolumny updated_at), bez renderowania
+# strony. Gdy przeglądarka albo reverse proxy ma aktualną kopię, widok nie jest
+# wywoływany i odpowiedzią jest 304 bez treści.
+#
+# Cache-Control:
+# - anonimowi: "public" - proxy może trzymać stronę przez `shared_max_age`
+#   sekund; Vary: Cookie rozdziela wersje językowe (język jest w sesji),
+# - zalogowani: "private, no-cache" - tylko przeglądarka, zawsze z walidacją,
+# - administratorzy i strony z komunikatami flash: "private, no-store".
+
+PUBLIC = "public, max-age=0, s-maxage={}"
+PRIVATE = "private, no-cache"
+NO_STORE = "private, no-store"
+
+
+def _templates_version():
+    """Najnowsza zmiana szablonów - po wdrożeniu nowych szablonów zmieniają się ETagi."""
+    latest = 0
+    for root, _dirs, files in os.walk(os.path.join(app.root_path, app.template_folder)):
+        for name in files:
+            latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+    return int(latest)
+
+
+TEMPLATES_VERSION = _templates_version()
+
+
+def _cacheable():
+    if not app.config["HTTP_CACHE_ENABLED"] or request.method not in ("GET", "HEAD"):
+        return False
+    # Komunikat flash zostałby pokazany ponownie z kopii w cache
+    if "_flashes" in session:
+        return False
+    # Strony administratora zawierają formularze z tokenami CSRF
+    return not (current_user.is_authenticated and current_user.is_admin)
+
+
+def _etag(parts):
+    if current_user.is_authenticated:
+        viewer = (current_user.id, current_user.username)
+    else:
+        viewer = ("anon",)
+    # Nowe pliki statyczne zmieniają adresy w HTML, choć szablony są te same
+    key = repr((TEMPLATES_VERSION, manifest_version(), get_locale(), viewer, *parts))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def conditional(version, shared_max_age=60):
+    """Dekorator widoku GET obsługujący If-None-Match / If-Modified-Since.
+
+    `version(**view_args)` zwraca (części walidatora, czas ostatniej zmiany)
+    i może przerwać żądanie przez abort(404). Język i użytkownik są dodawane
+    do ETagu automatycznie.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            if not _cacheable():
+                response = make_response(view(**kwargs))
+                response.headers.setdefault("Cache-Control", NO_STORE)
+                return response
+
+            parts, last_modified = version(**kwargs)
+            etag = _etag(parts)
+            if is_resource_modified(
+                request.environ, etag=etag, last_modified=last_modified
+            ):
+                response = make_response(view(**kwargs))
+                if response.status_code != 200:
+                    return response
+            else:
+                response = app.response_class(status=304)
+
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            # Widok, który zapisał coś w sesji, wysyła ciasteczko - nie do współdzielenia
+            if current_user.is_authenticated or session.modified:
+                response.headers["Cache-Control"] = PRIVATE
+            else:
+                response.headers["Cache-Control"] = PUBLIC.format(shared_max_age)
+            response.vary.add("Cookie")
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+# --- Wersje stron ---
+def _table_versions(region, *models):
+    """Liczba wierszy i ostatnia zmiana w tabelach (usunięcie zmienia liczbę).
+
+    Zwraca (generacja regionu, wersje tabel). Generacja trafia do ETagu, więc
+    walidator zmienia się razem z fragmentami, z których składa się strona.
+
+    Z cache współdzielonym (Redis) commit w dowolnym workerze zwiększa
+    generację regionu, więc wynik jest zapamiętany w regionie. Cache w pamięci
+    procesu nie widzi commitów z innych workerów - wtedy wersja jest liczona
+    z bazy przy każdym żądaniu (count i max po indeksach), a gdy różni się od
+    zapamiętanej przy renderowaniu fragmentów, region jest unieważniany.
+    """
+
+    def load():
+        versions = []
+        for model in models:
+            count, last = db.session.execute(
+                select(func.count(model.id), func.max(model.updated_at))
+            ).one()
+            versions.append([count, last.isoformat() if last else None])
+        return versions
+
+    if not fragment_cache.enabled or fragment_cache.backend.shared:
+        versions = fragment_cache.get_or_set(region, "version", load)
+    else:
+        versions = load()
+        stored = []
+        remembered = fragment_cache.get_or_set(
+            region, "version", lambda: stored.append(True) or versions
+        )
+        # Po wygaśnięciu wpisu nie wiadomo, z jakich danych są fragmenty
+        if stored or remembered != versions:
+            fragment_cache.invalidate(region)
+            fragment_cache.get_or_set(region, "version", lambda: versions)
+    return fragment_cache.generation(region), [
+        (count, datetime.fromisoformat(last) if last else None)
+        for count, last in versions
+    ]
+
+
+def _latest(*moments):
+    return max((moment for moment in moments if moment), default=None)
+
+
+def _today():
+    """Początek dzisiejszego dnia - wtedy zmieniają się listy nadchodzących turniejów."""
+    return datetime.combine(datetime.utcnow().date(), time.min)
+
+
+def index_version():
+    generation, (posts, tournaments) = _table_versions("index", Post, Tournament)
+    return (generation, posts, tournaments, today_key()), _latest(
+        posts[1], tournaments[1], _today()
+    )
+
+
+def news_version():
+    generation, (posts,) = _table_versions("news", Post)
+    return (generation, posts), posts[1]
+
+
+def tournaments_version():
+    generation, (tournaments,) = _table_versions("tournaments", Tournament)
+    return (generation, tournaments, today_key()), _latest(tournaments[1], _today())
+
+
+def post_version(post_id):
+    row = db.session.execute(
+        select(Post.updated_at, User.username)
+        .join(User, User.id == Post.user_id)
+        .where(Post.id == post_id)
+    ).first()
+    if row is None:
+        return (None,), None  # widok zwróci 404
+    # Fragment posta ma w kluczu updated_at, więc zgadza się z wierszem
+    return (fragment_cache.generation("post"), *row), row.updated_at
+
+
+def tournament_version(tournament_id):
+    row = db.session.execute(
+        select(Tournament.updated_at, Tournament.start_date).where(
+            Tournament.id == tournament_id
+        )
+    ).first()
+    if row is None:
+        return (None,), None  # widok zwróci 404
+    # Po starcie turnieju zamykane są zapisy - strona zmienia się bez zmiany wiersza
+    started = row.start_date <= datetime.utcnow()
+    changed = _latest(row.updated_at, row.start_date if started else None)
+    return (row.updated_at, started), changed
+
+
+# --- Aktualizacja wersji ---
+def touch_tournaments(tournament_ids, connection=None):
+    """Oznacza turnieje jako zmienione (np. po zmianie zapisów lub podium)."""
+    if not tournament_ids:
+        return
+    connection = connection or db.session
+    connection.execute(
+        update(Tournament.__table__)
+        .where(Tournament.id.in_(tournament_ids))
+        .values(updated_at=datetime.utcnow())
+    )
+
+
+def _touch_username(connection, user_ids):
+    """Nazwa użytkownika jest widoczna przy jego postach, zapisach i na podium."""
+    connection.execute(
+        update(Post.__table__)
+        .where(Post.user_id.in_(user_ids))
+        .values(updated_at=datetime.utcnow())
+    )
+    connection.execute(
+        update(Tournament.__table__)
+        .where(
+            or_(
+                Tournament.id.in_(
+                    select(TournamentRegistration.tournament_id).where(
+                        TournamentRegistration.user_id.in_(user_ids)
+                    )
+                ),
+                Tournament.id.in_(
+                    select(TournamentWinner.tournament_id).where(
+                        TournamentWinner.user_id.in_(user_ids)
+                    )
+                ),
+            )
+        )
+        .values(updated_at=datetime.utcnow())
+    )
+
+
+@event.listens_for(db.session, "after_flush")
+def touch_flushed(session, flush_context):
+    # Zapisy i podium nie mają własnej wersji - zmieniają wersję turnieju
+    tournament_ids = {
+        item.tournament_id
+        for item in session.new | session.dirty | session.deleted
+        if isinstance(item, (TournamentRegistration, TournamentWinner))
+    }
+    renamed = [
+        user.id
+        for user in session.dirty
+        if isinstance(user, User) and inspect(user).attrs.username.history.has_changes()
+    ]
+    if not tournament_ids and not renamed:
+        return
+    connection = session.connection()
+    touch_tournaments(tournament_ids, connection)
+    if renamed:
+        _touch_username(connection, renamed)
@@ -0,0 +1,399 @@
+# app/images.py
+
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import click
+import magic
+from flask import url_for
+from markupsafe import Markup
+from PIL import Image, ImageOps, features
+from sqlalchemy import select, update
+
+from app import app, db
+from app.metrics import timed
+from app.models import Post, Tournament
+
+PICTURES_DIR = os.path.join(app.root_path, "static", "post_pics")
+# Przesłane pliki w oryginalnej rozdzielczości, źródło do (ponownego) przetwarzania.
+# Nie są publikowane - zawierają pełne dane EXIF, które warianty tracą
+ORIGINALS_DIR = app.config["IMAGE_ORIGINALS_FOLDER"]
+# Dawne położenie oryginałów: podkatalog PICTURES_DIR, dostępny pod adresem URL
+LEGACY_ORIGINALS_DIR = "originals"
+ALLOWED_MIMETYPES = {"image/jpeg": ".jpg", "image/png": ".png"}
+
+# Główny plik (fallback dla starych przeglądarek) ma rozmiar jak dotychczas
+MAIN_SIZE = (1200, 675)
+# Warianty do srcset: nazwa -> maksymalny rozmiar
+VARIANTS = {
+    "card": (480, 270),
+    "list": (800, 450),
+    "hero": (1200, 675),
+}
+# Rzeczywiste szerokości wariantów (thumbnail zachowuje proporcje i nie
+# powiększa, więc mogą być mniejsze niż w VARIANTS) - plik <skrót>-widths.json
+WIDTHS_VARIANT = "widths"
+# Obraz dla podglądu linków (Open Graph) jest przycinany do dokładnego rozmiaru
+OG_SIZE = (1200, 630)
+# Kolejność ma znaczenie - przeglądarka wybiera pierwszy obsługiwany format
+MODERN_FORMATS = [
+    ("avif", "image/avif", {"quality": 55}),
+    ("webp", "image/webp", {"quality": 80, "method": 6}),
+]
+
+
+def available_formats():
+    """Formaty nowoczesne obsługiwane przez zainstalowanego Pillow."""
+    return [fmt for fmt in MODERN_FORMATS if features.check(fmt[0])]
+
+
+def variant_filename(filename, variant, ext):
+    digest, _ = os.path.splitext(filename)
+    return f"{digest}-{variant}.{ext}"
+
+
+def content_filename(data, ext):
+    """Nazwa pliku wyznaczona z treści - ten sam obraz zawsze ma tę samą nazwę.
+
+    16 znaków skrótu + rozszerzenie mieści się w kolumnach `image_file`
+    i `banner_image` (String(20)).
+    """
+    return hashlib.sha256(data).hexdigest()[:16] + ext
+
+
+# --- Zapis przesłanego obrazu ---
+@timed("image")
+def save_picture(form_picture):
+    """Zapisuje przesłany plik bez przetwarzania. Zwraca nazwę pliku lub None.
+
+    Warianty generuje w tle `flask image-worker`; do tego czasu rekord ma
+    status "pending" (patrz `picture_status`) i wyświetlany jest default.png.
+    """
+    data = form_picture.stream.read()
+    mime_type = magic.from_buffer(data[:2048], mime=True)
+    if mime_type not in ALLOWED_MIMETYPES:
+        return None
+    try:
+        # verify() czyta tylko strukturę pliku, bez dekodowania pikseli
+        Image.open(io.BytesIO(data)).verify()
+    except Exception as e:
+        app.logger.error(f"Błąd podczas zapisywania obrazu: {e}")
+        return None
+
+    picture_fn = content_filename(data, ALLOWED_MIMETYPES[mime_type])
+    original = os.path.join(ORIGINALS_DIR, picture_fn)
+    existing = [
+        path
+        for path in (os.path.join(PICTURES_DIR, picture_fn), original)
+        if os.path.exists(path)
+    ]
+    if existing:
+        # Ten sam obraz był już przesłany - nie zapisujemy go drugi raz, tylko
+        # odświeżamy datę użycia, żeby app.media nie usunęło go w międzyczasie
+        for path in existing:
+            os.utime(path)
+    else:
+        os.makedirs(os.path.dirname(original), exist_ok=True)
+        with open(original, "wb") as f:
+            f.write(data)
+    return picture_fn
+
+
+def is_processed(filename):
+    return os.path.exists(os.path.join(PICTURES_DIR, filename))
+
+
+def picture_status(filename):
+    return "ready" if is_processed(filename) else "pending"
+
+
+# --- Przetwarzanie (w procesach potomnych) ---
+def process_picture(picture_fn, pictures_dir, originals_dir):
+    """Generuje warianty jednego obrazu z oryginału.
+
+    Stare obrazy nie mają zapisanego oryginału - wtedy źródłem jest plik
+    główny, który nie jest nadpisywany.
+    """
+    original = os.path.join(originals_dir, picture_fn)
+    source = original if os.path.exists(original) else os.path.join(pictures_dir, picture_fn)
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        generate_variants(image, picture_fn, pictures_dir, write_main=source == original)
+    return picture_fn
+
+
+def generate_variants(image, picture_fn, pictures_dir, write_main=True):
+    """Zapisuje warianty srcset, obraz Open Graph i plik główny.
+
+    Plik główny zapisywany jest na końcu - jego istnienie oznacza, że obraz
+    jest w pełni przetworzony.
+    """
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    widths = {}
+    for variant, size in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.LANCZOS)
+        for ext, _, options in available_formats():
+            resized.save(
+                os.path.join(pictures_dir, variant_filename(picture_fn, variant, ext)),
+                **options,
+            )
+        widths[variant] = resized.width
+
+    og = ImageOps.fit(image.convert("RGB"), OG_SIZE, Image.LANCZOS)
+    og.save(
+        os.path.join(pictures_dir, variant_filename(picture_fn, "og", "jpg")),
+        quality=85,
+        optimize=True,
+    )
+    # Zapisywany po wariantach i OG - jego istnienie oznacza, że są kompletne
+    widths_path = variant_filename(picture_fn, WIDTHS_VARIANT, "json")
+    with open(os.path.join(pictures_dir, widths_path), "w") as f:
+        json.dump(widths, f)
+
+    if write_main:
+        main = image.copy()
+        main.thumbnail(MAIN_SIZE)
+        if picture_fn.endswith(".jpg") and main.mode != "RGB":
+            main = main.convert("RGB")
+        main.save(os.path.join(pictures_dir, picture_fn), optimize=True)
+
+
+def _executor(processes=None):
+    # "spawn" - procesy potomne nie dziedziczą połączeń z bazą rodzica
+    return ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def process_files(filenames, executor):
+    """Przetwarza pliki równolegle. Zwraca listy (gotowe, nieudane)."""
+    futures = {
+        executor.submit(process_picture, filename, PICTURES_DIR, ORIGINALS_DIR): filename
+        for filename in filenames
+    }
+    ready, failed = [], []
+    for future in as_completed(futures):
+        filename = futures[future]
+        try:
+            future.result()
+        except Exception as e:
+            app.logger.error(f"Nie udało się przetworzyć obrazu {filename}: {e}")
+            failed.append(filename)
+        else:
+            ready.append(filename)
+    return ready, failed
+
+
+# Kolumny z nazwą obrazu i jego statusem
+IMAGE_COLUMNS = [
+    (Post.image_file, Post.image_status),
+    (Tournament.banner_image, Tournament.banner_status),
+]
+
+
+def pending_files():
+    filenames = set()
+    for file_column, status_column in IMAGE_COLUMNS:
+        filenames.update(
+            db.session.scalars(select(file_column).where(status_column == "pending"))
+        )
+    return sorted(filenames)
+
+
+def set_status(filenames, status):
+    """Ustawia status wszystkim postom i turniejom używającym tych plików.
+
+    Hurtowy UPDATE unieważnia cache fragmentów, więc strony od razu pokazują
+    przetworzony obraz zamiast domyślnego.
+    """
+    if not filenames:
+        return
+    for file_column, status_column in IMAGE_COLUMNS:
+        db.session.execute(
+            update(file_column.class_)
+            .where(file_column.in_(filenames), status_column != status)
+            .values({status_column: status})
+        )
+    db.session.commit()
+
+
+def process_pending(executor):
+    """Przetwarza obrazy oczekujące w bazie. Zwraca krotkę (gotowe, nieudane)."""
+    filenames = pending_files()
+    if not filenames:
+        return 0, 0
+    ready, failed = process_files(filenames, executor)
+    set_status(ready, "ready")
+    set_status(failed, "failed")
+    return len(ready), len(failed)
+
+
+def run_worker(processes=None, interval=5.0, once=False):
+    """Przetwarza obrazy pulą procesów (dekodowanie i kodowanie nie blokuje się na GIL)."""
+    total_ready = total_failed = 0
+    with _executor(processes) as executor:
+        while True:
+            ready, failed = process_pending(executor)
+            total_ready += ready
+            total_failed += failed
+            if ready or failed:
+                app.logger.info(f"Obrazy: przetworzono {ready}, nieudane {failed}")
+                continue
+            if once:
+                return total_ready, total_failed
+            time.sleep(interval)
+
+
+def move_legacy_originals():
+    """Przenosi oryginały zapisane dawniej w static/post_pics/originals.
+
+    Zwraca liczbę przeniesionych plików.
+    """
+    legacy_dir = os.path.join(PICTURES_DIR, LEGACY_ORIGINALS_DIR)
+    if not os.path.isdir(legacy_dir):
+        return 0
+    os.makedirs(ORIGINALS_DIR, exist_ok=True)
+    names = os.listdir(legacy_dir)
+    for name in names:
+        shutil.move(os.path.join(legacy_dir, name), os.path.join(ORIGINALS_DIR, name))
+    os.rmdir(legacy_dir)
+    return len(names)
+
+
+def stored_pictures():
+    """Nazwy wszystkich obrazów w post_pics (bez wariantów) i oryginałów."""
+    names = set()
+    for directory in (PICTURES_DIR, ORIGINALS_DIR):
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            base, ext = os.path.splitext(name)
+            if ext in ALLOWED_MIMETYPES.values() and "-" not in base:
+                names.add(name)
+    return sorted(names)
+
+
+# --- Helpery szablonów ---
+# Zapamiętujemy tylko obrazy, dla których warianty istnieją (nazwa -> szerokości
+# wariantów); brak wariantów (stare obrazy, default.png) sprawdzamy ponownie,
+# bo mogą zostać dogenerowane.
+_variants_ready = {}
+
+
+def variant_widths(filename):
+    """Rzeczywiste szerokości wariantów {wariant: px} albo None, gdy ich nie ma.
+
+    Obrazy przetworzone przed zapisywaniem szerokości nie mają pliku
+    -widths.json - dostają zwykły <img> do czasu `flask reprocess-images`.
+    """
+    if filename in _variants_ready:
+        return _variants_ready[filename]
+    if not available_formats():
+        return None
+    path = os.path.join(PICTURES_DIR, variant_filename(filename, WIDTHS_VARIANT, "json"))
+    try:
+        with open(path) as f:
+            widths = json.load(f)
+    except FileNotFoundError:
+        return None
+    _variants_ready[filename] = widths
+    return widths
+
+
+def has_variants(filename):
+    return variant_widths(filename) is not None
+
+
+def forget_variants(digest):
+    """Wywoływane po usunięciu plików obrazu (app.media)."""
+    for filename in [name for name in _variants_ready if name.startswith(digest + ".")]:
+        del _variants_ready[filename]
+
+
+def _picture_url(filename):
+    return url_for("static", filename="post_pics/" + filename)
+
+
+def responsive_image(filename, alt, sizes="100vw", class_="", lazy=True):
+    """Zwraca <picture> z srcset w formatach AVIF/WebP i fallbackiem <img>.
+
+    Dla obrazów bez wariantów zwraca zwykły <img>. Obrazy widoczne od razu
+    po załadowaniu strony (np. nagłówek posta) powinny mieć `lazy=False`.
+    """
+    img = Markup('<img src="{}" alt="{}" class="{}" loading="{}" decoding="async">').format(
+        _picture_url(filename), alt, class_, "lazy" if lazy else "eager"
+    )
+    widths = variant_widths(filename)
+    if widths is None:
+        return img
+
+    # Mały obraz ma kilka wariantów tej samej szerokości - wystarczy pierwszy
+    variants = {}
+    for variant in VARIANTS:
+        variants.setdefault(widths[variant], variant)
+    sources = []
+    for ext, mime, _ in available_formats():
+        srcset = ", ".join(
+            f"{_picture_url(variant_filename(filename, variant, ext))} {width}w"
+            for width, variant in variants.items()
+        )
+        sources.append(
+            Markup('<source type="{}" srcset="{}" sizes="{}">').format(mime, srcset, sizes)
+        )
+    # display: contents - <picture> nie zmienia układu, klasy <img> działają jak wcześniej
+    return Markup('<picture style="display: contents">{}{}</picture>').format(
+        Markup("").join(sources), img
+    )
+
+
+def og_image_url(filename):
+    """Pełny adres obrazu dla podglądu linków (og:image)."""
+    if has_variants(filename):
+        filename = variant_filename(filename, "og", "jpg")
+    return url_for("static", filename="post_pics/" + filename, _external=True)
+
+
+app.jinja_env.globals["responsive_image"] = responsive_image
+app.jinja_env.globals["og_image_url"] = og_image_url
+
+
+# --- Komendy CLI ---
+def _move_legacy_originals():
+    moved = move_legacy_originals()
+    if moved:
+        click.echo(f"Przeniesiono {moved} oryginałów do {ORIGINALS_DIR}.")
+
+
+@app.cli.command("image-worker")
+@click.option("--processes", default=None, type=int, help="Liczba procesów (domyślnie liczba rdzeni).")
+@click.option("--interval", default=5.0, show_default=True, help="Przerwa (s), gdy nie ma nowych obrazów.")
+@click.option("--once", is_flag=True, help="Przetwórz oczekujące obrazy i zakończ.")
+def image_worker_command(processes, interval, once):
+    """Generuje warianty przesłanych obrazów."""
+    click.echo("Uruchamiam worker przetwarzania obrazów.")
+    _move_legacy_originals()
+    ready, failed = run_worker(processes=processes, interval=interval, once=once)
+    click.echo(f"Przetworzono {ready} obrazów, nieudanych: {failed}.")
+
+
+@app.cli.command("reprocess-images")
+@click.option("--processes", default=None, type=int, help="Liczba procesów (domyślnie liczba rdzeni).")
+def reprocess_images_command(processes):
+    """Generuje ponownie warianty wszystkich obrazów w static/post_pics."""
+    _move_legacy_originals()
+    filenames = stored_pictures()
+    click.echo(f"Przetwarzanie {len(filenames)} obrazów...")
+    with _executor(processes) as executor:
+        ready, failed = process_files(filenames, executor)
+    set_status(ready, "ready")
+    click.echo(f"Gotowe: {len(ready)}, nieudane: {len(failed)}.")
+    for filename in failed:
+        click.echo(f"  {filename}")
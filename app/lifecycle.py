@@ -0,0 +1,87 @@
+# app/lifecycle.py
+
+from sqlalchemy import delete, select
+
+from app import db
+from app.http_cache import touch_tournaments
+from app.media import release_on_commit
+from app.models import Post, Tournament, TournamentRegistration, TournamentWinner, User
+from app.registrations import recount_registrations
+from app.search import unindex
+
+# --- Usuwanie danych ---
+# Wiersze usuwane są partiami po CHUNK_SIZE, a każda partia to osobna, krótka
+# transakcja - usunięcie milionów wierszy nie blokuje tabel na długo.
+# Wiersze zależne usuwane są jawnie przed rodzicem: klucze obce mają
+# ON DELETE CASCADE, ale SQLite wymusza je tylko przy PRAGMA foreign_keys=ON.
+
+CHUNK_SIZE = 1000
+
+# Klucze obce wskazujące na model - te wiersze trzeba usunąć razem z nim
+CHILDREN = {
+    User: (Post.user_id, TournamentRegistration.user_id, TournamentWinner.user_id),
+    Tournament: (TournamentRegistration.tournament_id, TournamentWinner.tournament_id),
+}
+# Co zwraca DELETE ... RETURNING: pliki obrazów do zwolnienia albo turnieje,
+# którym trzeba przeliczyć liczbę zapisów lub zmienić wersję (podium)
+RETURNING = {
+    Post: Post.image_file,
+    Tournament: Tournament.banner_image,
+    TournamentRegistration: TournamentRegistration.tournament_id,
+    TournamentWinner: TournamentWinner.tournament_id,
+}
+
+
+def _delete_ids(model, ids, counts):
+    stmt = delete(model).where(model.id.in_(ids))
+    returning = RETURNING.get(model)
+    if returning is None:
+        deleted = db.session.execute(stmt).rowcount
+    else:
+        values = db.session.execute(stmt.returning(returning)).scalars().all()
+        deleted = len(values)
+        if model is TournamentRegistration:
+            recount_registrations(set(values))
+        elif model is TournamentWinner:
+            touch_tournaments(set(values))
+        else:
+            release_on_commit(values)
+    # Usuwanie z pominięciem sesji ORM - indeks wyszukiwania trzeba poprawić ręcznie
+    unindex(model, ids)
+    table = model.__tablename__
+    counts[table] = counts.get(table, 0) + deleted
+
+
+def delete_rows(model, *criteria, chunk_size=CHUNK_SIZE, commit=True, counts=None):
+    """Usuwa wiersze `model` spełniające `criteria` razem z wierszami zależnymi.
+
+    Zwraca liczbę usuniętych wierszy w każdej tabeli, np. {"post": 3}.
+    Z `commit=False` wszystko dzieje się w bieżącej transakcji wywołującego
+    (np. akcja hurtowa na kilkudziesięciu wierszach).
+    """
+    counts = {} if counts is None else counts
+    while True:
+        ids = db.session.scalars(
+            select(model.id).where(*criteria).order_by(model.id).limit(chunk_size)
+        ).all()
+        if not ids:
+            break
+        for foreign_key in CHILDREN.get(model, ()):
+            delete_rows(
+                foreign_key.class_,
+                foreign_key.in_(ids),
+                chunk_size=chunk_size,
+                commit=commit,
+                counts=counts,
+            )
+        _delete_ids(model, ids, counts)
+        if commit:
+            db.session.commit()
+        if len(ids) < chunk_size:
+            break
+    return counts
+
+
+def delete_user(user_id, commit=True):
+    """Usuwa konto razem z postami, zapisami i miejscami na podium."""
+    return delete_rows(User, User.id == user_id, commit=commit)
@@ -0,0 +1,182 @@
+# app/mail_queue.py
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import click
+from flask_mail import Message
+from sqlalchemy import and_, or_, update
+
+from app import app, db, mail
+from app.metrics import timed
+from app.models import OutboundEmail
+
+
+# --- Dodawanie wiadomości do kolejki ---
+@timed("mail")
+def enqueue_email(subject, recipients, text_body, html_body=None, sender=None):
+    """Zapisuje wiadomość w kolejce. Żądanie HTTP nie czeka na serwer SMTP."""
+    email = OutboundEmail(
+        subject=subject,
+        sender=sender,
+        recipients=json.dumps(list(recipients)),
+        text_body=text_body,
+        html_body=html_body,
+    )
+    db.session.add(email)
+    db.session.commit()
+    return email
+
+
+# --- Pobieranie wiadomości do wysyłki ---
+def claim_batch(limit):
+    """Rezerwuje maksymalnie `limit` wiadomości gotowych do wysyłki.
+
+    Rezerwacja to warunkowy UPDATE, więc kilka wątków lub procesów
+    nie wyśle tej samej wiadomości dwa razy.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=app.config["MAIL_QUEUE_LOCK_TIMEOUT"])
+    ready = or_(
+        and_(
+            OutboundEmail.status == "pending",
+            OutboundEmail.next_attempt_at <= now,
+        ),
+        # Wiadomości porzucone przez worker, który przestał działać
+        and_(
+            OutboundEmail.status == "sending",
+            OutboundEmail.locked_at < stale_before,
+        ),
+    )
+    candidate_ids = [
+        row.id
+        for row in db.session.query(OutboundEmail.id)
+        .filter(ready)
+        .order_by(OutboundEmail.id)
+        .limit(limit)
+    ]
+
+    claimed_ids = []
+    for email_id in candidate_ids:
+        result = db.session.execute(
+            update(OutboundEmail)
+            .where(OutboundEmail.id == email_id, ready)
+            .values(status="sending", locked_at=now)
+        )
+        if result.rowcount == 1:
+            claimed_ids.append(email_id)
+    db.session.commit()
+
+    if not claimed_ids:
+        return []
+    return (
+        OutboundEmail.query.filter(OutboundEmail.id.in_(claimed_ids))
+        .order_by(OutboundEmail.id)
+        .all()
+    )
+
+
+def _build_message(email):
+    msg = Message(
+        email.subject,
+        sender=email.sender or app.config["MAIL_DEFAULT_SENDER"],
+        recipients=json.loads(email.recipients),
+    )
+    msg.body = email.text_body
+    msg.html = email.html_body
+    return msg
+
+
+def _mark_failed(email, error):
+    email.attempts += 1
+    email.locked_at = None
+    email.last_error = str(error)[:1000]
+    if email.attempts >= app.config["MAIL_QUEUE_MAX_ATTEMPTS"]:
+        email.status = "failed"
+        app.logger.error(
+            f"Nie udało się wysłać maila {email.id} po {email.attempts} próbach: {error}"
+        )
+    else:
+        # Wykładniczy backoff: 30 s, 60 s, 120 s, ...
+        delay = app.config["MAIL_QUEUE_BACKOFF_SECONDS"] * 2 ** (email.attempts - 1)
+        email.status = "pending"
+        email.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+
+# --- Wysyłka ---
+def drain_queue(batch_size=None):
+    """Wysyła jedną partię wiadomości przez jedno połączenie SMTP.
+
+    Zwraca krotkę (wysłane, nieudane).
+    """
+    emails = claim_batch(batch_size or app.config["MAIL_QUEUE_BATCH_SIZE"])
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    try:
+        # Jedno połączenie (i jeden handshake TLS) na całą partię
+        with mail.connect() as connection:
+            for email in emails:
+                try:
+                    connection.send(_build_message(email))
+                except Exception as e:
+                    _mark_failed(email, e)
+                    failed += 1
+                else:
+                    email.status = "sent"
+                    email.sent_at = datetime.utcnow()
+                    email.locked_at = None
+                    sent += 1
+                db.session.commit()
+    except Exception as e:
+        # Nie udało się połączyć z serwerem SMTP - ponawiamy całą resztę partii
+        app.logger.error(f"Błąd połączenia z serwerem SMTP: {e}")
+        for email in emails:
+            if email.status == "sending":
+                _mark_failed(email, e)
+                failed += 1
+        db.session.commit()
+    return sent, failed
+
+
+def _drain_in_context(batch_size):
+    with app.app_context():
+        return drain_queue(batch_size)
+
+
+def run_worker(workers=2, interval=5.0, once=False, batch_size=None):
+    """Opróżnia kolejkę pulą wątków; każdy wątek ma własne połączenie SMTP."""
+    total_sent = total_failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            results = list(
+                executor.map(_drain_in_context, [batch_size] * workers)
+            )
+            sent = sum(r[0] for r in results)
+            failed = sum(r[1] for r in results)
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                app.logger.info(f"Kolejka maili: wysłano {sent}, nieudane {failed}")
+                continue
+            if once:
+                return total_sent, total_failed
+            time.sleep(interval)
+
+
+# --- Komenda CLI uruchamiająca worker kolejki ---
+@app.cli.command("mail-worker")
+@click.option("--workers", default=2, show_default=True, help="Liczba wątków wysyłających.")
+@click.option("--interval", default=5.0, show_default=True, help="Przerwa (s), gdy kolejka jest pusta.")
+@click.option("--batch-size", default=None, type=int, help="Liczba maili na jedno połączenie SMTP.")
+@click.option("--once", is_flag=True, help="Opróżnij kolejkę i zakończ.")
+def mail_worker_command(workers, interval, batch_size, once):
+    """Wysyła maile oczekujące w kolejce."""
+    click.echo(f"Uruchamiam worker kolejki maili ({workers} wątki).")
+    sent, failed = run_worker(
+        workers=workers, interval=interval, once=once, batch_size=batch_size
+    )
+    click.echo(f"Wysłano {sent} wiadomości, nieudanych prób: {failed}.")
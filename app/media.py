@@ -0,0 +1,244 @@
+# app/media.py
+
+import os
+import time
+from glob import escape, glob
+
+import click
+from sqlalchemy import event, func, select, union_all
+
+from app import app, db, images
+from app.models import Post, Tournament
+
+# Obrazy, których nigdy nie usuwamy
+PROTECTED = {"default"}
+
+
+def digest_of(name):
+    """Wspólny przedrostek pliku głównego, wariantów i oryginału (skrót treści)."""
+    return os.path.splitext(name)[0].split("-")[0]
+
+
+# --- Referencje z bazy ---
+def reference_counts(filenames=None, connection=None):
+    """Liczba postów i turniejów odwołujących się do każdego pliku."""
+    names = union_all(
+        select(Post.image_file.label("name")),
+        select(Tournament.banner_image.label("name")),
+    ).subquery()
+    stmt = select(names.c.name, func.count()).group_by(names.c.name)
+    if filenames is not None:
+        stmt = stmt.where(names.c.name.in_(filenames))
+    return dict((connection or db.session).execute(stmt).all())
+
+
+# --- Pliki na dysku ---
+def picture_paths(digest):
+    pictures_dir = escape(images.PICTURES_DIR)
+    patterns = [
+        os.path.join(pictures_dir, escape(digest) + ".*"),
+        os.path.join(pictures_dir, escape(digest) + "-*"),
+        os.path.join(escape(images.ORIGINALS_DIR), escape(digest) + ".*"),
+    ]
+    return [path for pattern in patterns for path in glob(pattern)]
+
+
+def files_by_digest():
+    """Wszystkie pliki z post_pics pogrupowane wg skrótu: {skrót: [(ścieżka, rozmiar, mtime)]}."""
+    groups = {}
+    for directory in (images.PICTURES_DIR, images.ORIGINALS_DIR):
+        if not os.path.isdir(directory):
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                groups.setdefault(digest_of(entry.name), []).append(
+                    (entry.path, stat.st_size, stat.st_mtime)
+                )
+    return groups
+
+
+def _remove(digest, paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    images.forget_variants(digest)
+
+
+# --- Zwalnianie i odśmiecanie ---
+def release_pictures(filenames, connection=None):
+    """Usuwa pliki obrazów, do których nie odwołuje się już żaden rekord.
+
+    Pliki użyte w ciągu MEDIA_GC_GRACE_SECONDS są pomijane - ten sam obraz
+    mógł właśnie zostać przesłany do innego, jeszcze niezapisanego posta.
+    Takie pliki usunie później `flask media-gc`. Zwraca usunięte skróty.
+    """
+    candidates = {name for name in filenames if digest_of(name) not in PROTECTED}
+    if not candidates:
+        return []
+    counts = reference_counts(candidates, connection)
+    used_after = time.time() - app.config["MEDIA_GC_GRACE_SECONDS"]
+
+    removed = []
+    for name in candidates:
+        if counts.get(name):
+            continue
+        digest = digest_of(name)
+        paths = picture_paths(digest)
+        if any(os.path.getmtime(path) > used_after for path in paths):
+            continue
+        _remove(digest, paths)
+        removed.append(digest)
+    return removed
+
+
+def collect_garbage(min_age=None, dry_run=False):
+    """Usuwa osierocone obrazy. Zwraca listę (skrót, liczba bajtów)."""
+    if min_age is None:
+        min_age = app.config["MEDIA_GC_GRACE_SECONDS"]
+    referenced = {digest_of(name) for name in reference_counts()}
+    used_after = time.time() - min_age
+
+    removed = []
+    for digest, files in sorted(files_by_digest().items()):
+        if digest in referenced or digest in PROTECTED:
+            continue
+        if any(mtime > used_after for _, _, mtime in files):
+            continue
+        if not dry_run:
+            _remove(digest, [path for path, _, _ in files])
+        removed.append((digest, sum(size for _, size, _ in files)))
+    return removed
+
+
+def storage_stats():
+    groups = files_by_digest()
+    counts = {}
+    for name, count in reference_counts().items():
+        digest = digest_of(name)
+        counts[digest] = counts.get(digest, 0) + count
+
+    stats = {
+        "pictures": len(groups),
+        "files": sum(len(files) for files in groups.values()),
+        "bytes": 0,
+        "original_bytes": 0,
+        "references": sum(counts.values()),
+        "shared": 0,
+        "deduplicated_bytes": 0,
+        "orphans": 0,
+        "orphan_bytes": 0,
+        "missing": len(set(counts) - set(groups) - PROTECTED),
+    }
+    for digest, files in groups.items():
+        size = sum(file_size for _, file_size, _ in files)
+        stats["bytes"] += size
+        stats["original_bytes"] += sum(
+            file_size
+            for path, file_size, _ in files
+            if os.path.dirname(path) == images.ORIGINALS_DIR
+        )
+        references = counts.get(digest, 0)
+        if references > 1:
+            # Bez deduplikacji każdy post miałby własną kopię plików
+            stats["shared"] += 1
+            stats["deduplicated_bytes"] += (references - 1) * size
+        elif references == 0 and digest not in PROTECTED:
+            stats["orphans"] += 1
+            stats["orphan_bytes"] += size
+    return stats
+
+
+# --- Zwalnianie plików po commicie ---
+def _released(session):
+    return session.info.setdefault("released_pictures", set())
+
+
+def release_on_commit(filenames, session=None):
+    """Zwalnia pliki po commicie - dla hurtowych DELETE, które omijają flush."""
+    _released(session or db.session).update(filenames)
+
+
+@event.listens_for(db.session, "before_flush")
+def collect_deleted(session, flush_context, instances):
+    # before_flush - usuwane rekordy można jeszcze doczytać z bazy
+    for obj in session.deleted:
+        if isinstance(obj, Post):
+            _released(session).add(obj.image_file)
+        elif isinstance(obj, Tournament):
+            _released(session).add(obj.banner_image)
+
+
+def collect_replaced(target, value, oldvalue, initiator):
+    session = db.inspect(target).session
+    if session is not None and isinstance(oldvalue, str) and oldvalue != value:
+        _released(session).add(oldvalue)
+
+
+# active_history - poprzednia nazwa pliku jest doczytywana, nawet gdy
+# atrybut wygasł po commicie
+for attribute in (Post.image_file, Tournament.banner_image):
+    event.listen(attribute, "set", collect_replaced, active_history=True)
+
+
+@event.listens_for(db.session, "after_commit")
+def release_committed(session):
+    released = session.info.pop("released_pictures", None)
+    if not released:
+        return
+    try:
+        # Sesja po commicie nie może wykonywać zapytań - osobne połączenie
+        with db.engine.connect() as connection:
+            release_pictures(released, connection)
+    except Exception as e:
+        app.logger.error(f"Nie udało się usunąć nieużywanych obrazów: {e}")
+
+
+@event.listens_for(db.session, "after_rollback")
+def discard_released(session):
+    session.info.pop("released_pictures", None)
+
+
+# --- Komendy CLI ---
+def _format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+@app.cli.command("media-gc")
+@click.option("--min-age", default=None, type=int, help="Pomijaj pliki młodsze niż tyle sekund (domyślnie MEDIA_GC_GRACE_SECONDS).")
+@click.option("--dry-run", is_flag=True, help="Tylko pokaż, co zostałoby usunięte.")
+def media_gc_command(min_age, dry_run):
+    """Usuwa obrazy, do których nie odwołuje się żaden post ani turniej."""
+    images.move_legacy_originals()
+    removed = collect_garbage(min_age=min_age, dry_run=dry_run)
+    for digest, size in removed:
+        click.echo(f"  {digest} ({_format_size(size)})")
+    action = "Do usunięcia" if dry_run else "Usunięto"
+    total = sum(size for _, size in removed)
+    click.echo(f"{action}: {len(removed)} obrazów, {_format_size(total)}.")
+
+
+@app.cli.command("media-stats")
+def media_stats_command():
+    """Pokazuje statystyki przechowywanych obrazów."""
+    stats = storage_stats()
+    click.echo(f"Obrazy:                 {stats['pictures']} ({stats['files']} plików)")
+    click.echo(f"Rozmiar:                {_format_size(stats['bytes'])}")
+    click.echo(f"  w tym oryginały:      {_format_size(stats['original_bytes'])}")
+    click.echo(f"Odwołania z bazy:       {stats['references']}")
+    click.echo(
+        f"Obrazy współdzielone:   {stats['shared']} "
+        f"(zaoszczędzono {_format_size(stats['deduplicated_bytes'])})"
+    )
+    click.echo(
+        f"Osierocone:             {stats['orphans']} ({_format_size(stats['orphan_bytes'])})"
+    )
+    click.echo(f"Brakujące pliki:        {stats['missing']}")
@@ -0,0 +1,389 @@
+# app/metrics.py
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from blinker import Namespace
+from flask import (
+    g,
+    has_request_context,
+    request,
+    template_rendered,
+    before_render_template,
+)
+from flask.logging import wsgi_errors_stream
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import app
+
+# --- Pomiar czasu żądań ---
+# Dla każdego żądania zbierana jest liczba zapytań SQL i czas spędzony w bazie,
+# w szablonach, przy obrazach i mailach. Wyniki trafiają do nagłówka
+# Server-Timing, do logu (jedna linia JSON na żądanie) i do /metrics.
+
+PHASES = ("db", "render", "image", "mail", "password")
+PHASE_DESCRIPTIONS = {
+    "db": "SQL",
+    "render": "Jinja",
+    "image": "Obrazy",
+    "mail": "Mail",
+    "password": "Hasła",
+}
+# Progi histogramu czasu odpowiedzi (sekundy)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Log żądań ma własny logger i handler: app.logger bez konfiguracji przepuszcza
+# tylko WARNING, a linie JSON nie powinny mieć prefiksu formatu Flaska
+request_logger = logging.getLogger("ipba.requests")
+if app.config["REQUEST_LOG_ENABLED"] and not request_logger.handlers:
+    _request_log_handler = logging.StreamHandler(wsgi_errors_stream)
+    _request_log_handler.setFormatter(logging.Formatter("%(message)s"))
+    request_logger.addHandler(_request_log_handler)
+    request_logger.setLevel(logging.INFO)
+    request_logger.propagate = False
+
+
+def _timings():
+    """Liczniki bieżącego żądania albo None poza żądaniem (np. w workerach)."""
+    if not has_request_context():
+        return None
+    return g.get("timings")
+
+
+def record(phase, seconds, count=1):
+    timings = _timings()
+    if timings is None:
+        return
+    total, calls = timings.get(phase, (0.0, 0))
+    timings[phase] = (total + seconds, calls + count)
+
+
+@contextmanager
+def timed(phase):
+    """Dolicza czas bloku (albo funkcji, jako dekorator) do fazy żądania."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+
+
+# --- SQL ---
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_started"].pop()
+    record("db", duration)
+    _audit(statement, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _query_failed(context):
+    if context.connection is not None and context.connection.info.get("query_started"):
+        started = context.connection.info["query_started"].pop()
+        record("db", time.perf_counter() - started)
+
+
+# --- N+1 i wolne zapytania ---
+# Zapytania o tym samym kształcie (treść SQL bez wartości parametrów)
+# powtarzane w jednym żądaniu to zwykle leniwe ładowanie relacji w pętli
+# szablonu. Dla każdego takiego kształtu i dla każdego wolnego zapytania
+# zapisywane jest miejsce wywołania: linia szablonu i linia kodu aplikacji.
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_WHITESPACE = re.compile(r"\s+")
+# Lista parametrów IN (?, ?, ?) ma różną długość - liczy się jako jeden kształt
+_PARAM_LIST = re.compile(
+    r"\((?:\s*(?:\?|%s|%\(\w+\)s)\s*,)+\s*(?:\?|%s|%\(\w+\)s)\s*\)"
+)
+
+
+def query_shape(statement):
+    return _PARAM_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def query_origin():
+    """Miejsce wykonania zapytania, np. "app/models.py:120 <- index.html:34"."""
+    locations = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        template = frame.f_globals.get("__jinja_template__")
+        filename = frame.f_code.co_filename
+        if template is not None:
+            line = template.get_corresponding_lineno(frame.f_lineno)
+            locations.append(f"{template.name or '<string>'}:{line}")
+            break
+        if not locations and filename.startswith(_APP_DIR) and filename != __file__:
+            path = os.path.relpath(filename, os.path.dirname(_APP_DIR))
+            locations.append(f"{path}:{frame.f_lineno}")
+        frame = frame.f_back
+    return " <- ".join(locations) or "?"
+
+
+def _audit(statement, duration):
+    if _timings() is None or not app.config["QUERY_AUDIT_ENABLED"]:
+        return
+    shapes = g.setdefault("query_shapes", {})
+    shape = query_shape(statement)
+    count, origin = shapes.get(shape, (0, None))
+    if count == 1:
+        # Pierwsze powtórzenie - dalsze zwykle pochodzą z tej samej pętli
+        origin = query_origin()
+    shapes[shape] = (count + 1, origin)
+    if duration * 1000 >= app.config["SLOW_QUERY_MS"]:
+        g.setdefault("slow_queries", []).append((shape, duration, query_origin()))
+
+
+def query_report():
+    """Podsumowanie zapytań bieżącego żądania (wywoływane po jego obsłużeniu)."""
+    shapes = g.get("query_shapes", {})
+    return {
+        "endpoint": request.endpoint or "none",
+        "path": request.path,
+        "queries": sum(count for count, _ in shapes.values()),
+        # kształt -> (liczba wykonań, miejsce wywołania)
+        "repeated": {shape: entry for shape, entry in shapes.items() if entry[0] > 1},
+        # (kształt, czas w sekundach, miejsce wywołania)
+        "slow": g.get("slow_queries", []),
+    }
+
+
+def _log_query_problems(report):
+    threshold = app.config["QUERY_REPEAT_THRESHOLD"]
+    for shape, (count, origin) in report["repeated"].items():
+        if count >= threshold:
+            registry.count_problem(report["endpoint"], "n_plus_one")
+            app.logger.warning(
+                f"Możliwe N+1: {count} razy to samo zapytanie w {report['endpoint']} "
+                f"({origin}): {shape[:300]}"
+            )
+    for shape, duration, origin in report["slow"]:
+        registry.count_problem(report["endpoint"], "slow_query")
+        app.logger.warning(
+            f"Wolne zapytanie ({duration * 1000:.0f} ms) w {report['endpoint']} "
+            f"({origin}): {shape[:300]}"
+        )
+
+
+# Sygnał z raportem zapytań po każdym żądaniu (używa go fixture query_budget)
+_signals = Namespace()
+request_measured = _signals.signal("request-measured")
+
+
+# --- Szablony ---
+# Szablony bywają zagnieżdżone (fragmenty z cache renderowane w widoku), więc
+# liczony jest tylko czas najbardziej zewnętrznego renderowania. Zawiera on
+# zapytania wykonane z szablonu (leniwe ładowanie relacji).
+@before_render_template.connect_via(app)
+def _render_started(sender, template, context, **extra):
+    if _timings() is None:
+        return
+    g.render_stack = g.get("render_stack", []) + [time.perf_counter()]
+
+
+@template_rendered.connect_via(app)
+def _render_finished(sender, template, context, **extra):
+    if _timings() is None or not g.get("render_stack"):
+        return
+    started = g.render_stack.pop()
+    if not g.render_stack:
+        record("render", time.perf_counter() - started)
+
+
+# --- Agregacja ---
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        + "}"
+    )
+
+
+class MetricsRegistry:
+    """Liczniki i histogramy w pamięci procesu.
+
+    Każdy worker gunicorna ma własne liczniki - Prometheus sumuje je przy
+    odpytywaniu wszystkich workerów (albo trzeba odpytywać każdy osobno).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._requests = {}
+        self._latency = {}
+        self._phases = {}
+        self._problems = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, method, status, duration, timings):
+        with self._lock:
+            key = (endpoint, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            histogram = self._latency.setdefault(
+                endpoint, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            )
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += duration
+            histogram["count"] += 1
+
+            for phase, (seconds, calls) in timings.items():
+                total, count = self._phases.get((endpoint, phase), (0.0, 0))
+                self._phases[(endpoint, phase)] = (total + seconds, count + calls)
+
+    def count_problem(self, endpoint, kind):
+        with self._lock:
+            self._problems[(endpoint, kind)] = (
+                self._problems.get((endpoint, kind), 0) + 1
+            )
+
+    def clear(self):
+        with self._lock:
+            self._requests.clear()
+            self._latency.clear()
+            self._phases.clear()
+            self._problems.clear()
+
+    def render(self, extra=()):
+        """Metryki w formacie tekstowym Prometheusa."""
+        lines = [
+            "# HELP ipba_http_requests_total Liczba obsłużonych żądań.",
+            "# TYPE ipba_http_requests_total counter",
+        ]
+        with self._lock:
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                labels = _labels(endpoint=endpoint, method=method, status=status)
+                lines.append(f"ipba_http_requests_total{labels} {count}")
+
+            lines += [
+                "# HELP ipba_http_request_duration_seconds Czas obsługi żądania.",
+                "# TYPE ipba_http_request_duration_seconds histogram",
+            ]
+            for endpoint, histogram in sorted(self._latency.items()):
+                for bound, count in zip(self.buckets, histogram["buckets"]):
+                    labels = _labels(endpoint=endpoint, le=bound)
+                    lines.append(
+                        f"ipba_http_request_duration_seconds_bucket{labels} {count}"
+                    )
+                labels = _labels(endpoint=endpoint, le="+Inf")
+                lines.append(
+                    f"ipba_http_request_duration_seconds_bucket{labels} {histogram['count']}"
+                )
+                labels = _labels(endpoint=endpoint)
+                lines.append(
+                    f"ipba_http_request_duration_seconds_sum{labels} {histogram['sum']:.6f}"
+                )
+                lines.append(
+                    f"ipba_http_request_duration_seconds_count{labels} {histogram['count']}"
+                )
+
+            lines += [
+                "# HELP ipba_phase_seconds_total Czas spędzony w bazie, szablonach, obrazach i mailach.",
+                "# TYPE ipba_phase_seconds_total counter",
+            ]
+            lines += [
+                f"ipba_phase_seconds_total{_labels(endpoint=endpoint, phase=phase)} {seconds:.6f}"
+                for (endpoint, phase), (seconds, _) in sorted(self._phases.items())
+            ]
+            lines += [
+                "# HELP ipba_phase_calls_total Liczba zapytań SQL, renderowań, obrazów i maili.",
+                "# TYPE ipba_phase_calls_total counter",
+            ]
+            lines += [
+                f"ipba_phase_calls_total{_labels(endpoint=endpoint, phase=phase)} {calls}"
+                for (endpoint, phase), (_, calls) in sorted(self._phases.items())
+            ]
+            lines += [
+                "# HELP ipba_query_problems_total Wykryte N+1 i wolne zapytania.",
+                "# TYPE ipba_query_problems_total counter",
+            ]
+            lines += [
+                f"ipba_query_problems_total{_labels(endpoint=endpoint, kind=kind)} {count}"
+                for (endpoint, kind), count in sorted(self._problems.items())
+            ]
+        lines += extra
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def cache_metrics(stats):
+    """Trafienia i chybienia cache fragmentów (FragmentCache.stats())."""
+    lines = [
+        "# HELP ipba_fragment_cache_total Odczyty cache fragmentów stron.",
+        "# TYPE ipba_fragment_cache_total counter",
+    ]
+    for region, counts in sorted(stats.items()):
+        for result in ("hits", "misses"):
+            labels = _labels(region=region, result=result)
+            lines.append(f"ipba_fragment_cache_total{labels} {counts[result]}")
+    return lines
+
+
+# --- Haki żądania ---
+def server_timing(timings, duration):
+    parts = []
+    for phase in PHASES:
+        if phase in timings:
+            seconds, calls = timings[phase]
+            description = f"{PHASE_DESCRIPTIONS[phase]} ({calls})"
+            parts.append(f'{phase};desc="{description}";dur={seconds * 1000:.2f}')
+    parts.append(f"total;dur={duration * 1000:.2f}")
+    return ", ".join(parts)
+
+
+@app.before_request
+def _start_timer():
+    # g może żyć dłużej niż żądanie (kontekst aplikacji otwarty np. w testach)
+    g.timings = {}
+    g.query_shapes = {}
+    g.slow_queries = []
+    g.render_stack = []
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _finish_timer(response):
+    timings = _timings()
+    if timings is None or "request_started" not in g:
+        return response
+    duration = time.perf_counter() - g.request_started
+    endpoint = request.endpoint or "none"
+
+    registry.observe(endpoint, request.method, response.status_code, duration, timings)
+    if app.config["SERVER_TIMING_ENABLED"]:
+        response.headers["Server-Timing"] = server_timing(timings, duration)
+    if app.config["REQUEST_LOG_ENABLED"]:
+        entry = {
+            "method": request.method,
+            "path": request.path,
+            "endpoint": endpoint,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 2),
+        }
+        for phase, (seconds, calls) in timings.items():
+            entry[f"{phase}_ms"] = round(seconds * 1000, 2)
+            entry[f"{phase}_count"] = calls
+        request_logger.info(json.dumps(entry))
+
+    report = query_report()
+    _log_query_problems(report)
+    request_measured.send(app, report=report)
+    return response
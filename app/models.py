@@ -1,11 +1,84 @@
 # app/models.py
 
 from datetime import datetime, timedelta
+from html.parser import HTMLParser
 from app import db, login_manager, s
 from flask_login import UserMixin
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import joinedload, validates
 from itsdangerous import SignatureExpired, BadTimeSignature
 
 
+# Długość zajawek na listach postów i turniejów
+POST_EXCERPT_LENGTH = 150
+TOURNAMENT_EXCERPT_LENGTH = 200
+
+
+class _TextExtractor(HTMLParser):
+    # Znaczniki blokowe rozdzielają słowa (np. </p><p>), inne (np. <b>) nie
+    BLOCK_TAGS = {
+        "p", "br", "div", "li", "ul", "ol", "blockquote",
+        "h1", "h2", "h3", "h4", "h5", "h6",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self.BLOCK_TAGS:
+            self.parts.append(" ")
+
+
+def plain_text(html):
+    """Treść HTML jako zwykły tekst z pojedynczymi spacjami między słowami."""
+    parser = _TextExtractor()
+    parser.feed(html or "")
+    parser.close()
+    return " ".join("".join(parser.parts).split())
+
+
+def plain_excerpt(html, length):
+    """Początek treści jako zwykły tekst, skrócony do `length` znaków po całym słowie."""
+    text = plain_text(html)
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0].rstrip(" ,.;:-") + "…"
+
+
+def normalize_identity(value):
+    """E-mail lub nazwa użytkownika w postaci porównywanej bez wielkości liter."""
+    return (value or "").strip().lower()
+
+
+def user_search_document(username, email, first_name, last_name):
+    """Tekst przeszukiwany w PostgreSQL; to samo wyrażenie co w indeksie trigramowym."""
+    return db.func.lower(
+        username + " " + email + " " + first_name + " " + last_name
+    )
+
+
+def search_vector(title_terms, body_terms):
+    """tsvector przeszukiwany w PostgreSQL; to samo wyrażenie co w indeksie GIN.
+
+    Słowa w kolumnach są już sprowadzone do rdzeni (app.search), więc
+    wystarcza konfiguracja "simple". Słowa z tytułu mają wyższą wagę.
+    """
+    config = db.literal_column("'simple'::regconfig")
+    return db.func.setweight(
+        db.func.to_tsvector(config, title_terms), db.literal_column("'A'")
+    ).op("||")(
+        db.func.setweight(db.func.to_tsvector(config, body_terms), db.literal_column("'B'"))
+    )
+
+
 @login_manager.user_loader
 def load_user(user_id):
     return db.session.get(User, int(user_id))
@@ -22,6 +95,10 @@ class User(db.Model, UserMixin):
     last_name = db.Column(db.String(30), nullable=False)
     email_verified = db.Column(db.Boolean, nullable=False, default=False)
     username_last_changed = db.Column(db.DateTime, nullable=True)
+    # Nazwa i e-mail po normalize_identity - unikalne bez względu na wielkość
+    # liter; po nich szukają logowanie i walidatory (app.queries.find_user)
+    username_lower = db.Column(db.String(20), nullable=False)
+    email_lower = db.Column(db.String(120), nullable=False)
 
     registrations = db.relationship(
         "TournamentRegistration",
@@ -30,6 +107,29 @@ class User(db.Model, UserMixin):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        db.UniqueConstraint("username_lower", name="uq_user_username_lower"),
+        db.UniqueConstraint("email_lower", name="uq_user_email_lower"),
+        # Wyszukiwanie w panelu admina (app.queries.user_search_filter):
+        # PostgreSQL - indeks trigramowy (dowolny fragment tekstu),
+        # SQLite - indeksy na lower() dla wyszukiwania po początku
+        db.Index(
+            "ix_user_search_trgm",
+            user_search_document(username, email, first_name, last_name).label("document"),
+            postgresql_using="gin",
+            postgresql_ops={"document": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        db.Index("ix_user_lower_username", db.func.lower(username)).ddl_if(dialect="sqlite"),
+        db.Index("ix_user_lower_email", db.func.lower(email)).ddl_if(dialect="sqlite"),
+        db.Index("ix_user_lower_first_name", db.func.lower(first_name)).ddl_if(dialect="sqlite"),
+        db.Index("ix_user_lower_last_name", db.func.lower(last_name)).ddl_if(dialect="sqlite"),
+    )
+
+    @validates("username", "email")
+    def _update_identity(self, key, value):
+        setattr(self, f"{key}_lower", normalize_identity(value))
+        return value
+
     def generate_token(self, salt):
         return s.dumps(self.email, salt=salt)
 
@@ -39,7 +139,7 @@ class User(db.Model, UserMixin):
             email = s.loads(token, salt=salt, max_age=expiration)
         except (SignatureExpired, BadTimeSignature):
             return None
-        return User.query.filter_by(email=email).first()
+        return User.query.filter_by(email_lower=normalize_identity(email)).first()
 
     def __repr__(self):
         return f"User('{self.username}', '{self.email}')"
@@ -51,15 +151,49 @@ class User(db.Model, UserMixin):
         return datetime.utcnow() >= next_change_date
 
 
+# Indeks trigramowy wymaga rozszerzenia pg_trgm
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
 class Post(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     date_posted = db.Column(
-        db.DateTime, nullable=False, default=datetime.utcnow
+        db.DateTime, nullable=False, default=datetime.utcnow, index=True
     )
     content = db.Column(db.Text, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    # Zajawka bez HTML do list - listy nie wczytują pełnej treści (defer)
+    excerpt = db.Column(db.String(255), nullable=False, default="", server_default="")
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     image_file = db.Column(db.String(20), nullable=False, default="default.png")
+    # "pending" do czasu przetworzenia obrazu przez `flask image-worker`
+    image_status = db.Column(
+        db.String(10), nullable=False, default="ready", server_default="ready"
+    )
+    # Zarchiwizowane posty nie są pokazywane na publicznych listach
+    archived = db.Column(
+        db.Boolean, nullable=False, default=False, server_default=db.false()
+    )
+    # Wersja wiersza - z niej liczone są nagłówki ETag/Last-Modified (app.http_cache)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    @validates("content")
+    def _update_excerpt(self, key, content):
+        self.excerpt = plain_excerpt(content, POST_EXCERPT_LENGTH)
+        return content
+
+    @property
+    def display_image(self):
+        """Obraz do wyświetlenia - do czasu przetworzenia domyślny."""
+        return self.image_file if self.image_status == "ready" else "default.png"
 
     def __repr__(self):
         return f"Post('{self.title}', '{self.date_posted}')"
@@ -69,11 +203,26 @@ class Tournament(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=False)
+    excerpt = db.Column(db.String(255), nullable=False, default="", server_default="")
     banner_image = db.Column(db.String(20), nullable=False, default="default.png")
-    start_date = db.Column(db.DateTime, nullable=False)
+    banner_status = db.Column(
+        db.String(10), nullable=False, default="ready", server_default="ready"
+    )
+    start_date = db.Column(db.DateTime, nullable=False, index=True)
     end_date = db.Column(db.DateTime, nullable=True)
     max_players = db.Column(db.Integer, nullable=False)
+    # Zdenormalizowana liczba zapisów, utrzymywana przez app.registrations
+    registered_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
     location = db.Column(db.String(100), nullable=True)
+    archived = db.Column(
+        db.Boolean, nullable=False, default=False, server_default=db.false()
+    )
+    # Wersja wiersza, zmieniana też przy zmianie zapisów i podium (app.http_cache)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
 
     registrations = db.relationship(
         "TournamentRegistration",
@@ -88,20 +237,52 @@ class Tournament(db.Model):
         cascade="all, delete-orphan",
     )
 
+    @property
+    def podium(self):
+        """Zwycięzcy posortowani wg miejsca.
+
+        Listy turniejów wczytują ich hurtowo przez `app.queries.load_podiums`;
+        dla pojedynczego turnieju wykonywane jest jedno zapytanie.
+        """
+        if "_podium" not in self.__dict__:
+            self._podium = (
+                self.winners.options(joinedload(TournamentWinner.user))
+                .order_by(TournamentWinner.placing.asc())
+                .all()
+            )
+        return self._podium
+
+    @validates("description")
+    def _update_excerpt(self, key, description):
+        self.excerpt = plain_excerpt(description, TOURNAMENT_EXCERPT_LENGTH)
+        return description
+
+    @property
+    def display_banner(self):
+        return self.banner_image if self.banner_status == "ready" else "default.png"
+
     def __repr__(self):
         return f"Tournament('{self.title}', '{self.start_date}')"
 
 
 class TournamentRegistration(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
     tournament_id = db.Column(
-        db.Integer, db.ForeignKey("tournament.id"), nullable=False
+        db.Integer, db.ForeignKey("tournament.id", ondelete="CASCADE"), nullable=False
     )
     registration_date = db.Column(
         db.DateTime, nullable=False, default=datetime.utcnow
     )
 
+    __table_args__ = (
+        # Jeden gracz może być zapisany na turniej tylko raz
+        db.UniqueConstraint(
+            "tournament_id", "user_id", name="uq_tournament_registration_tournament_user"
+        ),
+        db.Index("ix_tournament_registration_user_id", "user_id"),
+    )
+
     def __repr__(self):
         return f"Registration('{self.player.username}' to '{self.tournament.title}')"
 
@@ -109,12 +290,97 @@ class TournamentRegistration(db.Model):
 class TournamentWinner(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     placing = db.Column(db.Integer, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
     tournament_id = db.Column(
-        db.Integer, db.ForeignKey("tournament.id"), nullable=False
+        db.Integer, db.ForeignKey("tournament.id", ondelete="CASCADE"), nullable=False
     )
 
     user = db.relationship("User")
 
+    __table_args__ = (
+        db.Index("ix_tournament_winner_tournament_placing", "tournament_id", "placing"),
+        db.Index("ix_tournament_winner_user_id", "user_id"),
+    )
+
     def __repr__(self):
-        return f"Winner(Place: {self.placing}, User: '{self.user.username}', Tournament: '{self.tournament.title}')"
\ No newline at end of file
+        return f"Winner(Place: {self.placing}, User: '{self.user.username}', Tournament: '{self.tournament.title}')"
+
+
+class OutboundEmail(db.Model):
+    """Wiadomość e-mail oczekująca w kolejce na wysyłkę przez `flask mail-worker`."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    sender = db.Column(db.String(120), nullable=True)
+    # Lista adresatów zapisana jako JSON
+    recipients = db.Column(db.Text, nullable=False)
+    text_body = db.Column(db.Text, nullable=True)
+    html_body = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(10), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_outbound_email_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"OutboundEmail('{self.subject}', '{self.status}')"
+
+
+class SearchDocument(db.Model):
+    """Wpis indeksu wyszukiwania (app.search) - jeden na post lub turniej."""
+
+    __tablename__ = "search_document"
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    item_id = db.Column(db.Integer, nullable=False)
+    # Słowa bez polskich znaków, sprowadzone do rdzeni (app.search.terms)
+    title_terms = db.Column(db.Text, nullable=False)
+    body_terms = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("kind", "item_id", name="uq_search_document_item"),
+        # PostgreSQL - indeks GIN na tsvector; SQLite - tabela FTS5 search_fts
+        # (poniżej), aktualizowana wyzwalaczami
+        db.Index(
+            "ix_search_document_vector",
+            search_vector(title_terms, body_terms),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# Tabela FTS5 z zawartością w search_document ("external content") - SQLite
+# przechowuje w niej tylko indeks odwrócony
+SEARCH_FTS_DDL = (
+    "CREATE VIRTUAL TABLE search_fts USING fts5("
+    "title_terms, body_terms, content='search_document', content_rowid='id', "
+    "prefix='2 3')",
+    "CREATE TRIGGER search_document_ai AFTER INSERT ON search_document BEGIN "
+    "INSERT INTO search_fts(rowid, title_terms, body_terms) "
+    "VALUES (new.id, new.title_terms, new.body_terms); END",
+    "CREATE TRIGGER search_document_ad AFTER DELETE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title_terms, body_terms) "
+    "VALUES ('delete', old.id, old.title_terms, old.body_terms); END",
+    "CREATE TRIGGER search_document_au AFTER UPDATE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title_terms, body_terms) "
+    "VALUES ('delete', old.id, old.title_terms, old.body_terms); "
+    "INSERT INTO search_fts(rowid, title_terms, body_terms) "
+    "VALUES (new.id, new.title_terms, new.body_terms); END",
+)
+for statement in SEARCH_FTS_DDL:
+    event.listen(
+        SearchDocument.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    SearchDocument.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS search_fts").execute_if(dialect="sqlite"),
+)
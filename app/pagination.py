@@ -0,0 +1,170 @@
+# app/pagination.py
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from math import ceil
+
+from sqlalchemy import and_, func, or_, select
+
+
+class KeysetPage:
+    """Strona wyników stronicowana kluczem (keyset) zamiast OFFSET.
+
+    Atrybuty i `iter_pages` są zgodne z `Pagination` z Flask-SQLAlchemy,
+    więc `_pagination.html` obsługuje oba rodzaje. Linki "poprzedni"/"następny"
+    zawierają kursor, więc pobranie kolejnej strony kosztuje tyle samo
+    niezależnie od jej numeru.
+    """
+
+    def __init__(self, items, page, per_page, total, next_cursor, prev_cursor):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def pages(self):
+        if self.total is None:
+            return self.page + 1 if self.has_next else self.page
+        return max(ceil(self.total / self.per_page), self.page if self.items else 0)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def next_args(self):
+        return {"cursor": self.next_cursor}
+
+    @property
+    def prev_args(self):
+        return {"cursor": self.prev_cursor}
+
+    def iter_pages(self, left_edge=2, left_current=2, right_current=4, right_edge=2):
+        pages_end = self.pages + 1
+        if pages_end == 1:
+            return
+        left_end = min(1 + left_edge, pages_end)
+        yield from range(1, left_end)
+        if left_end == pages_end:
+            return
+        mid_start = max(left_end, self.page - left_current)
+        mid_end = min(self.page + right_current + 1, pages_end)
+        if mid_start - left_end > 0:
+            yield None
+        yield from range(mid_start, mid_end)
+        if mid_end == pages_end:
+            return
+        right_start = max(mid_end, pages_end - right_edge)
+        if right_start - mid_end > 0:
+            yield None
+        yield from range(right_start, pages_end)
+
+
+# --- Kursory ---
+def encode_cursor(value, row_id, direction, page):
+    data = json.dumps([value.isoformat(), row_id, direction, page])
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Zwraca (wartość, id, kierunek, strona) lub None dla błędnego kursora."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id, direction, page = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in ("next", "prev"):
+            return None
+        return datetime.fromisoformat(value), int(row_id), direction, max(int(page), 1)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+# --- Stronicowanie ---
+def count_rows(query):
+    """SELECT count(*) z warunkami WHERE zapytania na jednym modelu (bez JOIN).
+
+    `Query.count()` opakowuje zapytanie w podzapytanie ze wszystkimi
+    kolumnami modelu - także tymi pominiętymi przez defer().
+    """
+    stmt = select(func.count()).select_from(query.column_descriptions[0]["entity"])
+    if query.whereclause is not None:
+        stmt = stmt.where(query.whereclause)
+    return query.session.scalar(stmt)
+
+
+def keyset_paginate(query, order_column, id_column, page=1, cursor=None, per_page=20, total=None):
+    """Stronicuje zapytanie malejąco po (order_column, id_column).
+
+    Z kursorem strona pobierana jest warunkiem na klucz (indeks wystarcza,
+    żeby odczytać tylko `per_page` wierszy). Bez kursora - np. po kliknięciu
+    numeru strony - używany jest OFFSET. `total` (np. z cache) służy tylko do
+    wyświetlenia numerów stron.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    if position is None:
+        page = max(page, 1)
+        rows = (
+            query.order_by(order_column.desc(), id_column.desc())
+            .offset((page - 1) * per_page)
+            .limit(per_page + 1)
+            .all()
+        )
+        has_more, has_before = len(rows) > per_page, page > 1
+        items = rows[:per_page]
+    else:
+        value, row_id, direction, page = position
+        if direction == "next":
+            # (kolumna, id) < (wartość, id) zapisane tak, żeby planer użył indeksu na kolumnie
+            rows = (
+                query.filter(
+                    order_column <= value,
+                    or_(order_column < value, and_(order_column == value, id_column < row_id)),
+                )
+                .order_by(order_column.desc(), id_column.desc())
+                .limit(per_page + 1)
+                .all()
+            )
+            has_more, has_before = len(rows) > per_page, True
+            items = rows[:per_page]
+        else:
+            rows = (
+                query.filter(
+                    order_column >= value,
+                    or_(order_column > value, and_(order_column == value, id_column > row_id)),
+                )
+                .order_by(order_column.asc(), id_column.asc())
+                .limit(per_page + 1)
+                .all()
+            )
+            has_more, has_before = True, len(rows) > per_page
+            items = rows[:per_page][::-1]
+            if not has_before:
+                page = 1
+
+    def cursor_for(row, direction, target_page):
+        return encode_cursor(
+            getattr(row, order_column.key), getattr(row, id_column.key), direction, target_page
+        )
+
+    next_cursor = prev_cursor = None
+    if items and has_more:
+        next_cursor = cursor_for(items[-1], "next", page + 1)
+    if items and has_before:
+        prev_cursor = cursor_for(items[0], "prev", max(page - 1, 1))
+    return KeysetPage(items, page, per_page, total, next_cursor, prev_cursor)
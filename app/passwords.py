@@ -0,0 +1,103 @@
+# app/passwords.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app import app
+from app.metrics import timed
+
+# --- Hashowanie haseł ---
+# Algorytm i koszt ustawia PASSWORD_HASH_METHOD (format werkzeug, np.
+# "scrypt:32768:8:1" albo "pbkdf2:sha256:1000000"). Hasła zapisane starszymi
+# parametrami są przeliczane przy najbliższym poprawnym logowaniu.
+#
+# Hashowanie wykonuje pula PASSWORD_HASH_WORKERS wątków. hashlib zwalnia GIL
+# przy scrypt/pbkdf2, więc wątki liczą równolegle, ale najwyżej na tylu
+# rdzeniach, ile jest wątków - reszta CPU zostaje dla pozostałych żądań.
+# Żądanie, które nie doczeka się miejsca w kolejce (PASSWORD_HASH_QUEUE)
+# w ciągu PASSWORD_HASH_TIMEOUT sekund, dostaje 503 z nagłówkiem Retry-After.
+
+
+class PasswordHashBusy(ServiceUnavailable):
+    description = "Serwer jest chwilowo przeciążony. Spróbuj ponownie za chwilę."
+
+    def get_headers(self, environ=None, scope=None):
+        return [*super().get_headers(environ, scope), ("Retry-After", "5")]
+
+
+_lock = threading.Lock()
+_pool = None
+_slots = None
+_pool_pid = None
+_methods = {}
+
+
+def _executor():
+    """Pula wątków tworzona w procesie workera (nie przed forkiem w masterze)."""
+    global _pool, _slots, _pool_pid
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            workers = app.config["PASSWORD_HASH_WORKERS"]
+            _pool = ThreadPoolExecutor(workers, thread_name_prefix="password-hash")
+            _slots = threading.BoundedSemaphore(
+                workers + app.config["PASSWORD_HASH_QUEUE"]
+            )
+            _pool_pid = os.getpid()
+        return _pool, _slots
+
+
+def _run(func, *args):
+    pool, slots = _executor()
+    if not slots.acquire(timeout=app.config["PASSWORD_HASH_TIMEOUT"]):
+        raise PasswordHashBusy()
+    try:
+        with timed("password"):
+            return pool.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+def hash_password(password):
+    return _run(
+        generate_password_hash,
+        password,
+        app.config["PASSWORD_HASH_METHOD"],
+        app.config["PASSWORD_SALT_LENGTH"],
+    )
+
+
+def _current_method():
+    """Parametry zapisywane w hashu dla PASSWORD_HASH_METHOD.
+
+    Werkzeug uzupełnia domyślne wartości ("scrypt" -> "scrypt:32768:8:1"),
+    więc najprościej odczytać je z hashu pustego hasła.
+    """
+    method = app.config["PASSWORD_HASH_METHOD"]
+    if method not in _methods:
+        _methods[method] = generate_password_hash("", method, 1).split("$", 1)[0]
+    return _methods[method]
+
+
+def needs_rehash(password_hash):
+    method, _, rest = password_hash.partition("$")
+    salt = rest.partition("$")[0]
+    return (
+        method != _current_method() or len(salt) != app.config["PASSWORD_SALT_LENGTH"]
+    )
+
+
+def check_password(user, password):
+    """Sprawdza hasło użytkownika.
+
+    Po poprawnym sprawdzeniu hasła zapisanego starszymi parametrami ustawia
+    nowy `user.password_hash` - commit wykonuje wywołujący.
+    """
+    if not _run(check_password_hash, user.password_hash, password):
+        return False
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(password)
+    return True
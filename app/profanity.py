@@ -0,0 +1,292 @@
+# app/profanity.py
+
+import os
+import re
+import threading
+import unicodedata
+
+import click
+from flask import current_app
+
+from app import app, db
+
+WORDLIST_PATH = os.path.join(os.path.dirname(__file__), "data", "profanity_words.txt")
+
+# --- Werdykty ---
+CLEAN = "clean"
+PROFANE = "profane"
+AMBIGUOUS = "ambiguous"
+
+
+# --- Normalizacja tekstu ---
+_LEET_TABLE = str.maketrans(
+    {
+        "0": "o",
+        "1": "i",
+        "!": "i",
+        "|": "i",
+        "3": "e",
+        "4": "a",
+        "@": "a",
+        "5": "s",
+        "$": "s",
+        "7": "t",
+        "+": "t",
+        "8": "b",
+    }
+)
+_NON_LETTERS = re.compile(r"[^a-z]")
+_REPEATS = re.compile(r"(.)\1+")
+# Wszystko poza literami, cyframi i znakami leetspeaku oddziela słowa
+_SEPARATORS = re.compile(r"[^\w!|@$+]|_")
+# Słowa tej długości połączone separatorami to zwykle rozbity wyraz ("k_u_r_w_a")
+_FRAGMENT_LENGTH = 2
+
+
+def fold(text, leet=True):
+    """Sprowadza tekst do małych liter ASCII bez separatorów ("K_u_r_w@" -> "kurwa").
+
+    Przy `leet=False` cyfry i symbole są usuwane zamiast zamieniane na litery.
+    """
+    # "ł" nie rozkłada się w NFKD, więc zamieniamy je ręcznie
+    text = text.lower().replace("ł", "l")
+    if leet:
+        text = text.translate(_LEET_TABLE)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_LETTERS.sub("", text)
+
+
+def split_words(text):
+    """Dzieli nazwę na słowa po separatorach i na granicy "małaWielka" litera.
+
+    Sąsiednie krótkie fragmenty są łączone ("K_u_r_w@" -> ["Kurw@"]).
+    """
+    words = []
+    for part in _SEPARATORS.split(text):
+        start = 0
+        for i in range(1, len(part)):
+            if part[i].isupper() and not part[i - 1].isupper():
+                words.append(part[start:i])
+                start = i
+        if part[start:]:
+            words.append(part[start:])
+
+    merged = []
+    for word, previous in zip(words, [None] + words):
+        if (
+            previous is not None
+            and len(word) <= _FRAGMENT_LENGTH
+            and len(previous) <= _FRAGMENT_LENGTH
+        ):
+            merged[-1] += word
+        else:
+            merged.append(word)
+    return merged
+
+
+# --- Automat Aho-Corasick ---
+class _Automaton:
+    """Wyszukuje wszystkie słowa ze słownika w jednym przebiegu po tekście."""
+
+    def __init__(self, words):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for word, label in words.items():
+            self._insert(word, label)
+        self._build_fail_links()
+
+    def _insert(self, word, label):
+        state = 0
+        for ch in word:
+            if ch not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = len(self._goto) - 1
+            state = self._goto[state][ch]
+        self._out[state].append((label, len(word)))
+
+    def _build_fail_links(self):
+        queue = list(self._goto[0].values())
+        while queue:
+            state = queue.pop(0)
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def matches(self, text):
+        """Zwraca pary (etykieta, pozycja początku słowa w tekście)."""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for label, length in self._out[state]:
+                yield label, i + 1 - length
+
+
+class UsernameModerator:
+    """Sprawdza nazwy użytkowników na podstawie skompilowanej listy słów.
+
+    Nazwa jest dzielona na słowa (patrz `split_words`). Werdykt PROFANE daje
+    tylko słowo równe słowu z listy (także niejednoznacznemu, np. "ass") albo
+    zaczynające się od rdzenia oznaczonego "*" ("zjebany"). Pozostałe trafienia
+    - początek słowa ("Nazir") i środek słowa ("bass", "Scunthorpe") - dają
+    AMBIGUOUS i rozstrzyga je model. Słowa z listy wyjątków nie są sprawdzane.
+    """
+
+    def __init__(self, blocked, ambiguous, stems=(), allowed=()):
+        self._exact = set(blocked) | set(ambiguous)
+        self._allowed = set(allowed)
+        words = {word: AMBIGUOUS for word in self._exact}
+        words.update({stem: PROFANE for stem in stems})
+        self._automaton = _Automaton(words)
+
+    @classmethod
+    def from_file(cls, path=WORDLIST_PATH):
+        blocked, ambiguous, stems, allowed = set(), set(), set(), set()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("?"):
+                    ambiguous.add(fold(line[1:]))
+                elif line.startswith("!"):
+                    allowed.add(fold(line[1:]))
+                elif line.endswith("*"):
+                    stems.add(fold(line[:-1]))
+                else:
+                    blocked.add(fold(line))
+        return cls(blocked, ambiguous - blocked, stems, allowed)
+
+    @staticmethod
+    def _variants(text):
+        folded = fold(text)
+        # Wersja bez powtórzeń liter łapie "kuuurwa", a wersja bez leetspeaku
+        # traktuje cyfry na końcu nazwy ("ass123") jako dopisek, a nie litery
+        return {folded, _REPEATS.sub(r"\1", folded), fold(text, leet=False)}
+
+    def _check_word(self, word):
+        verdict = CLEAN
+        for variant in self._variants(word):
+            if variant in self._exact:
+                return PROFANE
+            for label, start in self._automaton.matches(variant):
+                if label == PROFANE and start == 0:
+                    return PROFANE
+                verdict = AMBIGUOUS
+        return verdict
+
+    def check(self, text):
+        words = [
+            word
+            for word in split_words(text)
+            if not self._variants(word) & self._allowed
+        ]
+        verdict = CLEAN
+        for word in words:
+            word_verdict = self._check_word(word)
+            if word_verdict == PROFANE:
+                return PROFANE
+            if word_verdict == AMBIGUOUS:
+                verdict = AMBIGUOUS
+        # Wyraz rozbity na dłuższe części ("kur_wa") widać dopiero po złączeniu
+        if verdict == CLEAN and self._check_word("".join(words)) != CLEAN:
+            verdict = AMBIGUOUS
+        return verdict
+
+
+# --- Leniwie wczytywane zasoby ---
+# profanity_check ładuje scikit-learn, scipy i model z pickla (kilkaset ms),
+# więc importujemy go dopiero wtedy, gdy lista słów nie wystarcza.
+_moderator = None
+_predict = None
+_lock = threading.Lock()
+
+
+def get_moderator():
+    global _moderator
+    if _moderator is None:
+        with _lock:
+            if _moderator is None:
+                _moderator = UsernameModerator.from_file()
+    return _moderator
+
+
+def get_predict():
+    """Zwraca `profanity_check.predict`, ładując model przy pierwszym wywołaniu."""
+    global _predict
+    if _predict is None:
+        with _lock:
+            if _predict is None:
+                from profanity_check import predict
+
+                _predict = predict
+    return _predict
+
+
+def preload():
+    """Ładuje zasoby z góry, np. w procesie master gunicorna przed forkiem workerów."""
+    get_moderator()
+    if app.config["PROFANITY_ML_FALLBACK"]:
+        get_predict()
+
+
+def is_profane(text):
+    verdict = get_moderator().check(text)
+    if verdict == AMBIGUOUS and current_app.config["PROFANITY_ML_FALLBACK"]:
+        return get_predict()([text.lower()])[0] == 1
+    return verdict == PROFANE
+
+
+def scan_usernames(batch_size=1000):
+    """Sprawdza wszystkie istniejące nazwy użytkowników.
+
+    Zwraca listę krotek (id, username, werdykt) dla nazw innych niż CLEAN.
+    Nazwy AMBIGUOUS są sprawdzane modelem jedną wsadową predykcją.
+    """
+    from app.models import User
+
+    moderator = get_moderator()
+    flagged = []
+    rows = db.session.execute(
+        db.select(User.id, User.username).execution_options(yield_per=batch_size)
+    )
+    for user_id, username in rows:
+        verdict = moderator.check(username)
+        if verdict != CLEAN:
+            flagged.append((user_id, username, verdict))
+
+    ambiguous = [row for row in flagged if row[2] == AMBIGUOUS]
+    if ambiguous and current_app.config["PROFANITY_ML_FALLBACK"]:
+        predictions = get_predict()([row[1].lower() for row in ambiguous])
+        resolved = {
+            row[0]: PROFANE if prediction == 1 else CLEAN
+            for row, prediction in zip(ambiguous, predictions)
+        }
+        flagged = [
+            (user_id, username, resolved.get(user_id, verdict))
+            for user_id, username, verdict in flagged
+        ]
+        flagged = [row for row in flagged if row[2] != CLEAN]
+    return flagged
+
+
+# --- Komenda CLI do sprawdzenia istniejących kont ---
+@app.cli.command("scan-usernames")
+@click.option("--batch-size", default=1000, show_default=True)
+def scan_usernames_command(batch_size):
+    """Wypisuje konta, których nazwy zawierają niedozwolone słowa."""
+    flagged = scan_usernames(batch_size)
+    for user_id, username, verdict in flagged:
+        click.echo(f"{user_id}\t{username}\t{verdict}")
+    click.echo(f"Znaleziono {len(flagged)} podejrzanych nazw użytkowników.")
@@ -0,0 +1,177 @@
+# app/queries.py
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import (
+    TournamentRegistration,
+    TournamentWinner,
+    User,
+    normalize_identity,
+    user_search_document,
+)
+
+
+# --- Hurtowe wczytywanie danych dla list turniejów ---
+# Relacje Tournament.winners i Tournament.registrations są "dynamic", więc
+# szablony wykonywały osobne zapytania dla każdej karty turnieju. Poniższe
+# funkcje wczytują dane dla całej strony stałą liczbą zapytań. Liczbę zapisów
+# przechowuje kolumna Tournament.registered_count.
+
+
+def load_podiums(tournaments):
+    """Wczytuje zwycięzców (razem z użytkownikami) jednym zapytaniem."""
+    podiums = {tournament.id: [] for tournament in tournaments}
+    if podiums:
+        winners = (
+            TournamentWinner.query.options(joinedload(TournamentWinner.user))
+            .filter(TournamentWinner.tournament_id.in_(podiums.keys()))
+            .order_by(TournamentWinner.tournament_id, TournamentWinner.placing.asc())
+            .all()
+        )
+        for winner in winners:
+            podiums[winner.tournament_id].append(winner)
+    for tournament in tournaments:
+        tournament._podium = podiums[tournament.id]
+    return tournaments
+
+
+def load_registrations(tournament):
+    """Zwraca zapisy na turniej razem z graczami (bez zapytania na każdy wiersz)."""
+    return (
+        tournament.registrations.options(joinedload(TournamentRegistration.player))
+        .order_by(TournamentRegistration.registration_date.asc())
+        .all()
+    )
+
+
+# --- Logowanie i unikalność kont ---
+# E-mail i nazwa użytkownika porównywane są bez wielkości liter (kolumny
+# email_lower / username_lower z unikalnymi indeksami). Oba pola sprawdzane
+# są jednym zapytaniem.
+
+
+def _identity_filter(email, username):
+    conditions = []
+    if email:
+        conditions.append(User.email_lower == normalize_identity(email))
+    if username:
+        conditions.append(User.username_lower == normalize_identity(username))
+    return or_(*conditions) if conditions else None
+
+
+def find_user(email=None, username=None):
+    """Konto o podanym e-mailu lub nazwie użytkownika.
+
+    Jeśli pasują dwa konta (e-mail jednego jest nazwą drugiego),
+    pierwszeństwo ma dopasowanie po e-mailu.
+    """
+    condition = _identity_filter(email, username)
+    if condition is None:
+        return None
+    # Najwyżej dwa wiersze - kolumny są unikalne
+    users = User.query.filter(condition).limit(2).all()
+    if email:
+        key = normalize_identity(email)
+        for user in users:
+            if user.email_lower == key:
+                return user
+    return users[0] if users else None
+
+
+def taken_identities(email=None, username=None):
+    """Które z podanych wartości są już zajęte: podzbiór {"email", "username"}."""
+    condition = _identity_filter(email, username)
+    if condition is None:
+        return set()
+    rows = db.session.execute(
+        select(User.email_lower, User.username_lower).where(condition).limit(2)
+    ).all()
+    taken = set()
+    for row in rows:
+        if email and row.email_lower == normalize_identity(email):
+            taken.add("email")
+        if username and row.username_lower == normalize_identity(username):
+            taken.add("username")
+    return taken
+
+
+# --- Wyszukiwanie użytkowników ---
+USER_SEARCH_COLUMNS = (User.username, User.email, User.first_name, User.last_name)
+USER_SORTS = {
+    "admin": (User.is_admin,),
+    "id": (User.id,),
+    "username": (User.username,),
+    "email": (User.email,),
+    "name": (User.last_name, User.first_name),
+}
+# Każde słowo dodaje warunek do zapytania SQL
+MAX_SEARCH_TOKENS = 5
+# Podpowiedzi przy wyborze użytkownika (nazwa użytkownika, imię, nazwisko)
+USER_LOOKUP_COLUMNS = (User.username, User.first_name, User.last_name)
+USER_LOOKUP_LIMIT = 10
+MAX_USER_LOOKUP_LIMIT = 25
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _starts_with(expression, prefix):
+    # Zakres zamiast LIKE - SQLite użyje indeksu na lower(kolumna)
+    return and_(expression >= prefix, expression < prefix + "\U0010ffff")
+
+
+def user_search_filter(term, columns=USER_SEARCH_COLUMNS):
+    """Warunek wyszukiwania użytkowników; każde słowo z `term` musi pasować.
+
+    W PostgreSQL słowo może wystąpić w dowolnym miejscu nazwy użytkownika,
+    e-maila, imienia lub nazwiska (indeks trigramowy - niezależnie od
+    `columns`). W SQLite dopasowywany jest początek jednej z kolumn
+    `columns`, a wielkość liter ignorowana jest tylko dla znaków ASCII.
+    """
+    tokens = term.lower().split()[:MAX_SEARCH_TOKENS]
+    if db.engine.dialect.name == "postgresql":
+        document = user_search_document(*USER_SEARCH_COLUMNS)
+        return and_(
+            *(
+                document.like(f"%{_escape_like(token)}%", escape="\\")
+                for token in tokens
+            )
+        )
+    return and_(
+        *(
+            or_(*(_starts_with(func.lower(column), token) for column in columns))
+            for token in tokens
+        )
+    )
+
+
+def search_users(term=None, sort="admin", direction="desc"):
+    """Zapytanie o użytkowników do panelu admina (filtrowanie i sortowanie w bazie)."""
+    query = User.query
+    if term and term.strip():
+        query = query.filter(user_search_filter(term))
+    columns = USER_SORTS.get(sort, USER_SORTS["admin"])
+    order = [column.desc() if direction == "desc" else column.asc() for column in columns]
+    return query.order_by(*order, User.id.asc())
+
+
+def lookup_users(term, tournament_id=None, limit=USER_LOOKUP_LIMIT):
+    """Podpowiedzi użytkowników: co najwyżej `limit` wierszy (id i nazwy).
+
+    Z `tournament_id` zwracani są tylko gracze zapisani na ten turniej - wtedy
+    pusty `term` zwraca pierwszych zapisanych, bez niego nie zwraca nic.
+    """
+    limit = min(max(limit, 1), MAX_USER_LOOKUP_LIMIT)
+    query = db.session.query(User.id, User.username, User.first_name, User.last_name)
+    if tournament_id is not None:
+        query = query.join(
+            TournamentRegistration, TournamentRegistration.user_id == User.id
+        ).filter(TournamentRegistration.tournament_id == tournament_id)
+    if term and term.strip():
+        query = query.filter(user_search_filter(term, USER_LOOKUP_COLUMNS))
+    elif tournament_id is None:
+        return []
+    return query.order_by(User.username.asc(), User.id.asc()).limit(limit).all()
@@ -0,0 +1,112 @@
+# app/registrations.py
+
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Tournament, TournamentRegistration
+
+# --- Wyniki zapisu na turniej ---
+REGISTERED = "registered"
+ALREADY_REGISTERED = "already_registered"
+FULL = "full"
+CLOSED = "closed"
+
+
+def register_player(tournament_id, user_id):
+    """Zapisuje gracza na turniej bez ryzyka przekroczenia limitu miejsc.
+
+    Licznik `registered_count` zwiększany jest warunkowym UPDATE-em, który
+    sprawdza limit i datę startu w tej samej instrukcji. Baza blokuje wiersz
+    turnieju (PostgreSQL) lub całą bazę (SQLite) do końca transakcji, więc
+    równoległe zapisy są serializowane. Ponowny zapis tego samego gracza
+    odrzuca unikalny indeks, a rollback cofa też zwiększenie licznika.
+    Licznik nie jest pokazywany w cache'owanych fragmentach, więc jego zmiana
+    nie unieważnia cache (`invalidate_fragments=False`).
+    """
+    result = db.session.execute(
+        update(Tournament)
+        .where(
+            Tournament.id == tournament_id,
+            Tournament.registered_count < Tournament.max_players,
+            Tournament.start_date >= datetime.utcnow(),
+        )
+        .values(registered_count=Tournament.registered_count + 1)
+        .execution_options(synchronize_session=False, invalidate_fragments=False)
+    )
+    if result.rowcount == 0:
+        db.session.rollback()
+        return _rejection_reason(tournament_id, user_id)
+
+    db.session.add(TournamentRegistration(user_id=user_id, tournament_id=tournament_id))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return ALREADY_REGISTERED
+    return REGISTERED
+
+
+def _rejection_reason(tournament_id, user_id):
+    tournament = db.session.get(Tournament, tournament_id)
+    if tournament.start_date < datetime.utcnow():
+        return CLOSED
+    if is_registered(tournament_id, user_id):
+        return ALREADY_REGISTERED
+    return FULL
+
+
+def is_registered(tournament_id, user_id):
+    return (
+        db.session.scalar(
+            select(TournamentRegistration.id).where(
+                TournamentRegistration.tournament_id == tournament_id,
+                TournamentRegistration.user_id == user_id,
+            )
+        )
+        is not None
+    )
+
+
+def unregister_player(tournament_id, user_id):
+    """Wypisuje gracza i zmniejsza licznik. Zwraca False, jeśli nie był zapisany."""
+    result = db.session.execute(
+        delete(TournamentRegistration).where(
+            TournamentRegistration.tournament_id == tournament_id,
+            TournamentRegistration.user_id == user_id,
+        )
+    )
+    if result.rowcount == 0:
+        db.session.rollback()
+        return False
+    db.session.execute(
+        update(Tournament)
+        .where(Tournament.id == tournament_id)
+        .values(registered_count=Tournament.registered_count - 1)
+        .execution_options(synchronize_session=False, invalidate_fragments=False)
+    )
+    db.session.commit()
+    return True
+
+
+def recount_registrations(tournament_ids=None):
+    """Przelicza `registered_count` na podstawie tabeli zapisów.
+
+    Używane po hurtowym usuwaniu zapisów (np. razem z kontem gracza).
+    Nie wykonuje commita - robi to wywołujący.
+    """
+    count = (
+        select(func.count(TournamentRegistration.id))
+        .where(TournamentRegistration.tournament_id == Tournament.id)
+        .scalar_subquery()
+    )
+    stmt = update(Tournament).values(registered_count=count)
+    if tournament_ids is not None:
+        if not tournament_ids:
+            return
+        stmt = stmt.where(Tournament.id.in_(tournament_ids))
+    db.session.execute(
+        stmt.execution_options(synchronize_session=False, invalidate_fragments=False)
+    )
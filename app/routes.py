@@ -1,8 +1,8 @@
 # app/routes.py
 
-import magic
 from functools import wraps
 from math import ceil
+from markupsafe import Markup
 from flask import (
     render_template,
     redirect,
@@ -11,12 +11,11 @@ from flask import (
     session,
     abort,
     request,
-    Response,
+    jsonify,
 )
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import login_user, current_user, logout_user, login_required
 from flask_babel import _
-from app import app, db, mail
+from app import app, db
 from app.forms import (
     RegistrationForm,
     LoginForm,
@@ -29,28 +28,57 @@ from app.forms import (
     DeleteAccountForm,
 )
 from app.models import User, Post
-import os
-from PIL import Image
 import secrets
-from flask_mail import Message
 from datetime import datetime, timedelta
-from sqlalchemy import asc
+from sqlalchemy.orm import defer, joinedload, load_only
 import bleach
-import json
 from app.forms import TournamentForm
-from app.models import Tournament, TournamentRegistration
+from app.models import Tournament
 from app.forms import AddWinnerForm
 from app.models import TournamentWinner
-from app.forms import DeleteForm
+from app.forms import BulkActionForm, DeleteForm
 from app.forms import ConfirmPasswordForm
+from app.mail_queue import enqueue_email
+from app.passwords import check_password, hash_password
+from app.bulk import apply_bulk_action
+from app.lifecycle import delete_rows, delete_user
+from app.images import picture_status, save_picture
+from app.queries import (
+    USER_LOOKUP_LIMIT,
+    USER_SORTS,
+    find_user,
+    load_podiums,
+    load_registrations,
+    lookup_users,
+    search_users,
+)
+from app.pagination import count_rows, decode_cursor, keyset_paginate
+from app.exports import EXPORT_FORMATS, export_response, registrations_query
+from app.cache import fragment_cache, today_key
+from app.metrics import cache_metrics, registry as metrics_registry
+from app.search import KINDS as SEARCH_KINDS, search as search_documents
+from app.http_cache import (
+    conditional,
+    index_version,
+    news_version,
+    post_version,
+    tournament_version,
+    tournaments_version,
+)
+from app.registrations import (
+    ALREADY_REGISTERED,
+    CLOSED,
+    FULL,
+    register_player,
+    unregister_player,
+)
 
 
 # --- Funkcja do wysyłania emaili ---
+# Mail trafia do kolejki, a wysyła go `flask mail-worker`,
+# więc żądanie nie czeka na połączenie SMTP.
 def send_email(subject, recipients, text_body, html_body):
-    msg = Message(subject, recipients=recipients)
-    msg.body = text_body
-    msg.html = html_body
-    mail.send(msg)
+    enqueue_email(subject, recipients, text_body, html_body)
 
 
 # --- DEKORATOR DO SPRAWDZANIA UPRAWNIEŃ ADMINA ---
@@ -64,67 +92,49 @@ def admin_required(f):
     return decorated_function
 
 
-# --- FUNKCJA DO ZAPISYWANIA OBRAZKÓW ---
-def save_picture(form_picture):
-    file_header = form_picture.stream.read(2048)
-    form_picture.stream.seek(0)
-
-    mime_type = magic.from_buffer(file_header, mime=True)
-    allowed_mimetypes = ["image/jpeg", "image/png"]
-
-    if mime_type not in allowed_mimetypes:
-        return None
-
-    # --- 2. Kontynuacja zapisu pliku ---
-    random_hex = secrets.token_hex(8)
-    _, f_ext = os.path.splitext(form_picture.filename)
-
-    f_ext = ".jpg" if mime_type == "image/jpeg" else ".png"
-
-    picture_fn = random_hex + f_ext
-    picture_path = os.path.join(app.root_path, "static/post_pics", picture_fn)
-
-    output_size = (1200, 675)
-    try:
-        i = Image.open(form_picture.stream)
-        i.thumbnail(output_size)
-        i.save(picture_path)
-    except Exception as e:
-        app.logger.error(f"Błąd podczas zapisywania obrazu: {e}")
-        return None
-
-    return picture_fn
-
-
 # --- GŁÓWNE WIDOKI APLIKACJI ---
 
 
 @app.route("/")
 @app.route("/index")
+@conditional(index_version)
 def index():
-    posts = Post.query.order_by(Post.date_posted.desc()).limit(3).all()
-    today = datetime.utcnow().date()
-    upcoming_tournaments = (
-        Tournament.query.filter(Tournament.start_date >= today)
-        .order_by(Tournament.start_date.asc())
-        .limit(3)
-        .all()
-    )
-    past_tournaments = (
-        Tournament.query.filter(Tournament.start_date < today)
-        .order_by(Tournament.start_date.desc())
-        .limit(3)
-        .all()
-    )
+    def build_context():
+        posts = (
+            Post.query.filter_by(archived=False)
+            .options(defer(Post.content))
+            .order_by(Post.date_posted.desc())
+            .limit(3)
+            .all()
+        )
+        today = datetime.utcnow().date()
+        upcoming_tournaments = (
+            Tournament.query.filter_by(archived=False)
+            .options(defer(Tournament.description))
+            .filter(Tournament.start_date >= today)
+            .order_by(Tournament.start_date.asc())
+            .limit(3)
+            .all()
+        )
+        past_tournaments = (
+            Tournament.query.filter_by(archived=False)
+            .options(defer(Tournament.description))
+            .filter(Tournament.start_date < today)
+            .order_by(Tournament.start_date.desc())
+            .limit(3)
+            .all()
+        )
+        load_podiums(past_tournaments)
+        return dict(
+            posts=posts,
+            upcoming_tournaments=upcoming_tournaments,
+            past_tournaments=past_tournaments,
+        )
 
-    return render_template(
-        "index.html",
-        title=_("Strona Główna"),
-        posts=posts,
-        upcoming_tournaments=upcoming_tournaments,
-        past_tournaments=past_tournaments,
-        asc=asc,
+    fragment = fragment_cache.render(
+        "index", "fragments/index.html", build_context, key=(today_key(),)
     )
+    return render_template("index.html", title=_("Strona Główna"), fragment=fragment)
 
 
 @app.route("/rejestracja", methods=["GET", "POST"])
@@ -133,7 +143,7 @@ def rejestracja():
         return redirect(url_for("index"))
     form = RegistrationForm()
     if form.validate_on_submit():
-        hashed_password = generate_password_hash(form.password.data)
+        hashed_password = hash_password(form.password.data)
         user = User(
             username=form.username.data,
             email=form.email.data,
@@ -191,12 +201,13 @@ def logowanie():
         return redirect(url_for("index"))
     form = LoginForm()
     if form.validate_on_submit():
-        user = (
-            User.query.filter_by(email=form.login_identifier.data).first()
-            or User.query.filter_by(username=form.login_identifier.data).first()
-        )
+        identifier = form.login_identifier.data
+        user = find_user(email=identifier, username=identifier)
 
-        if user and check_password_hash(user.password_hash, form.password.data):
+        if user and check_password(user, form.password.data):
+            # Hash zapisany starszymi parametrami został przeliczony
+            if db.session.is_modified(user):
+                db.session.commit()
             if not user.email_verified:
                 flash(
                     _(
@@ -220,7 +231,7 @@ def reset_request():
         return redirect(url_for("index"))
     form = RequestResetForm()
     if form.validate_on_submit():
-        user = User.query.filter_by(email=form.email.data).first()
+        user = find_user(email=form.email.data)
         if user:
             token = user.generate_token(salt="password-reset-salt")
             reset_url = url_for("reset_token", token=token, _external=True)
@@ -246,7 +257,7 @@ def reset_token(token):
         return redirect(url_for("reset_request"))
     form = ResetPasswordForm()
     if form.validate_on_submit():
-        hashed_password = generate_password_hash(form.password.data)
+        hashed_password = hash_password(form.password.data)
         user.password_hash = hashed_password
         db.session.commit()
         flash(
@@ -264,12 +275,58 @@ def wyloguj():
 
 
 @app.route("/news")
+@conditional(news_version)
 def news():
     page = request.args.get("page", 1, type=int)
-    posts = Post.query.order_by(Post.date_posted.desc()).paginate(
-        page=page, per_page=app.config["POSTS_PER_PAGE"]
+    cursor = request.args.get("cursor")
+    per_page = app.config["POSTS_PER_PAGE"]
+    # Liczba postów jest zapamiętana w cache do czasu zmiany postów
+    published = Post.query.filter_by(archived=False).options(defer(Post.content))
+    total = fragment_cache.get_or_set("news", "count", lambda: count_rows(published))
+
+    def build_context():
+        posts = keyset_paginate(
+            published,
+            Post.date_posted,
+            Post.id,
+            page=page,
+            cursor=cursor,
+            per_page=per_page,
+            total=total,
+        )
+        return dict(posts=posts)
+
+    # Klucz cache nie może zależeć od dowolnego tekstu z adresu - zapamiętujemy
+    # tylko istniejące strony numerowane. Strony z kursorem czytają indeks,
+    # więc renderujemy je bez cache.
+    pages = max(-(-total // per_page), 1)
+    if (cursor and decode_cursor(cursor)) or not 1 <= page <= pages:
+        fragment = Markup(render_template("fragments/news.html", **build_context()))
+    else:
+        fragment = fragment_cache.render(
+            "news", "fragments/news.html", build_context, key=(page,)
+        )
+    return render_template("news.html", title=_("News"), fragment=fragment)
+
+
+@app.route("/search")
+def search():
+    query = request.args.get("q", "", type=str).strip()[:100]
+    kind = request.args.get("kind", "", type=str)
+    if kind not in SEARCH_KINDS:
+        kind = ""
+    page = max(request.args.get("page", 1, type=int), 1)
+    results = None
+    if query:
+        results = search_documents(
+            query,
+            kind=kind or None,
+            page=page,
+            per_page=app.config["SEARCH_RESULTS_PER_PAGE"],
+        )
+    return render_template(
+        "search.html", title=_("Wyszukiwanie"), query=query, kind=kind, results=results
     )
-    return render_template("news.html", title=_("News"), posts=posts)
 
 
 @app.route("/sponsorzy")
@@ -286,19 +343,18 @@ def kontakt():
 
     if form.validate_on_submit():
         try:
-            msg = Message(
-                subject=form.subject.data,
-                sender=app.config["MAIL_USERNAME"],
-                recipients=[app.config["MAIL_RECIPIENT"]],
-            )
-
-            msg.body = f"""
+            body = f"""
             Wiadomość od: {form.name.data} ({form.email.data})
             ---
             {form.message.data}
             """
 
-            mail.send(msg)
+            enqueue_email(
+                form.subject.data,
+                [app.config["MAIL_RECIPIENT"]],
+                body,
+                sender=app.config["MAIL_USERNAME"],
+            )
 
             flash(_("Twoja wiadomość została wysłana! Dziękujemy."), "success")
             return redirect(url_for("kontakt"))
@@ -360,6 +416,7 @@ def new_post():
             content=cleaned_content,
             author=current_user,
             image_file=image_filename,
+            image_status=picture_status(image_filename),
         )
         db.session.add(post)
         db.session.commit()
@@ -369,11 +426,24 @@ def new_post():
 
 
 @app.route("/post/<int:post_id>")
+@conditional(post_version, shared_max_age=300)
 def post(post_id):
     post = Post.query.get_or_404(post_id)
     delete_form = DeleteForm()
+    # updated_at w kluczu - worker, który nie zapisał zmiany (cache w pamięci
+    # procesu), nie pokaże starej treści pod nowym ETagiem
+    fragment = fragment_cache.render(
+        "post",
+        "fragments/post.html",
+        lambda: dict(post=post),
+        key=(post_id, post.updated_at.isoformat()),
+    )
     return render_template(
-        "post.html", title=post.title, post=post, delete_form=delete_form
+        "post.html",
+        title=post.title,
+        post=post,
+        fragment=fragment,
+        delete_form=delete_form,
     )
 
 
@@ -388,6 +458,7 @@ def update_post(post_id):
             saved_filename = save_picture(form.picture.data)
             if saved_filename:
                 post.image_file = saved_filename
+                post.image_status = picture_status(saved_filename)
             else:
                 flash(
                     _(
@@ -452,12 +523,8 @@ def profil():
         return redirect(url_for("profil"))
 
     if password_form.validate_on_submit() and password_form.submit_password.data:
-        if check_password_hash(
-            current_user.password_hash, password_form.old_password.data
-        ):
-            current_user.password_hash = generate_password_hash(
-                password_form.new_password.data
-            )
+        if check_password(current_user, password_form.old_password.data):
+            current_user.password_hash = hash_password(password_form.new_password.data)
             db.session.commit()
             flash(_("Twoje hasło zostało zmienione!"), "success")
             return redirect(url_for("profil"))
@@ -507,20 +574,16 @@ def delete_account():
             return redirect(url_for('delete_account'))
 
         # Sprawdzenie hasła i kodu
-        if check_password_hash(current_user.password_hash, form.password.data) and \
+        if check_password(current_user, form.password.data) and \
            session.get('delete_code') == form.confirmation_code.data:
             
-            user_to_delete = User.query.get(current_user.id)
-            
+            user_id = current_user.id
+
             logout_user()
-            
-            Post.query.filter_by(author=user_to_delete).delete()
-            TournamentRegistration.query.filter_by(player=user_to_delete).delete()
-            TournamentWinner.query.filter_by(user_id=user_to_delete.id).delete()
 
-            db.session.delete(user_to_delete)
-            db.session.commit()
-            
+            # Posty, zapisy i miejsca na podium usuwane są razem z kontem
+            delete_user(user_id)
+
             flash(_("Twoje konto zostało trwale usunięte."), "success")
             return redirect(url_for('index'))
         else:
@@ -530,71 +593,96 @@ def delete_account():
 
 
 @app.route("/tournaments")
+@conditional(tournaments_version)
 def tournaments():
-    today = datetime.utcnow().date()
+    def build_context():
+        today = datetime.utcnow().date()
+
+        # ZMIANA: Pobierz tylko 3 najnowsze nadchodzące turnieje
+        upcoming_tournaments = (
+            Tournament.query.filter_by(archived=False)
+            .options(defer(Tournament.description))
+            .filter(Tournament.start_date >= today)
+            .order_by(Tournament.start_date.asc())
+            .limit(2)
+            .all()
+        )
 
-    # ZMIANA: Pobierz tylko 3 najnowsze nadchodzące turnieje
-    upcoming_tournaments = (
-        Tournament.query.filter(Tournament.start_date >= today)
-        .order_by(Tournament.start_date.asc())
-        .limit(2)
-        .all()
-    )
+        # ZMIANA: Pobierz tylko 6 ostatnich przeszłych turniejów
+        past_tournaments_query = (
+            Tournament.query.filter_by(archived=False)
+            .options(defer(Tournament.description))
+            .filter(Tournament.start_date < today)
+        )
 
-    # ZMIANA: Pobierz tylko 6 ostatnich przeszłych turniejów
-    past_tournaments_query = Tournament.query.filter(Tournament.start_date < today)
-    
-    past_tournaments = (
-        past_tournaments_query.order_by(Tournament.start_date.desc())
-        .limit(6)
-        .all()
-    )
+        past_tournaments = (
+            past_tournaments_query.order_by(Tournament.start_date.desc())
+            .limit(6)
+            .all()
+        )
 
-    # Sprawdzamy, czy istnieje więcej przeszłych turniejów, niż wyświetlamy
-    # To pozwoli nam zdecydować, czy pokazać przycisk "Zobacz wszystkie"
-    show_all_past_button = past_tournaments_query.count() > 6
+        # Sprawdzamy, czy istnieje więcej przeszłych turniejów, niż wyświetlamy
+        # To pozwoli nam zdecydować, czy pokazać przycisk "Zobacz wszystkie"
+        show_all_past_button = count_rows(past_tournaments_query) > 6
+        load_podiums(past_tournaments)
+        return dict(
+            upcoming_tournaments=upcoming_tournaments,
+            past_tournaments=past_tournaments,
+            show_all_past_button=show_all_past_button,
+            datetime=datetime,
+        )
 
-    return render_template(
-        "tournaments.html",
-        title=_("Turnieje"),
-        upcoming_tournaments=upcoming_tournaments,
-        past_tournaments=past_tournaments,
-        show_all_past_button=show_all_past_button,
-        asc=asc,
-        datetime=datetime  
+    fragment = fragment_cache.render(
+        "tournaments", "fragments/tournaments.html", build_context, key=(today_key(),)
     )
+    return render_template("tournaments.html", title=_("Turnieje"), fragment=fragment)
 
 @app.route("/past_tournaments")
 def all_past_tournaments():
     page = request.args.get("page", 1, type=int)
     today = datetime.utcnow().date()
+    past = (
+        Tournament.query.filter_by(archived=False)
+        .options(defer(Tournament.description))
+        .filter(Tournament.start_date < today)
+    )
 
-    # Logika paginacji, która była wcześniej w /tournaments
-    past_tournaments = (
-        Tournament.query.filter(Tournament.start_date < today)
-        .order_by(Tournament.start_date.desc())
-        .paginate(page=page, per_page=6) # Ustawiamy 6 na stronę
+    total = fragment_cache.get_or_set(
+        "tournaments", f"past_count:{today.isoformat()}", lambda: count_rows(past)
     )
+    past_tournaments = keyset_paginate(
+        past,
+        Tournament.start_date,
+        Tournament.id,
+        page=page,
+        cursor=request.args.get("cursor"),
+        per_page=6,  # Ustawiamy 6 na stronę
+        total=total,
+    )
+    load_podiums(past_tournaments.items)
 
     return render_template(
         "all_past_tournaments.html", # Wskazujemy na nowy plik szablonu
         title=_("Wszystkie Przeszłe Turnieje"),
         past_tournaments=past_tournaments,
-        asc=asc,
     )
 
 
 @app.route("/tournament/<int:tournament_id>")
+@conditional(tournament_version)
 def tournament_details(tournament_id):
     tournament = Tournament.query.get_or_404(tournament_id)
-    registrations = tournament.registrations.all()
+    registrations = load_registrations(tournament)
+    is_registered = current_user.is_authenticated and any(
+        reg.user_id == current_user.id for reg in registrations
+    )
     return render_template(
         "tournament_details.html",
         title=tournament.title,
         tournament=tournament,
         registrations=registrations,
+        is_registered=is_registered,
         datetime=datetime.utcnow(),
-        asc=asc,
     )
 
 
@@ -603,19 +691,16 @@ def tournament_details(tournament_id):
 def register_for_tournament(tournament_id):
     tournament = Tournament.query.get_or_404(tournament_id)
 
-    if tournament.start_date < datetime.utcnow():
+    result = register_player(tournament.id, current_user.id)
+    if result == CLOSED:
         flash(_("Nie można zapisać się na turniej, który już się rozpoczął."), "danger")
-        return redirect(url_for("tournament_details", tournament_id=tournament.id))
-
-    if tournament.registrations.count() >= tournament.max_players:
+    elif result == FULL:
         flash(_("Lista uczestników jest już pełna!"), "danger")
-        return redirect(url_for("tournament_details", tournament_id=tournament.id))
-
-    registration = TournamentRegistration(player=current_user, tournament=tournament)
-    db.session.add(registration)
-    db.session.commit()
-    flash(_("Zostałeś pomyślnie zapisany na turniej!"), "success")
-    return redirect(url_for("tournament_details", tournament_id=tournament.id))
+    elif result == ALREADY_REGISTERED:
+        flash(_("Jesteś już zapisany na ten turniej."), "info")
+    else:
+        flash(_("Zostałeś pomyślnie zapisany na turniej!"), "success")
+    return redirect(url_for("tournament_details", tournament_id=tournament_id))
 
 
 @app.route("/tournament/<int:tournament_id>/unregister", methods=["POST"])
@@ -627,13 +712,10 @@ def unregister_from_tournament(tournament_id):
         flash(_("Nie można wypisać się z turnieju, który już się rozpoczął."), "danger")
         return redirect(url_for("tournament_details", tournament_id=tournament.id))
 
-    registration = TournamentRegistration.query.filter_by(
-        user_id=current_user.id, tournament_id=tournament_id
-    ).first_or_404()
-    db.session.delete(registration)
-    db.session.commit()
+    if not unregister_player(tournament_id, current_user.id):
+        abort(404)
     flash(_("Zostałeś wypisany z turnieju."), "success")
-    return redirect(url_for("tournament_details", tournament_id=tournament.id))
+    return redirect(url_for("tournament_details", tournament_id=tournament_id))
 
 
 @app.errorhandler(404)
@@ -659,23 +741,107 @@ def admin_dashboard():
         user_count=user_count,
         post_count=post_count,
         tournament_count=tournament_count,
+        cache_stats=fragment_cache.stats(),
     )
 
 
+@app.route("/metrics")
+def metrics():
+    # Prometheus uwierzytelnia się tokenem (METRICS_TOKEN), administrator - sesją
+    token = app.config["METRICS_TOKEN"]
+    authorization = request.headers.get("Authorization", "")
+    # compare_digest nie przyjmuje napisów spoza ASCII - porównujemy bajty
+    expected = f"Bearer {token}".encode("utf-8")
+    if not (token and secrets.compare_digest(authorization.encode("utf-8"), expected)):
+        if not (current_user.is_authenticated and current_user.is_admin):
+            abort(403)
+    body = metrics_registry.render(extra=cache_metrics(fragment_cache.stats()))
+    return body, 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
 @app.route("/admin/users")
 @login_required
 @admin_required
 def admin_manage_users():
-    users = User.query.order_by(User.is_admin.desc(), User.id).all()
+    users, list_args = _admin_users_page()
     delete_form = DeleteForm()
     return render_template(
         "admin/manage_users.html",
         title=_("Zarządzaj Użytkownikami"),
         users=users,
+        list_args=list_args,
         delete_form=delete_form,
     )
 
 
+def _admin_users_page():
+    """Strona listy użytkowników wg parametrów q, sort, dir i page."""
+    list_args = {
+        "q": request.args.get("q", "").strip(),
+        "sort": request.args.get("sort", "admin"),
+        "dir": "asc" if request.args.get("dir") == "asc" else "desc",
+    }
+    if list_args["sort"] not in USER_SORTS:
+        list_args["sort"] = "admin"
+    users = search_users(
+        list_args["q"], sort=list_args["sort"], direction=list_args["dir"]
+    ).paginate(
+        page=request.args.get("page", 1, type=int),
+        per_page=app.config["USERS_PER_PAGE"],
+        error_out=False,
+    )
+    return users, list_args
+
+
+@app.route("/admin/users.json")
+@login_required
+@admin_required
+def admin_users_json():
+    """Lista użytkowników do doładowywania kolejnych stron (te same parametry co lista)."""
+    users, list_args = _admin_users_page()
+    return jsonify(
+        users=[
+            {
+                "id": user.id,
+                "username": user.username,
+                "email": user.email,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "is_admin": user.is_admin,
+            }
+            for user in users.items
+        ],
+        page=users.page,
+        pages=users.pages,
+        total=users.total,
+        next=url_for("admin_users_json", page=users.next_num, **list_args)
+        if users.has_next
+        else None,
+    )
+
+
+@app.route("/admin/users/lookup")
+@login_required
+@admin_required
+def admin_users_lookup():
+    """Podpowiedzi do wyboru użytkownika (q, opcjonalnie tournament_id i limit)."""
+    users = lookup_users(
+        request.args.get("q", ""),
+        tournament_id=request.args.get("tournament_id", type=int),
+        limit=request.args.get("limit", USER_LOOKUP_LIMIT, type=int),
+    )
+    return jsonify(
+        users=[
+            {
+                "id": user.id,
+                "username": user.username,
+                "name": f"{user.first_name} {user.last_name}",
+            }
+            for user in users
+        ]
+    )
+
+
 @app.route("/admin/user/<int:user_id>/toggle_admin_confirm", methods=["GET", "POST"])
 @login_required
 @admin_required
@@ -689,7 +855,7 @@ def admin_toggle_admin_confirm(user_id):
     action = _("nadania") if not user_to_modify.is_admin else _("odebrania")
 
     if form.validate_on_submit():
-        if check_password_hash(current_user.password_hash, form.password.data):
+        if check_password(current_user, form.password.data):
             user_to_modify.is_admin = not user_to_modify.is_admin
             db.session.commit()
             status = _("nadano") if user_to_modify.is_admin else _("odebrano")
@@ -727,13 +893,12 @@ def admin_delete_user(user_id):
                 _("Nie możesz usunąć własnego konta z panelu administratora."), "danger"
             )
             return redirect(url_for("admin_manage_users"))
-        Post.query.filter_by(author=user_to_delete).delete()
-        db.session.delete(user_to_delete)
-        db.session.commit()
+        username = user_to_delete.username
+        delete_user(user_to_delete.id)
         flash(
             _(
                 "Użytkownik %(username)s i wszystkie jego posty zostały usunięte.",
-                username=user_to_delete.username,
+                username=username,
             ),
             "success",
         )
@@ -746,16 +911,52 @@ def admin_delete_user(user_id):
 @login_required
 @admin_required
 def admin_manage_posts():
-    posts = Post.query.order_by(Post.date_posted.desc()).all()
-    delete_form = DeleteForm()
+    # Lista nie potrzebuje treści postów - tylko kolumny z tabeli
+    posts = (
+        Post.query.options(
+            load_only(Post.id, Post.title, Post.date_posted, Post.archived),
+            joinedload(Post.author).load_only(User.username),
+        )
+        .order_by(Post.date_posted.desc(), Post.id.desc())
+        .paginate(
+            page=request.args.get("page", 1, type=int),
+            per_page=app.config["ADMIN_ITEMS_PER_PAGE"],
+            error_out=False,
+        )
+    )
     return render_template(
         "admin/manage_posts.html",
         title=_("Zarządzaj Postami"),
         posts=posts,
-        delete_form=delete_form,
+        delete_form=DeleteForm(),
+        bulk_form=BulkActionForm(),
     )
 
 
+@app.route("/admin/posts/bulk", methods=["POST"])
+@login_required
+@admin_required
+def admin_bulk_posts():
+    return _bulk_action(Post, "admin_manage_posts")
+
+
+def _bulk_action(model, endpoint):
+    """Wykonuje akcję z formularza na zaznaczonych wierszach w jednej transakcji."""
+    form = BulkActionForm()
+    ids = request.form.getlist("ids", type=int)
+    if not form.validate_on_submit():
+        for errors in form.errors.values():
+            for error in errors:
+                flash(error, "danger")
+    elif not ids:
+        flash(_("Nie zaznaczono żadnych elementów."), "warning")
+    else:
+        count = apply_bulk_action(model, form.action.data, ids, days=form.days.data)
+        db.session.commit()
+        flash(_("Zmienione elementy: %(count)d.", count=count), "success")
+    return redirect(url_for(endpoint, page=request.form.get("page", 1, type=int)))
+
+
 @app.route("/admin/post/<int:post_id>/delete", methods=["POST"])
 @login_required
 @admin_required
@@ -765,8 +966,7 @@ def admin_delete_post(post_id):
 
     post = Post.query.get_or_404(post_id)
     if form.validate_on_submit():
-        db.session.delete(post)
-        db.session.commit()
+        delete_rows(Post, Post.id == post.id)
         flash(_("Post został usunięty."), "success")
     else:
         flash(_("Nieprawidłowy formularz usuwania."), "danger")
@@ -799,6 +999,7 @@ def new_tournament():
             title=form.title.data,
             description=form.description.data,
             banner_image=banner_filename,
+            banner_status=picture_status(banner_filename),
             location=form.location.data,
             start_date=form.start_date.data,
             end_date=form.end_date.data,
@@ -818,59 +1019,92 @@ def new_tournament():
 @login_required
 @admin_required
 def delete_registration(tournament_id, user_id):
-    registration = TournamentRegistration.query.filter_by(
-        user_id=user_id, tournament_id=tournament_id
-    ).first_or_404()
-    db.session.delete(registration)
-    db.session.commit()
+    if not unregister_player(tournament_id, user_id):
+        abort(404)
     flash(_("Zapis użytkownika został usunięty."), "success")
     return redirect(url_for("tournament_details", tournament_id=tournament_id))
 
 
-@app.route("/tournament/<int:tournament_id>/registrations.json")
+def _export_date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        abort(400)
+
+
+@app.route("/tournament/<int:tournament_id>/registrations.<fmt>")
 @login_required
 @admin_required
-def tournament_registrations_json(tournament_id):
+def tournament_registrations_export(tournament_id, fmt):
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
     tournament = Tournament.query.get_or_404(tournament_id)
-    registrations = []
-    for reg in tournament.registrations:
-        registrations.append(
-            {
-                "username": reg.player.username,
-                "first_name": reg.player.first_name,
-                "last_name": reg.player.last_name,
-                "tournament_id": tournament.id,
-                "tournament_title": tournament.title,
-                "tournament_start_date": tournament.start_date.strftime("%Y-%m-%d"),
-                "registration_date": reg.registration_date.strftime(
-                    "%Y-%m-%d %H:%M:%S"
-                ),
-                "paid": False,
-            }
-        )
-    json_data = json.dumps(registrations, ensure_ascii=False, indent=2)
-    filename = f"tournament_{tournament.id}_registrations.json"
-    return Response(
-        json_data,
-        mimetype="application/json",
-        headers={"Content-Disposition": f"attachment;filename={filename}"},
+    stmt = registrations_query(
+        tournament_id=tournament.id,
+        registered_from=_export_date_arg("from"),
+        registered_to=_export_date_arg("to"),
     )
+    return export_response(stmt, fmt, f"tournament_{tournament.id}_registrations")
+
+
+@app.route("/admin/registrations/season/<int:season>.<fmt>")
+@login_required
+@admin_required
+def season_registrations_export(season, fmt):
+    """Zapisy na wszystkie turnieje rozpoczynające się w danym roku."""
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    stmt = registrations_query(
+        season=season,
+        registered_from=_export_date_arg("from"),
+        registered_to=_export_date_arg("to"),
+    )
+    return export_response(stmt, fmt, f"season_{season}_registrations")
 
 
 @app.route("/admin/tournaments")
 @login_required
 @admin_required
 def admin_manage_tournaments():
-    tournaments = Tournament.query.order_by(Tournament.start_date.desc()).all()
-    delete_form = DeleteForm()
+    tournaments = (
+        Tournament.query.options(
+            load_only(
+                Tournament.id,
+                Tournament.title,
+                Tournament.start_date,
+                Tournament.registered_count,
+                Tournament.max_players,
+                Tournament.archived,
+            )
+        )
+        .order_by(Tournament.start_date.desc(), Tournament.id.desc())
+        .paginate(
+            page=request.args.get("page", 1, type=int),
+            per_page=app.config["ADMIN_ITEMS_PER_PAGE"],
+            error_out=False,
+        )
+    )
+    current_season = datetime.utcnow().year
     return render_template(
         "admin/manage_tournaments.html",
         title=_("Zarządzaj Turniejami"),
         tournaments=tournaments,
-        delete_form=delete_form,
+        delete_form=DeleteForm(),
+        bulk_form=BulkActionForm(),
+        seasons=[current_season, current_season - 1],
     )
 
 
+@app.route("/admin/tournaments/bulk", methods=["POST"])
+@login_required
+@admin_required
+def admin_bulk_tournaments():
+    return _bulk_action(Tournament, "admin_manage_tournaments")
+
+
 @app.route("/admin/tournament/<int:tournament_id>/update", methods=["GET", "POST"])
 @login_required
 @admin_required
@@ -882,6 +1116,7 @@ def admin_update_tournament(tournament_id):
             saved_filename = save_picture(form.banner_image.data)
             if saved_filename:
                 tournament.banner_image = saved_filename
+                tournament.banner_status = picture_status(saved_filename)
             else:
                 flash(
                     _(
@@ -921,8 +1156,7 @@ def admin_delete_tournament(tournament_id):
     form = DeleteForm()
     if form.validate_on_submit():
         tournament = Tournament.query.get_or_404(tournament_id)
-        db.session.delete(tournament)
-        db.session.commit()
+        delete_rows(Tournament, Tournament.id == tournament.id)
         flash(_("Turniej został usunięty."), "success")
     else:
         flash(_("Nieprawidłowy formularz usuwania."), "danger")
@@ -949,7 +1183,7 @@ def admin_manage_winners(tournament_id):
         flash(_("Zwycięzca został dodany!"), "success")
         return redirect(url_for("admin_manage_winners", tournament_id=tournament.id))
 
-    winners = tournament.winners.order_by(TournamentWinner.placing.asc()).all()
+    winners = tournament.podium
     return render_template(
         "admin/manage_winners.html",
         title=_("Zarządzaj Zwycięzcami"),
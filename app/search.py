@@ -0,0 +1,346 @@
+# app/search.py
+
+import re
+import unicodedata
+
+import click
+from markupsafe import Markup, escape
+from sqlalchemy import (
+    and_,
+    column,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+)
+
+from app import app, db
+from app.models import Post, SearchDocument, Tournament, plain_text, search_vector
+
+# --- Wyszukiwanie pełnotekstowe ---
+# Indeks zawiera słowa sprowadzone do małych liter ASCII (bez polskich znaków)
+# i obcięte do rdzenia prostym stemmerem końcówek. Tak samo przetwarzane są
+# słowa zapytania, więc "turniejach w Łodzi" znajduje "Turniej - Łódź".
+# Przeszukiwanie: SQLite - FTS5 (search_fts), PostgreSQL - tsvector + GIN.
+
+KINDS = {"post": Post, "tournament": Tournament}
+# Pola, których zmiana wymaga aktualizacji wpisu w indeksie
+INDEXED_FIELDS = {
+    Post: ("title", "content"),
+    Tournament: ("title", "description", "location"),
+}
+MAX_QUERY_TOKENS = 8
+SNIPPET_WORDS = 30
+REBUILD_BATCH_SIZE = 500
+# Wagi kolumn (tytuł, treść) w rankingu bm25 FTS5
+FTS_WEIGHTS = (5.0, 1.0)
+
+# Końcówki fleksyjne (po usunięciu polskich znaków), od najdłuższych
+SUFFIXES = sorted(
+    (
+        "owie ami ach ego emu ych ich ymi imi iem owi owa owe owy ow om em "
+        "ie ia iu a e i o u y"
+    ).split(),
+    key=len,
+    reverse=True,
+)
+MIN_STEM_LENGTH = 3
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_FTS = table("search_fts", column("rowid"), column("search_fts"))
+
+
+def fold(value):
+    """Małe litery bez polskich znaków ("Łódź" -> "lodz")."""
+    # "ł" nie rozkłada się w NFKD, więc zamieniamy je ręcznie
+    value = unicodedata.normalize("NFKD", value.lower().replace("ł", "l"))
+    return "".join(ch for ch in value if not unicodedata.combining(ch))
+
+
+def stem(token):
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+            return token[: -len(suffix)]
+    return token
+
+
+def tokens(value):
+    return [stem(token) for token in _TOKEN.findall(fold(value or ""))]
+
+
+def terms(value):
+    """Tekst w postaci zapisywanej w indeksie."""
+    return " ".join(tokens(value))
+
+
+def document_values(kind, item_id, title, body):
+    """Wiersz search_document dla tytułu i treści (zwykły tekst, bez HTML)."""
+    return {
+        "kind": kind,
+        "item_id": item_id,
+        "title_terms": terms(title),
+        "body_terms": terms(body),
+    }
+
+
+def _document(item):
+    if isinstance(item, Post):
+        return document_values("post", item.id, item.title, plain_text(item.content))
+    body = " ".join(filter(None, (item.location, plain_text(item.description))))
+    return document_values("tournament", item.id, item.title, body)
+
+
+def _kind_of(model):
+    return next(kind for kind, kind_model in KINDS.items() if kind_model is model)
+
+
+# --- Aktualizacja indeksu ---
+def _replace(connection, items):
+    """Zastępuje wpisy indeksu dla `items` (posty i turnieje)."""
+    documents = [_document(item) for item in items]
+    for kind in KINDS:
+        ids = [
+            document["item_id"] for document in documents if document["kind"] == kind
+        ]
+        if ids:
+            connection.execute(
+                delete(SearchDocument.__table__).where(
+                    SearchDocument.kind == kind, SearchDocument.item_id.in_(ids)
+                )
+            )
+    if documents:
+        connection.execute(insert(SearchDocument.__table__), documents)
+
+
+def unindex(model, ids, connection=None):
+    """Usuwa wpisy indeksu, np. przy usuwaniu wierszy z pominięciem sesji ORM."""
+    if model not in INDEXED_FIELDS or not ids:
+        return
+    connection = connection or db.session
+    connection.execute(
+        delete(SearchDocument.__table__).where(
+            SearchDocument.kind == _kind_of(model), SearchDocument.item_id.in_(ids)
+        )
+    )
+
+
+def _needs_indexing(session, item):
+    if item in session.new:
+        return True
+    state = inspect(item)
+    return any(
+        state.attrs[field].history.has_changes() for field in INDEXED_FIELDS[type(item)]
+    )
+
+
+@event.listens_for(db.session, "after_flush")
+def index_flushed(session, flush_context):
+    # Indeks zmienia się w tej samej transakcji co posty i turnieje
+    changed = [
+        item
+        for item in session.new | session.dirty
+        if type(item) in INDEXED_FIELDS and _needs_indexing(session, item)
+    ]
+    removed = [item for item in session.deleted if type(item) in INDEXED_FIELDS]
+    if not changed and not removed:
+        return
+    connection = session.connection()
+    for item in removed:
+        unindex(type(item), [item.id], connection)
+    _replace(connection, changed)
+
+
+def reindex(model, *criteria, batch_size=REBUILD_BATCH_SIZE):
+    """Buduje wpisy indeksu dla wierszy `model` spełniających `criteria`.
+
+    Wiersze czytane są partiami po `batch_size`, a każda partia zapisywana
+    w osobnej transakcji. Zwraca liczbę zaindeksowanych wierszy.
+    """
+    done = 0
+    last_id = 0
+    while True:
+        items = db.session.scalars(
+            select(model)
+            .where(model.id > last_id, *criteria)
+            .order_by(model.id)
+            .limit(batch_size)
+        ).all()
+        if not items:
+            break
+        _replace(db.session.connection(), items)
+        db.session.commit()
+        done += len(items)
+        last_id = items[-1].id
+    return done
+
+
+def rebuild_index(batch_size=REBUILD_BATCH_SIZE):
+    """Buduje cały indeks od nowa; zwraca liczbę wpisów dla każdego rodzaju."""
+    db.session.execute(delete(SearchDocument.__table__))
+    db.session.commit()
+    counts = {
+        kind: reindex(model, batch_size=batch_size) for kind, model in KINDS.items()
+    }
+    if db.engine.dialect.name == "sqlite":
+        # Scala segmenty indeksu FTS5 powstałe przy zapisie partiami
+        db.session.execute(
+            text("INSERT INTO search_fts(search_fts) VALUES ('optimize')")
+        )
+        db.session.commit()
+    return counts
+
+
+# --- Wyszukiwanie ---
+def _search_statement(query_tokens):
+    """Zapytanie o (rodzaj, id) pasujących wpisów, od najlepiej dopasowanych.
+
+    Każde słowo zapytania musi pasować do początku jakiegoś słowa w indeksie.
+    Słowa zawierają tylko [a-z0-9], więc można je wstawić do składni FTS.
+    """
+    stmt = select(SearchDocument.kind, SearchDocument.item_id)
+    if db.engine.dialect.name == "postgresql":
+        config = literal_column("'simple'::regconfig")
+        query = func.to_tsquery(
+            config, " & ".join(f"{token}:*" for token in query_tokens)
+        )
+        vector = search_vector(SearchDocument.title_terms, SearchDocument.body_terms)
+        return stmt.where(vector.op("@@")(query)).order_by(
+            func.ts_rank(vector, query).desc(), SearchDocument.id.desc()
+        )
+    match = " ".join(f'"{token}"*' for token in query_tokens)
+    return (
+        stmt.join(_FTS, _FTS.c.rowid == SearchDocument.id)
+        .where(_FTS.c.search_fts.op("MATCH")(match))
+        .order_by(
+            # bm25 zwraca wartości ujemne - mniejsza oznacza lepsze dopasowanie
+            func.bm25(literal_column("search_fts"), *FTS_WEIGHTS),
+            SearchDocument.id.desc(),
+        )
+    )
+
+
+def _matches(word, query_tokens):
+    return any(
+        token.startswith(query_token)
+        for token in tokens(word)
+        for query_token in query_tokens
+    )
+
+
+def highlight(value, query_tokens, max_words=None):
+    """Tekst z dopasowanymi słowami w <mark>.
+
+    Z `max_words` zwracany jest fragment o tej długości wokół pierwszego
+    dopasowania (albo początek tekstu).
+    """
+    words = value.split()
+    start, end = 0, len(words)
+    if max_words and len(words) > max_words:
+        first = next(
+            (i for i, word in enumerate(words) if _matches(word, query_tokens)), 0
+        )
+        start = max(0, min(first - max_words // 3, len(words) - max_words))
+        end = start + max_words
+    parts = [
+        (
+            Markup("<mark>%s</mark>") % word
+            if _matches(word, query_tokens)
+            else escape(word)
+        )
+        for word in words[start:end]
+    ]
+    result = Markup(" ").join(parts)
+    if start > 0:
+        result = Markup("… ") + result
+    if end < len(words):
+        result += Markup(" …")
+    return result
+
+
+class SearchHit:
+    """Wynik wyszukiwania: post lub turniej z wyróżnionym tytułem i fragmentem treści."""
+
+    def __init__(self, kind, item, query_tokens):
+        self.kind = kind
+        self.item = item
+        self.title = highlight(item.title, query_tokens)
+        body = item.content if kind == "post" else item.description
+        self.snippet = highlight(plain_text(body), query_tokens, SNIPPET_WORDS)
+
+
+class SearchResults:
+    def __init__(self, hits, page, has_next):
+        self.items = hits
+        self.page = page
+        self.has_next = has_next
+        self.has_prev = page > 1
+        self.next_num = page + 1 if has_next else None
+        self.prev_num = page - 1 if self.has_prev else None
+
+
+def search(query, kind=None, page=1, per_page=20):
+    """Wyszukuje posty i turnieje (bez zarchiwizowanych), od najtrafniejszych.
+
+    `kind` ("post" lub "tournament") zawęża wyniki do jednego rodzaju.
+    Wykonuje jedno zapytanie do indeksu i po jednym na każdy rodzaj wyników.
+    """
+    query_tokens = list(dict.fromkeys(tokens(query)))[:MAX_QUERY_TOKENS]
+    if not query_tokens:
+        return SearchResults([], page, False)
+
+    stmt = (
+        _search_statement(query_tokens)
+        .outerjoin(
+            Post, and_(SearchDocument.kind == "post", Post.id == SearchDocument.item_id)
+        )
+        .outerjoin(
+            Tournament,
+            and_(
+                SearchDocument.kind == "tournament",
+                Tournament.id == SearchDocument.item_id,
+            ),
+        )
+        .where(or_(Post.archived.is_(False), Tournament.archived.is_(False)))
+    )
+    if kind in KINDS:
+        stmt = stmt.where(SearchDocument.kind == kind)
+    rows = db.session.execute(
+        stmt.offset((page - 1) * per_page).limit(per_page + 1)
+    ).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+
+    items = {}
+    for kind_name, model in KINDS.items():
+        ids = [row.item_id for row in rows if row.kind == kind_name]
+        if ids:
+            for item in model.query.filter(model.id.in_(ids)):
+                items[(kind_name, item.id)] = item
+    hits = [
+        SearchHit(row.kind, items[(row.kind, row.item_id)], query_tokens)
+        for row in rows
+        if (row.kind, row.item_id) in items
+    ]
+    return SearchResults(hits, page, has_next)
+
+
+# --- Komenda CLI ---
+@app.cli.command("search-rebuild")
+@click.option(
+    "--batch-size",
+    default=REBUILD_BATCH_SIZE,
+    show_default=True,
+    help="Liczba wierszy w jednej transakcji.",
+)
+def search_rebuild_command(batch_size):
+    """Buduje indeks wyszukiwania od nowa (np. po imporcie danych z pominięciem ORM)."""
+    counts = rebuild_index(batch_size=batch_size)
+    click.echo(
+        f"Zaindeksowano posty: {counts['post']}, turnieje: {counts['tournament']}."
+    )
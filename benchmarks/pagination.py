@@ -0,0 +1,131 @@
+# benchmarks/pagination.py
+#
+# Porównuje czas pobrania strony /news przez OFFSET i przez kursor (keyset)
+# na płytkiej i głębokiej stronie archiwum.
+#
+# Użycie:  python -m benchmarks.pagination [--posts N] [--page N] [--repeat N]
+# Baza SQLite tworzona jest w katalogu tymczasowym.
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="OFFSET vs keyset dla /news.")
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--page", type=int, default=5000, help="Numer głębokiej strony.")
+    parser.add_argument("--repeat", type=int, default=50, help="Liczba powtórzeń pomiaru.")
+    return parser.parse_args()
+
+
+args = parse_args()
+db_path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+os.environ["DATABASE_URL"] = "sqlite:///" + db_path
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import app, db  # noqa: E402
+from app.models import Post, User  # noqa: E402
+from app.pagination import encode_cursor, keyset_paginate  # noqa: E402
+
+
+def seed(posts):
+    db.session.execute(
+        insert(User),
+        [
+            dict(
+                username="autor",
+                email="autor@example.com",
+                password_hash="x",
+                first_name="Jan",
+                last_name="Kowalski",
+                is_admin=True,
+                email_verified=True,
+                username_lower="autor",
+                email_lower="autor@example.com",
+            )
+        ],
+    )
+    now = datetime.utcnow()
+    for start in range(0, posts, 10000):
+        db.session.execute(
+            insert(Post),
+            [
+                dict(
+                    title=f"Post {i}",
+                    content="Lorem ipsum " * 50,
+                    user_id=1,
+                    # Co dziesiąty post ma tę samą datę co poprzedni - remisy rozstrzyga id
+                    date_posted=now - timedelta(minutes=i - i % 10 // 9),
+                )
+                for i in range(start, min(start + 10000, posts))
+            ],
+        )
+    db.session.commit()
+
+
+def measure(fetch):
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        fetch()
+        db.session.expunge_all()
+    return (time.perf_counter() - started) * 1000 / args.repeat
+
+
+def main():
+    per_page = app.config["POSTS_PER_PAGE"]
+    with app.app_context():
+        db.create_all()
+        print(f"Wypełnianie bazy ({args.posts} postów)...")
+        seed(args.posts)
+
+        # Kursor "następna strona" dla strony `page` - tak jak w linku z poprzedniej
+        boundary = (
+            Post.query.order_by(Post.date_posted.desc(), Post.id.desc())
+            .offset((args.page - 1) * per_page - 1)
+            .first()
+        )
+        deep_cursor = encode_cursor(boundary.date_posted, boundary.id, "next", args.page)
+
+        results = {
+            "COUNT(*) (bez cache)": lambda: Post.query.count(),
+            "OFFSET, strona 1": lambda: Post.query.order_by(Post.date_posted.desc())
+            .paginate(page=1, per_page=per_page, count=False)
+            .items,
+            f"OFFSET, strona {args.page}": lambda: Post.query.order_by(
+                Post.date_posted.desc()
+            )
+            .paginate(page=args.page, per_page=per_page, count=False)
+            .items,
+            "keyset, strona 1": lambda: keyset_paginate(
+                Post.query, Post.date_posted, Post.id, per_page=per_page
+            ),
+            f"keyset, strona {args.page}": lambda: keyset_paginate(
+                Post.query,
+                Post.date_posted,
+                Post.id,
+                cursor=deep_cursor,
+                per_page=per_page,
+            ),
+        }
+        for name, fetch in results.items():
+            print(f"{name:<28} {measure(fetch):8.2f} ms")
+
+        deep = keyset_paginate(
+            Post.query, Post.date_posted, Post.id, cursor=deep_cursor, per_page=per_page
+        )
+        offset = (
+            Post.query.order_by(Post.date_posted.desc(), Post.id.desc())
+            .offset((args.page - 1) * per_page)
+            .limit(per_page)
+            .all()
+        )
+        assert [p.id for p in deep.items] == [p.id for p in offset]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/passwords.py
+#
+# Mierzy, ile logowań na sekundę obsłuży jeden worker przy różnych
+# parametrach hashowania i rozmiarach puli PASSWORD_HASH_WORKERS.
+# Żądania symulowane są wątkami (jak worker gthread gunicorna).
+#
+# Użycie:  python -m benchmarks.passwords [--logins N] [--threads N]
+#              [--workers 1,2,4] [--method scrypt:32768:8:1 --method ...]
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import app, passwords  # noqa: E402
+
+DEFAULT_METHODS = ("scrypt:32768:8:1", "scrypt:16384:8:1", "pbkdf2:sha256:600000")
+PASSWORD = "Haslo123!"
+
+
+class Account:
+    def __init__(self, password_hash):
+        self.password_hash = password_hash
+
+
+def logins_per_second(method, workers, threads, logins):
+    app.config.update(PASSWORD_HASH_METHOD=method, PASSWORD_HASH_WORKERS=workers)
+    # Nowa pula z nowym rozmiarem
+    passwords._pool = None
+    accounts = [
+        Account(generate_password_hash(PASSWORD, method)) for _ in range(logins)
+    ]
+    with ThreadPoolExecutor(threads) as requests:
+        started = time.perf_counter()
+        results = list(
+            requests.map(
+                lambda account: passwords.check_password(account, PASSWORD), accounts
+            )
+        )
+        elapsed = time.perf_counter() - started
+    assert all(results)
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logowania/s na worker.")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8, help="Wątki żądań workera.")
+    parser.add_argument("--workers", default="1,2,4", help="Rozmiary puli hashowania.")
+    parser.add_argument("--method", action="append", help="Parametry hashowania.")
+    args = parser.parse_args()
+
+    methods = args.method or DEFAULT_METHODS
+    workers = [int(value) for value in args.workers.split(",")]
+    print(
+        f"Logowań: {args.logins}, wątków żądań: {args.threads}, CPU: {os.cpu_count()}\n"
+    )
+    with app.app_context():
+        for method in methods:
+            for size in workers:
+                rate = logins_per_second(method, size, args.threads, args.logins)
+                print(f"{method:<24} pula {size}: {rate:8.1f} logowań/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/profanity.py
+#
+# Porównuje czas sprawdzenia jednej nazwy użytkownika: lista słów
+# (Aho-Corasick) kontra profanity_check.predict wywoływane dla każdej nazwy.
+#
+# Użycie:  python -m benchmarks.profanity [--names N]
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from faker import Faker  # noqa: E402
+
+from app import app  # noqa: E402
+from app.profanity import AMBIGUOUS, get_moderator, get_predict, is_profane  # noqa: E402
+
+
+def per_call_us(func, names):
+    started = time.perf_counter()
+    for name in names:
+        func(name)
+    return (time.perf_counter() - started) * 1_000_000 / len(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wydajność filtra nazw użytkowników.")
+    parser.add_argument("--names", type=int, default=2000)
+    args = parser.parse_args()
+
+    fake = Faker(["pl_PL", "en_US"])
+    Faker.seed(42)
+    names = [fake.user_name()[:20] for _ in range(args.names)]
+    names += ["kurwa123", "Sh1tHead", "j3bac_wszystko", "bass_player", "peacock"]
+
+    moderator = get_moderator()
+    predict = get_predict()
+
+    with app.app_context():
+        results = {
+            "lista słów (UsernameModerator.check)": per_call_us(moderator.check, names),
+            "is_profane (lista + ML dla niejednoznacznych)": per_call_us(is_profane, names),
+            "profanity_check.predict([nazwa])": per_call_us(
+                lambda name: predict([name]), names
+            ),
+        }
+
+    ambiguous = sum(moderator.check(name) == AMBIGUOUS for name in names)
+    print(f"Nazw: {len(names)}, niejednoznacznych (trafia do ML): {ambiguous}\n")
+    for name, microseconds in results.items():
+        print(f"{name}: {microseconds:.1f} µs/nazwa")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# benchmarks/query_plans.py
+#
+# Wypełnia osobną bazę danymi testowymi i pokazuje plany zapytań z publicznych
+# stron, żeby sprawdzić, czy korzystają z indeksów.
+#
+# Użycie:  python -m benchmarks.query_plans [--posts N] [--tournaments N]
+#          [--database-url URL]
+# Bez --database-url baza SQLite tworzona jest w katalogu tymczasowym.
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BATCH_SIZE = 10000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Plany zapytań dla gorących ścieżek.")
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--tournaments", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20, help="Liczba powtórzeń pomiaru.")
+    parser.add_argument(
+        "--database-url",
+        help="Pusta baza do wypełnienia (domyślnie tymczasowy plik SQLite).",
+    )
+    return parser.parse_args()
+
+
+args = parse_args()
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    db_path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    os.environ["DATABASE_URL"] = "sqlite:///" + db_path
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app import app, db  # noqa: E402
+from app.models import (  # noqa: E402
+    Post,
+    Tournament,
+    TournamentRegistration,
+    TournamentWinner,
+    User,
+)
+
+
+def insert_in_batches(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(model), rows[start : start + BATCH_SIZE])
+    db.session.commit()
+
+
+def seed(users, posts, tournaments):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    insert_in_batches(
+        User,
+        [
+            dict(
+                username=f"user{i}",
+                email=f"user{i}@example.com",
+                password_hash="x",
+                first_name="Jan",
+                last_name="Kowalski",
+                is_admin=False,
+                email_verified=True,
+            )
+            for i in range(1, users + 1)
+        ],
+    )
+    insert_in_batches(
+        Post,
+        [
+            dict(
+                title=f"Post {i}",
+                content="Lorem ipsum " * 50,
+                user_id=rng.randint(1, users),
+                date_posted=now - timedelta(minutes=rng.randint(0, 2_000_000)),
+                image_file="default.png",
+            )
+            for i in range(posts)
+        ],
+    )
+    insert_in_batches(
+        Tournament,
+        [
+            dict(
+                title=f"Turniej {i}",
+                description="Opis turnieju " * 30,
+                banner_image="default.png",
+                start_date=now + timedelta(days=rng.randint(-3000, 300)),
+                max_players=32,
+            )
+            for i in range(tournaments)
+        ],
+    )
+
+    registrations, winners = [], []
+    for tournament_id in range(1, tournaments + 1):
+        players = rng.sample(range(1, users + 1), 10)
+        registrations.extend(
+            dict(tournament_id=tournament_id, user_id=user_id, registration_date=now)
+            for user_id in players
+        )
+        winners.extend(
+            dict(tournament_id=tournament_id, user_id=user_id, placing=placing)
+            for placing, user_id in enumerate(players[:3], start=1)
+        )
+    insert_in_batches(TournamentRegistration, registrations)
+    insert_in_batches(TournamentWinner, winners)
+
+
+def hot_queries():
+    today = datetime.utcnow().date()
+    return {
+        "index: najnowsze posty": select(Post)
+        .order_by(Post.date_posted.desc())
+        .limit(3),
+        "news: strona 500": select(Post)
+        .order_by(Post.date_posted.desc())
+        .limit(9)
+        .offset(9 * 499),
+        "posty użytkownika": select(Post).where(Post.user_id == 7),
+        "nadchodzące turnieje": select(Tournament)
+        .where(Tournament.start_date >= today)
+        .order_by(Tournament.start_date.asc())
+        .limit(3),
+        "przeszłe turnieje": select(Tournament)
+        .where(Tournament.start_date < today)
+        .order_by(Tournament.start_date.desc())
+        .limit(6),
+        "podium turniejów": select(TournamentWinner)
+        .where(TournamentWinner.tournament_id.in_(range(1, 7)))
+        .order_by(TournamentWinner.tournament_id, TournamentWinner.placing.asc()),
+        "zapis gracza na turniej": select(TournamentRegistration).where(
+            TournamentRegistration.user_id == 7,
+            TournamentRegistration.tournament_id == 11,
+        ),
+        "liczba zapisów": select(
+            TournamentRegistration.tournament_id, func.count(TournamentRegistration.id)
+        )
+        .where(TournamentRegistration.tournament_id.in_(range(1, 7)))
+        .group_by(TournamentRegistration.tournament_id),
+    }
+
+
+def explain(sql):
+    if db.engine.dialect.name == "sqlite":
+        rows = db.session.execute(db.text("EXPLAIN QUERY PLAN " + sql))
+        return [row[-1] for row in rows]
+    rows = db.session.execute(db.text("EXPLAIN " + sql))
+    return [row[0] for row in rows]
+
+
+def main():
+    with app.app_context():
+        if db.inspect(db.engine).get_table_names():
+            sys.exit("Baza nie jest pusta - podaj pustą bazę w --database-url.")
+        db.create_all()
+
+        print(f"Wypełnianie bazy: {os.environ['DATABASE_URL']}")
+        started = time.perf_counter()
+        seed(args.users, args.posts, args.tournaments)
+        print(f"Gotowe w {time.perf_counter() - started:.1f} s\n")
+
+        for name, query in hot_queries().items():
+            sql = str(
+                query.compile(
+                    dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+                )
+            )
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                db.session.execute(db.text(sql)).all()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+
+            print(f"== {name} ({elapsed_ms:.2f} ms)")
+            for line in explain(sql):
+                print(f"   {line}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
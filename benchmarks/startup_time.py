@@ -0,0 +1,49 @@
+# benchmarks/startup_time.py
+#
+# Mierzy czas importu pakietu `app` w świeżym interpreterze: obecnie (model
+# profanity_check ładowany przy pierwszym użyciu) i tak jak wcześniej, gdy
+# app.forms importował profanity_check przy starcie.
+#
+# Użycie:  python -m benchmarks.startup_time [--repeat N]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    "import app (leniwy model)": "import app",
+    "import app + profanity_check (jak wcześniej)": "import app, profanity_check",
+}
+
+
+def measure(code, repeat):
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "benchmark")
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Czas importu aplikacji.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = statistics.median(measure("pass", args.repeat))
+    print(f"Pusty interpreter: {baseline:.0f} ms (odejmowany od wyników)\n")
+    for name, code in SCENARIOS.items():
+        timings = measure(code, args.repeat)
+        print(
+            f"{name}: mediana {statistics.median(timings) - baseline:.0f} ms, "
+            f"min {min(timings) - baseline:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
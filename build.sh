@@ -11,6 +11,9 @@ set -o errexit
 # Install dependencies
 pip install -r requirements.txt
 
+# Build fingerprinted, precompressed static assets (after `npm run build`)
+flask assets-build
+
 # Run database migrations
 flask db upgrade
 
@@ -0,0 +1,27 @@
+# gunicorn.conf.py
+#
+# Gunicorn wczytuje ten plik automatycznie, gdy jest uruchamiany z katalogu projektu.
+
+import os
+
+# Aplikacja jest importowana raz w procesie master, a workery dostają ją przez fork
+preload_app = os.environ.get("GUNICORN_PRELOAD_APP", "true").lower() in [
+    "true",
+    "on",
+    "1",
+]
+
+
+def when_ready(server):
+    # Lista słów i model profanity_check ładowane są przed forkiem workerów, dzięki czemu
+    # jego pamięć jest współdzielona (copy-on-write), a pierwsza rejestracja
+    # w każdym workerze nie czeka na wczytanie scikit-learn.
+    if preload_app and os.environ.get("PRELOAD_PROFANITY_MODEL", "true").lower() in [
+        "true",
+        "on",
+        "1",
+    ]:
+        from app.profanity import preload
+
+        preload()
+        server.log.info("Filtr nazw użytkowników został wczytany w procesie master.")
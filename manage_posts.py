@@ -1,32 +1,21 @@
 # manage_posts.py
 
-import random
-from faker import Faker
-from app import app, db
+from app import app
+from app.fixtures import generate
+from app.lifecycle import delete_rows
 from app.models import User, Post
 
-# Inicjalizacja Fakera z polskimi danymi
-fake = Faker("pl_PL")
 
-def generate_posts(count=10):
-    """Generuje określoną liczbę fałszywych postów."""
+def generate_posts(count=10, seed=0):
+    """Generuje określoną liczbę fałszywych postów (hurtowo, przez app.fixtures)."""
     with app.app_context():
-        # Sprawdź, czy istnieje jakikolwiek użytkownik, który może być autorem
-        author = User.query.first()
-        if not author:
+        # Autorami są administratorzy, a gdy ich nie ma - pierwszy użytkownik
+        if not User.query.first():
             print("Błąd: Nie znaleziono żadnego użytkownika w bazie danych. Stwórz najpierw użytkownika.")
             return
 
         print(f"Generowanie {count} postów...")
-        for i in range(count):
-            title = fake.sentence(nb_words=6)
-            # Generowanie od 3 do 7 paragrafów losowego tekstu
-            content = "\n\n".join(fake.paragraphs(nb=random.randint(3, 7)))
-            
-            post = Post(title=title, content=content, author=author)
-            db.session.add(post)
-        
-        db.session.commit()
+        generate(posts=count, seed=seed)
         print(f"Pomyślnie dodano {count} nowych postów.")
 
 
@@ -42,9 +31,10 @@ def delete_all_posts():
         choice = input().lower()
 
         if choice == 't':
-            Post.query.delete()
-            db.session.commit()
+            counts = delete_rows(Post)
             print("Wszystkie posty zostały usunięte.")
+            for table, deleted in counts.items():
+                print(f"  {table}: {deleted}")
         else:
             print("Operacja anulowana.")
 
@@ -62,4 +52,5 @@ if __name__ == "__main__":
     elif args.delete:
         delete_all_posts()
     else:
-        print("Użycie: python manage_posts.py [--generate N | --delete]")
\ No newline at end of file
+        print("Użycie: python manage_posts.py [--generate N | --delete]")
+        print("Więcej danych naraz (użytkownicy, turnieje, zapisy): flask generate-data --help")
\ No newline at end of file
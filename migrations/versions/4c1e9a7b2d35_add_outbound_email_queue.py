@@ -0,0 +1,50 @@
+"""Add outbound email queue
+
+Revision ID: 4c1e9a7b2d35
+Revises: a87dd4cd5bdf
+Create Date: 2026-10-17 09:12:40.318204
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4c1e9a7b2d35"
+down_revision = "a87dd4cd5bdf"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "outbound_email",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("subject", sa.String(length=255), nullable=False),
+        sa.Column("sender", sa.String(length=120), nullable=True),
+        sa.Column("recipients", sa.Text(), nullable=False),
+        sa.Column("text_body", sa.Text(), nullable=True),
+        sa.Column("html_body", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(length=10), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("locked_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("outbound_email", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_outbound_email_status_next_attempt",
+            ["status", "next_attempt_at"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("outbound_email", schema=None) as batch_op:
+        batch_op.drop_index("ix_outbound_email_status_next_attempt")
+
+    op.drop_table("outbound_email")
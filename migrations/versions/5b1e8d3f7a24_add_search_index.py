@@ -0,0 +1,184 @@
+"""Add full-text search index for posts and tournaments
+
+Revision ID: 5b1e8d3f7a24
+Revises: a4d7e2c95f18
+Create Date: 2026-10-17 20:26:51.904713
+
+"""
+
+import re
+import unicodedata
+from html.parser import HTMLParser
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5b1e8d3f7a24"
+down_revision = "a4d7e2c95f18"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+# --- Tekst indeksu ---
+# Kopia app.models.plain_text i stemmera z app.search w wersji z tej rewizji.
+# Po zmianie stemmera aplikacji indeks przebudowuje `flask search-rebuild`,
+# a ta migracja zawsze zapisuje to samo.
+BLOCK_TAGS = {
+    "p", "br", "div", "li", "ul", "ol", "blockquote",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+}  # fmt: skip
+SUFFIXES = sorted(
+    (
+        "owie ami ach ego emu ych ich ymi imi iem owi owa owe owy ow om em "
+        "ie ia iu a e i o u y"
+    ).split(),
+    key=len,
+    reverse=True,
+)
+MIN_STEM_LENGTH = 3
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in BLOCK_TAGS:
+            self.parts.append(" ")
+
+
+def plain_text(html):
+    parser = _TextExtractor()
+    parser.feed(html or "")
+    parser.close()
+    return " ".join("".join(parser.parts).split())
+
+
+def _stem(token):
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+            return token[: -len(suffix)]
+    return token
+
+
+def _terms(value):
+    value = unicodedata.normalize("NFKD", (value or "").lower().replace("ł", "l"))
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return " ".join(_stem(token) for token in _TOKEN.findall(value))
+
+
+def document_values(kind, item_id, title, body):
+    return {
+        "kind": kind,
+        "item_id": item_id,
+        "title_terms": _terms(title),
+        "body_terms": _terms(body),
+    }
+
+
+# SQLite: tabela FTS5 z zawartością w search_document, aktualizowana wyzwalaczami
+SQLITE_FTS = (
+    "CREATE VIRTUAL TABLE search_fts USING fts5("
+    "title_terms, body_terms, content='search_document', content_rowid='id', "
+    "prefix='2 3')",
+    "CREATE TRIGGER search_document_ai AFTER INSERT ON search_document BEGIN "
+    "INSERT INTO search_fts(rowid, title_terms, body_terms) "
+    "VALUES (new.id, new.title_terms, new.body_terms); END",
+    "CREATE TRIGGER search_document_ad AFTER DELETE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title_terms, body_terms) "
+    "VALUES ('delete', old.id, old.title_terms, old.body_terms); END",
+    "CREATE TRIGGER search_document_au AFTER UPDATE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title_terms, body_terms) "
+    "VALUES ('delete', old.id, old.title_terms, old.body_terms); "
+    "INSERT INTO search_fts(rowid, title_terms, body_terms) "
+    "VALUES (new.id, new.title_terms, new.body_terms); END",
+)
+POSTGRESQL_INDEX = (
+    "CREATE INDEX ix_search_document_vector ON search_document USING gin ("
+    "(setweight(to_tsvector('simple'::regconfig, title_terms), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, body_terms), 'B')))"
+)
+
+
+def _backfill(kind, table_name, columns, document):
+    """Indeksuje istniejące wiersze partiami po id."""
+    table = sa.table(table_name, sa.column("id", sa.Integer), *map(sa.column, columns))
+    search_document = sa.table(
+        "search_document",
+        sa.column("kind"),
+        sa.column("item_id"),
+        sa.column("title_terms"),
+        sa.column("body_terms"),
+    )
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, *(table.c[name] for name in columns))
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            search_document.insert(),
+            [document_values(kind, row[0], *document(*row[1:])) for row in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    op.create_table(
+        "search_document",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("title_terms", sa.Text(), nullable=False),
+        sa.Column("body_terms", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("kind", "item_id", name="uq_search_document_item"),
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(POSTGRESQL_INDEX)
+    elif dialect == "sqlite":
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+
+    _backfill(
+        "post",
+        "post",
+        ("title", "content"),
+        lambda title, content: (title, plain_text(content)),
+    )
+    _backfill(
+        "tournament",
+        "tournament",
+        ("title", "location", "description"),
+        lambda title, location, description: (
+            title,
+            " ".join(filter(None, (location, plain_text(description)))),
+        ),
+    )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_search_document_vector", table_name="search_document")
+    elif dialect == "sqlite":
+        op.execute("DROP TABLE search_fts")
+    op.drop_table("search_document")
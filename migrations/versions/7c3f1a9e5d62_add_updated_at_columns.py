@@ -0,0 +1,44 @@
+"""Add updated_at row versions to Post and Tournament
+
+Revision ID: 7c3f1a9e5d62
+Revises: 5b1e8d3f7a24
+Create Date: 2026-10-17 21:04:37.218455
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7c3f1a9e5d62"
+down_revision = "5b1e8d3f7a24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+
+    # Czas wcześniejszych zmian nie był zapisywany - posty dostają datę
+    # publikacji, turnieje bieżący czas
+    op.execute("UPDATE post SET updated_at = date_posted")
+    op.execute("UPDATE tournament SET updated_at = CURRENT_TIMESTAMP")
+
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.drop_column("updated_at")
+
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.drop_column("updated_at")
@@ -0,0 +1,71 @@
+"""Add indexes for hot filter and sort columns
+
+Revision ID: 9d2f6b81c4e7
+Revises: 4c1e9a7b2d35
+Create Date: 2026-10-17 10:03:18.552190
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "9d2f6b81c4e7"
+down_revision = "4c1e9a7b2d35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Usuwamy zdublowane zapisy (zostaje najstarszy), zanim założymy UNIQUE
+    op.execute(
+        """
+        DELETE FROM tournament_registration
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM tournament_registration
+            GROUP BY tournament_id, user_id
+        )
+        """
+    )
+
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.create_index("ix_post_date_posted", ["date_posted"], unique=False)
+        batch_op.create_index("ix_post_user_id", ["user_id"], unique=False)
+
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.create_index("ix_tournament_start_date", ["start_date"], unique=False)
+
+    with op.batch_alter_table("tournament_registration", schema=None) as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_tournament_registration_tournament_user", ["tournament_id", "user_id"]
+        )
+        batch_op.create_index(
+            "ix_tournament_registration_user_id", ["user_id"], unique=False
+        )
+
+    with op.batch_alter_table("tournament_winner", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_tournament_winner_tournament_placing",
+            ["tournament_id", "placing"],
+            unique=False,
+        )
+        batch_op.create_index("ix_tournament_winner_user_id", ["user_id"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("tournament_winner", schema=None) as batch_op:
+        batch_op.drop_index("ix_tournament_winner_user_id")
+        batch_op.drop_index("ix_tournament_winner_tournament_placing")
+
+    with op.batch_alter_table("tournament_registration", schema=None) as batch_op:
+        batch_op.drop_index("ix_tournament_registration_user_id")
+        batch_op.drop_constraint(
+            "uq_tournament_registration_tournament_user", type_="unique"
+        )
+
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.drop_index("ix_tournament_start_date")
+
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.drop_index("ix_post_user_id")
+        batch_op.drop_index("ix_post_date_posted")
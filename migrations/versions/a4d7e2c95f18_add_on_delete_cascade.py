@@ -0,0 +1,64 @@
+"""Add ON DELETE CASCADE to user and tournament foreign keys
+
+Revision ID: a4d7e2c95f18
+Revises: f2c96b3e0a17
+Create Date: 2026-10-17 19:12:40.318552
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "a4d7e2c95f18"
+down_revision = "f2c96b3e0a17"
+branch_labels = None
+depends_on = None
+
+# (tabela, kolumna, tabela wskazywana)
+FOREIGN_KEYS = [
+    ("post", "user_id", "user"),
+    ("tournament_registration", "user_id", "user"),
+    ("tournament_registration", "tournament_id", "tournament"),
+    ("tournament_winner", "user_id", "user"),
+    ("tournament_winner", "tournament_id", "tournament"),
+]
+# Nazwy nadawane kluczom obcym; SQLite nie przechowuje nazw, więc w trybie
+# batch potrzebna jest konwencja, żeby dało się wskazać klucz do usunięcia
+NAMING_CONVENTION = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+}
+
+
+def _fk_name(table, column, referred):
+    return f"fk_{table}_{column}_{referred}"
+
+
+def _replace_foreign_keys(old_name, ondelete):
+    for table, column, referred in FOREIGN_KEYS:
+        with op.batch_alter_table(
+            table, schema=None, naming_convention=NAMING_CONVENTION
+        ) as batch_op:
+            batch_op.drop_constraint(old_name(table, column, referred), type_="foreignkey")
+            batch_op.create_foreign_key(
+                _fk_name(table, column, referred),
+                referred,
+                [column],
+                ["id"],
+                ondelete=ondelete,
+            )
+
+
+def _default_fk_name(table, column, referred):
+    # Klucze z pierwszych migracji nie miały nazw - PostgreSQL nadał domyślne
+    if op.get_bind().dialect.name == "sqlite":
+        return _fk_name(table, column, referred)
+    return f"{table}_{column}_fkey"
+
+
+def upgrade():
+    _replace_foreign_keys(_default_fk_name, "CASCADE")
+
+
+def downgrade():
+    _replace_foreign_keys(_fk_name, None)
@@ -0,0 +1,42 @@
+"""Add image processing status to Post and Tournament
+
+Revision ID: b7e4d19a6c20
+Revises: e5a03c7f91b2
+Create Date: 2026-10-17 14:02:37.518204
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e4d19a6c20"
+down_revision = "e5a03c7f91b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Istniejące obrazy są już przetworzone - server_default "ready"
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "image_status", sa.String(length=10), server_default="ready", nullable=False
+            )
+        )
+
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "banner_status", sa.String(length=10), server_default="ready", nullable=False
+            )
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.drop_column("banner_status")
+
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.drop_column("image_status")
@@ -0,0 +1,47 @@
+"""Add indexes for admin user search
+
+Revision ID: c3a8f2e71d94
+Revises: b7e4d19a6c20
+Create Date: 2026-10-17 15:48:12.402916
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3a8f2e71d94"
+down_revision = "b7e4d19a6c20"
+branch_labels = None
+depends_on = None
+
+LOWER_INDEXES = {
+    "ix_user_lower_username": "username",
+    "ix_user_lower_email": "email",
+    "ix_user_lower_first_name": "first_name",
+    "ix_user_lower_last_name": "last_name",
+}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            'CREATE INDEX ix_user_search_trgm ON "user" USING gin '
+            "(lower(username || ' ' || email || ' ' || first_name || ' ' || last_name) "
+            "gin_trgm_ops)"
+        )
+    elif dialect == "sqlite":
+        for name, column in LOWER_INDEXES.items():
+            op.create_index(name, "user", [sa.text(f"lower({column})")])
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_user_search_trgm", table_name="user")
+    elif dialect == "sqlite":
+        for name in LOWER_INDEXES:
+            op.drop_index(name, table_name="user")
@@ -0,0 +1,37 @@
+"""Add archived flag to Post and Tournament
+
+Revision ID: d81f4c2a6e53
+Revises: c3a8f2e71d94
+Create Date: 2026-10-17 16:48:05.114027
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d81f4c2a6e53"
+down_revision = "c3a8f2e71d94"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("archived", sa.Boolean(), server_default=sa.false(), nullable=False)
+        )
+
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("archived", sa.Boolean(), server_default=sa.false(), nullable=False)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.drop_column("archived")
+
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.drop_column("archived")
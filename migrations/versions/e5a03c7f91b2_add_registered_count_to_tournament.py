@@ -0,0 +1,40 @@
+"""Add registered_count to Tournament
+
+Revision ID: e5a03c7f91b2
+Revises: 9d2f6b81c4e7
+Create Date: 2026-10-17 11:26:51.904377
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e5a03c7f91b2"
+down_revision = "9d2f6b81c4e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "registered_count", sa.Integer(), server_default="0", nullable=False
+            )
+        )
+
+    op.execute(
+        """
+        UPDATE tournament SET registered_count = (
+            SELECT COUNT(*) FROM tournament_registration
+            WHERE tournament_registration.tournament_id = tournament.id
+        )
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.drop_column("registered_count")
@@ -0,0 +1,177 @@
+"""Add case-insensitive username and email columns to User
+
+Revision ID: e9b4c6d2a871
+Revises: 7c3f1a9e5d62
+Create Date: 2026-10-17 22:11:05.804317
+
+"""
+
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e9b4c6d2a871"
+down_revision = "7c3f1a9e5d62"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+USERNAME_LENGTH = 20
+logger = logging.getLogger("alembic.env")
+# Indeksy na lower() z c3a8f2e71d94 - tryb batch w SQLite odtwarza tabelę
+# bez indeksów na wyrażeniach, więc trzeba je założyć ponownie
+LOWER_INDEXES = {
+    "ix_user_lower_username": "username",
+    "ix_user_lower_email": "email",
+    "ix_user_lower_first_name": "first_name",
+    "ix_user_lower_last_name": "last_name",
+}
+
+user = sa.table(
+    "user",
+    sa.column("id", sa.Integer),
+    sa.column("username", sa.String),
+    sa.column("email", sa.String),
+    sa.column("username_lower", sa.String),
+    sa.column("email_lower", sa.String),
+)
+
+
+def normalize_identity(value):
+    # Kopia app.models.normalize_identity z czasu tej rewizji
+    return (value or "").strip().lower()
+
+
+def _batches(*columns):
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(user.c.id, *columns)
+            .where(user.c.id > last_id)
+            .order_by(user.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _check_emails():
+    """Sprawdza konta przed zmianą schematu; zwraca zbiór zajętych nazw.
+
+    Konta z tym samym e-mailem trzeba połączyć ręcznie, więc migracja
+    kończy się błędem, zanim cokolwiek zmieni.
+    """
+    seen, duplicates, usernames = {}, [], set()
+    for rows in _batches(user.c.username, user.c.email):
+        for user_id, username, email in rows:
+            usernames.add(normalize_identity(username))
+            first = seen.setdefault(normalize_identity(email), user_id)
+            if first != user_id:
+                duplicates.append(f"{email} (id {first} i {user_id})")
+    if duplicates:
+        raise RuntimeError(
+            "Konta z tym samym e-mailem (bez wielkości liter): " + ", ".join(duplicates)
+        )
+    return usernames
+
+
+def _free_username(username, user_id, taken):
+    """Nazwa z dopisanym id (i numerem, gdyby i taka była zajęta)."""
+    suffixes = [f"_{user_id}"]
+    suffixes += (f"_{user_id}_{number}" for number in range(2, len(taken) + 3))
+    for suffix in suffixes:
+        candidate = username[: USERNAME_LENGTH - len(suffix)] + suffix
+        if normalize_identity(candidate) not in taken:
+            return candidate
+
+
+def _backfill(taken):
+    """Wypełnia kolumny partiami po id.
+
+    Konta, których nazwa różni się od starszego konta tylko wielkością liter,
+    dostają wolną nazwę z dopisanym id (np. "adam" i "Adam" -> "Adam_42").
+    `taken` - nazwy wszystkich kont, także tych z dalszych partii.
+    """
+    connection = op.get_bind()
+    usernames = set()
+    for rows in _batches(user.c.username, user.c.email):
+        values = []
+        for user_id, username, email in rows:
+            username_lower = normalize_identity(username)
+            if username_lower in usernames:
+                renamed = _free_username(username, user_id, taken)
+                # Właścicieli tych kont trzeba powiadomić o nowym loginie
+                logger.warning(
+                    "Zmieniono nazwę użytkownika id %s: %r -> %r",
+                    user_id,
+                    username,
+                    renamed,
+                )
+                username = renamed
+                username_lower = normalize_identity(username)
+                taken.add(username_lower)
+            usernames.add(username_lower)
+            values.append(
+                {
+                    "row_id": user_id,
+                    "row_username": username,
+                    "row_username_lower": username_lower,
+                    "row_email_lower": normalize_identity(email),
+                }
+            )
+        connection.execute(
+            user.update()
+            .where(user.c.id == sa.bindparam("row_id"))
+            .values(
+                username=sa.bindparam("row_username"),
+                username_lower=sa.bindparam("row_username_lower"),
+                email_lower=sa.bindparam("row_email_lower"),
+            ),
+            values,
+        )
+
+
+def _restore_lower_indexes():
+    if op.get_bind().dialect.name == "sqlite":
+        for name, column in LOWER_INDEXES.items():
+            op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON "user" (lower({column}))')
+
+
+def upgrade():
+    taken = _check_emails()
+
+    with op.batch_alter_table("user", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("username_lower", sa.String(length=20), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("email_lower", sa.String(length=120), nullable=True)
+        )
+
+    _backfill(taken)
+
+    with op.batch_alter_table("user", schema=None) as batch_op:
+        batch_op.alter_column(
+            "username_lower", existing_type=sa.String(length=20), nullable=False
+        )
+        batch_op.alter_column(
+            "email_lower", existing_type=sa.String(length=120), nullable=False
+        )
+        batch_op.create_unique_constraint("uq_user_username_lower", ["username_lower"])
+        batch_op.create_unique_constraint("uq_user_email_lower", ["email_lower"])
+    _restore_lower_indexes()
+
+
+def downgrade():
+    with op.batch_alter_table("user", schema=None) as batch_op:
+        batch_op.drop_constraint("uq_user_email_lower", type_="unique")
+        batch_op.drop_constraint("uq_user_username_lower", type_="unique")
+        batch_op.drop_column("email_lower")
+        batch_op.drop_column("username_lower")
+    _restore_lower_indexes()
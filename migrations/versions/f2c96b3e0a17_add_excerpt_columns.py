@@ -0,0 +1,111 @@
+"""Add stored plain-text excerpts to Post and Tournament
+
+Revision ID: f2c96b3e0a17
+Revises: d81f4c2a6e53
+Create Date: 2026-10-17 17:35:12.640981
+
+"""
+
+from html.parser import HTMLParser
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f2c96b3e0a17"
+down_revision = "d81f4c2a6e53"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+# Zajawki liczone tak jak w app.models w chwili tej rewizji - kopia, bo późniejsze
+# zmiany aplikacji nie mogą zmieniać wyniku starej migracji
+POST_EXCERPT_LENGTH = 150
+TOURNAMENT_EXCERPT_LENGTH = 200
+BLOCK_TAGS = {
+    "p", "br", "div", "li", "ul", "ol", "blockquote",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+}  # fmt: skip
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in BLOCK_TAGS:
+            self.parts.append(" ")
+
+
+def plain_excerpt(html, length):
+    parser = _TextExtractor()
+    parser.feed(html or "")
+    parser.close()
+    text = " ".join("".join(parser.parts).split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0].rstrip(" ,.;:-") + "…"
+
+
+def _backfill(table_name, body_column, length):
+    """Wypełnia zajawki partiami po id - bez wczytywania całej tabeli naraz."""
+    table = sa.table(
+        table_name,
+        sa.column("id", sa.Integer),
+        sa.column(body_column, sa.Text),
+        sa.column("excerpt", sa.String),
+    )
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, table.c[body_column])
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            table.update()
+            .where(table.c.id == sa.bindparam("row_id"))
+            .values(excerpt=sa.bindparam("row_excerpt")),
+            [
+                {"row_id": row_id, "row_excerpt": plain_excerpt(body, length)}
+                for row_id, body in rows
+            ],
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("excerpt", sa.String(length=255), server_default="", nullable=False)
+        )
+
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("excerpt", sa.String(length=255), server_default="", nullable=False)
+        )
+
+    _backfill("post", "content", POST_EXCERPT_LENGTH)
+    _backfill("tournament", "description", TOURNAMENT_EXCERPT_LENGTH)
+
+
+def downgrade():
+    with op.batch_alter_table("tournament", schema=None) as batch_op:
+        batch_op.drop_column("excerpt")
+
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.drop_column("excerpt")
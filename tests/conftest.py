@@ -1,5 +1,9 @@
 import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
 from app import app as flask_app, db
+from app.cache import fragment_cache
+from app.metrics import request_measured
 from app.models import User
 from werkzeug.security import generate_password_hash
 
@@ -15,6 +19,8 @@ def app():
             "SERVER_NAME": "localhost",
         }
     )
+    # Flask-Mail odczytuje TESTING tylko przy inicjalizacji - wyłączamy SMTP ręcznie
+    flask_app.extensions["mail"].suppress = True
     yield flask_app
 
 
@@ -35,6 +41,8 @@ def init_database(app):
     """Inicjalizuje bazę danych przed każdym testem i czyści ją po teście."""
     with app.app_context():
         db.create_all()
+        # Baza jest tworzona od nowa, więc fragmenty z poprzednich testów są nieaktualne
+        fragment_cache.clear()
         yield db
         db.session.remove()
         db.drop_all()
@@ -77,3 +85,77 @@ def new_admin(init_database, app):
         # Ponownie pobieramy użytkownika, aby upewnić się, że jest przywiązany do sesji
         admin = User.query.filter_by(email="admin@user.com").first()
         return admin
+
+
+@pytest.fixture(scope="function")
+def count_queries(app):
+    """Zwraca menedżer kontekstu zliczający zapytania SQL wykonane w jego bloku."""
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
+
+
+# Maksymalna liczba zapytań SQL na jedno żądanie (fixture query_budget)
+QUERY_BUDGETS = {
+    "index": 6,
+    "news": 4,
+    "post": 3,
+    "tournaments": 6,
+    "all_past_tournaments": 5,
+    "tournament_details": 5,
+}
+DEFAULT_QUERY_BUDGET = 10
+# Zapytanie o tym samym kształcie wykonane więcej razy w żądaniu to N+1
+QUERY_REPEAT_LIMIT = 3
+
+
+@pytest.fixture(scope="function")
+def query_budget(app):
+    """Zwraca menedżer kontekstu, który oblewa test, gdy żądanie w jego bloku
+    przekroczy budżet zapytań (QUERY_BUDGETS albo `limit`) lub wykona N+1."""
+
+    @contextmanager
+    def budget(limit=None, repeat_limit=QUERY_REPEAT_LIMIT):
+        reports = []
+
+        def collect(sender, report):
+            reports.append(report)
+
+        request_measured.connect(collect, app)
+        try:
+            yield reports
+        finally:
+            request_measured.disconnect(collect, app)
+
+        problems = []
+        for report in reports:
+            allowed = limit
+            if allowed is None:
+                allowed = QUERY_BUDGETS.get(report["endpoint"], DEFAULT_QUERY_BUDGET)
+            if report["queries"] > allowed:
+                problems.append(
+                    f"{report['path']}: {report['queries']} zapytań SQL (budżet {allowed})"
+                )
+            for shape, (count, origin) in report["repeated"].items():
+                if count > repeat_limit:
+                    problems.append(
+                        f"{report['path']}: N+1 - {count} razy z {origin}: {shape[:200]}"
+                    )
+        if problems:
+            pytest.fail("\n".join(problems))
+
+    return budget
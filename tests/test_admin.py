@@ -40,3 +40,259 @@ def test_admin_can_manage_users(client, new_admin, new_user):
     response = client.get("/admin/users")
     assert response.status_code == 200
     assert bytes(new_user.username, "utf-8") in response.data
+
+
+def _tournament_with_registrations(db, count, start_date):
+    from datetime import datetime
+    from app.models import Tournament, TournamentRegistration, User
+
+    tournament = Tournament(
+        title="Otwarty turniej", description="Opis", start_date=start_date, max_players=500
+    )
+    db.session.add(tournament)
+    for i in range(count):
+        player = User(
+            username=f"gracz{i}",
+            email=f"gracz{i}@test.pl",
+            password_hash="x",
+            first_name="=HYPERLINK()" if i == 0 else "Jan",
+            last_name="Kowalski",
+        )
+        db.session.add(player)
+        db.session.add(
+            TournamentRegistration(
+                player=player,
+                tournament=tournament,
+                registration_date=datetime(2025, 3, 1 + i % 20),
+            )
+        )
+    db.session.commit()
+    return tournament
+
+
+def test_registration_export_formats(client, new_admin, count_queries):
+    """
+    GIVEN turniej z 30 zapisami
+    WHEN administrator pobiera listę zapisów w każdym z formatów
+    THEN sprawdź, czy każdy plik zawiera wszystkie zapisy, a liczba zapytań nie zależy od liczby graczy
+    """
+    import csv
+    import io
+    import json
+    import zipfile
+    from datetime import datetime
+    from xml.etree import ElementTree
+
+    from app import db
+
+    tournament = _tournament_with_registrations(db, 30, datetime(2025, 6, 1))
+    client.post(
+        "/logowanie",
+        data=dict(login_identifier="admin@user.com", password="AdminPass123!"),
+    )
+    url = f"/tournament/{tournament.id}/registrations"
+
+    with count_queries() as queries:
+        response = client.get(url + ".json")
+    records = json.loads(response.data)
+    assert len(records) == 30
+    assert records[0]["tournament_title"] == "Otwarty turniej"
+    # Użytkownik (sesja), turniej i jedno zapytanie o wszystkie zapisy
+    assert len(queries) <= 3
+
+    lines = client.get(url + ".jsonl").data.decode("utf-8").splitlines()
+    assert len(lines) == 30 and json.loads(lines[0])["username"].startswith("gracz")
+
+    rows = list(csv.reader(io.StringIO(client.get(url + ".csv").data.decode("utf-8-sig"))))
+    assert rows[0][0] == "username" and len(rows) == 31
+    assert "'=HYPERLINK()" in [row[1] for row in rows]
+
+    response = client.get(url + ".xlsx")
+    assert response.headers["Content-Disposition"].endswith(".xlsx")
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    namespace = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    assert len(sheet.findall(f"{namespace}sheetData/{namespace}row")) == 31
+
+    filtered = client.get(url + ".jsonl?from=2025-03-01&to=2025-03-02")
+    assert len(filtered.data.decode("utf-8").splitlines()) == 4
+    assert client.get(url + ".xml").status_code == 404
+    assert client.get(url + ".csv?from=wczoraj").status_code == 400
+
+
+def test_season_registration_export(client, new_admin):
+    """
+    GIVEN turniej rozpoczynający się w 2025 roku
+    WHEN administrator pobiera zapisy z sezonów 2025 i 2024
+    THEN sprawdź, czy zapisy trafiają tylko do eksportu sezonu 2025
+    """
+    from datetime import datetime
+
+    from app import db
+
+    _tournament_with_registrations(db, 3, datetime(2025, 6, 1))
+    client.post(
+        "/logowanie",
+        data=dict(login_identifier="admin@user.com", password="AdminPass123!"),
+    )
+    assert len(client.get("/admin/registrations/season/2025.jsonl").data.splitlines()) == 3
+    assert client.get("/admin/registrations/season/2024.jsonl").data == b""
+
+
+def test_admin_user_list_is_paginated_and_searchable(client, new_admin, app):
+    """
+    GIVEN 120 użytkowników
+    WHEN administrator przegląda listę, wyszukuje i pobiera ją jako JSON
+    THEN sprawdź, czy strona zawiera tylko USERS_PER_PAGE wierszy, a wyszukiwanie działa w bazie
+    """
+    from app import db
+    from app.models import User
+
+    db.session.add_all(
+        User(
+            username=f"zawodnik{i:03d}",
+            email=f"zawodnik{i:03d}@klub.pl",
+            password_hash="x",
+            first_name="Anna" if i % 2 else "Piotr",
+            last_name="Nowak" if i < 10 else "Wiśniewski",
+        )
+        for i in range(120)
+    )
+    db.session.commit()
+    client.post(
+        "/logowanie",
+        data=dict(login_identifier="admin@user.com", password="AdminPass123!"),
+    )
+
+    html = client.get("/admin/users").data.decode("utf-8")
+    assert html.count('data-bs-target="#deleteUserModal"') == app.config["USERS_PER_PAGE"] - 1
+    assert "page=3" in html
+
+    html = client.get("/admin/users?q=ANNA+now&sort=username&dir=asc").data.decode("utf-8")
+    assert "zawodnik001" in html and "zawodnik009" in html
+    assert "zawodnik002" not in html and "zawodnik011" not in html
+
+    data = client.get("/admin/users.json?q=zawodnik&sort=id&dir=asc").get_json()
+    assert data["total"] == 120 and len(data["users"]) == app.config["USERS_PER_PAGE"]
+    assert data["users"][0]["username"] == "zawodnik000"
+    following = client.get(data["next"]).get_json()
+    assert following["page"] == 2
+    assert following["users"][0]["username"] == "zawodnik050"
+    assert client.get("/admin/users.json?q=100%25").get_json()["total"] == 0
+
+
+def test_add_winner_uses_user_lookup(client, new_admin, count_queries):
+    """
+    GIVEN turniej z 12 zapisanymi graczami i użytkownik spoza turnieju
+    WHEN administrator wyszukuje gracza w podpowiedziach i dodaje zwycięzcę
+    THEN sprawdź, czy strona nie wczytuje wszystkich użytkowników, a formularz sprawdza jedno id
+    """
+    from datetime import datetime
+    from app import db
+    from app.models import TournamentWinner, User
+
+    tournament = _tournament_with_registrations(db, 12, datetime(2025, 6, 1))
+    outsider = User(
+        username="gosc", email="gosc@test.pl", password_hash="x",
+        first_name="Gracz", last_name="Spoza",
+    )
+    db.session.add(outsider)
+    db.session.commit()
+    client.post(
+        "/logowanie",
+        data=dict(login_identifier="admin@user.com", password="AdminPass123!"),
+    )
+
+    url = f"/admin/tournament/{tournament.id}/manage_winners"
+    html = client.get(url).data.decode("utf-8")
+    assert "<option" not in html and "gracz11" not in html
+
+    lookup = "/admin/users/lookup"
+    found = client.get(f"{lookup}?q=GRACZ1").get_json()["users"]
+    assert [user["username"] for user in found] == ["gracz1", "gracz10", "gracz11"]
+    assert found[0]["name"] == "Jan Kowalski"
+    registered = client.get(f"{lookup}?tournament_id={tournament.id}&limit=100").get_json()
+    assert len(registered["users"]) == 12
+    assert client.get(f"{lookup}?q=gracz&tournament_id={tournament.id}&limit=3").get_json()[
+        "users"
+    ][-1]["username"] == "gracz10"
+    assert client.get(f"{lookup}?q=spoza").get_json()["users"][0]["id"] == outsider.id
+    assert client.get(f"{lookup}?q=spoza&tournament_id={tournament.id}").get_json() == {
+        "users": []
+    }
+    assert client.get(lookup).get_json() == {"users": []}
+
+    with count_queries() as queries:
+        response = client.post(url, data=dict(placing=1, user=found[1]["id"]))
+    assert response.status_code == 302
+    assert sum('FROM "user"' in q or "FROM user" in q for q in queries) <= 2
+    assert TournamentWinner.query.one().user.username == "gracz10"
+
+    response = client.post(url, data=dict(placing=2, user=999999))
+    assert "Nieprawidłowy użytkownik" in response.data.decode("utf-8")
+    response = client.post(url, data=dict(placing=2, user=""))
+    assert "Wybierz użytkownika z listy" in response.data.decode("utf-8")
+    assert TournamentWinner.query.count() == 1
+
+
+def test_bulk_post_and_tournament_actions(client, new_admin, count_queries):
+    """
+    GIVEN 60 postów i turniej z zapisami i zwycięzcami
+    WHEN administrator przegląda listy i wykonuje akcje hurtowe na zaznaczonych wierszach
+    THEN sprawdź, czy listy są stronicowane, a każda akcja to jedno zapytanie na tabelę
+    """
+    from datetime import datetime
+    from app import db
+    from app.models import Post, Tournament, TournamentRegistration, TournamentWinner
+
+    posts = [
+        Post(
+            title=f"Post hurtowy {i:02d}",
+            content="Treść",
+            author=new_admin,
+            date_posted=datetime(2025, 1, 1, 12, 0, 0, 250000) if i == 0 else datetime(2025, 1, 2),
+        )
+        for i in range(60)
+    ]
+    db.session.add_all(posts)
+    tournament = _tournament_with_registrations(db, 3, datetime(2025, 6, 1, 10, 0))
+    db.session.add(TournamentWinner(placing=1, user_id=1, tournament=tournament))
+    db.session.commit()
+    client.post(
+        "/logowanie",
+        data=dict(login_identifier="admin@user.com", password="AdminPass123!"),
+    )
+
+    html = client.get("/admin/posts").data.decode("utf-8")
+    assert html.count('type="checkbox" name="ids"') == 50 and "page=2" in html
+    assert 'data-bs-target="#deleteModal"' in html and 'id="deleteModal-' not in html
+    assert client.get("/admin/posts?page=2").data.decode("utf-8").count('type="checkbox" name="ids"') == 10
+
+    ids = [post.id for post in posts[:3]]
+    with count_queries() as queries:
+        client.post("/admin/posts/bulk", data=dict(action="archive", ids=ids))
+    assert len([q for q in queries if q.startswith("UPDATE post")]) == 1
+    assert Post.query.filter_by(archived=True).count() == 3
+    assert "Post hurtowy 00" not in client.get("/news").data.decode("utf-8")
+
+    client.post("/admin/posts/bulk", data=dict(action="shift", days=-3, ids=ids[:1]))
+    assert db.session.get(Post, ids[0]).date_posted == datetime(2024, 12, 29, 12, 0, 0, 250000)
+    response = client.post(
+        "/admin/posts/bulk", data=dict(action="shift", ids=ids), follow_redirects=True
+    )
+    assert "Podaj liczbę dni przesunięcia" in response.data.decode("utf-8")
+
+    client.post("/admin/posts/bulk", data=dict(action="delete", ids=ids))
+    assert Post.query.count() == 57
+
+    client.post(
+        "/admin/tournaments/bulk", data=dict(action="shift", days=7, ids=[tournament.id])
+    )
+    assert db.session.get(Tournament, tournament.id).start_date == datetime(2025, 6, 8, 10, 0)
+    with count_queries() as queries:
+        client.post("/admin/tournaments/bulk", data=dict(action="delete", ids=[tournament.id]))
+    # zapisy, podium, turniej i wpis w indeksie wyszukiwania
+    assert len([q for q in queries if q.startswith("DELETE")]) == 4
+    assert Tournament.query.count() == 0
+    assert TournamentRegistration.query.count() == 0
+    assert TournamentWinner.query.count() == 0
@@ -0,0 +1,59 @@
+import gzip
+import os
+
+from app import assets
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_build_and_serve_fingerprinted_assets(app, client, tmp_path, monkeypatch):
+    """
+    GIVEN katalog static z arkuszem CSS, skryptem, obrazem i źródłem Tailwinda
+    WHEN uruchamiane jest budowanie plików i przeglądarka pobiera arkusz
+    THEN sprawdź, czy nazwy zawierają hash treści, a serwer wybiera wersję skompresowaną
+    """
+    css = b"body { color: #123456; }\n" * 50
+    source, output = tmp_path / "static", tmp_path / "dist"
+    _write(str(source / "css" / "main.css"), css)
+    _write(str(source / "css" / "src" / "input.css"), b"@tailwind base;")
+    _write(str(source / "js" / "main.js"), b"console.log(1);")
+    _write(str(source / "images" / "logo.png"), b"\x89PNG")
+    monkeypatch.setitem(app.config, "ASSETS_FOLDER", str(output))
+    # Po teście wraca manifest aplikacji
+    monkeypatch.setattr(assets, "_manifest", None)
+
+    manifest = assets.build_assets(str(source), str(output))
+    assert sorted(manifest) == ["css/main.css", "images/logo.png", "js/main.js"]
+    hashed = manifest["css/main.css"]
+    assert hashed.startswith("css/main.") and hashed.endswith(".css")
+    assert os.path.exists(output / (hashed + ".gz"))
+    # Obrazów nie kompresujemy, a za mały plik po kompresji byłby większy
+    assert not os.path.exists(output / (manifest["images/logo.png"] + ".gz"))
+    assert not os.path.exists(output / (manifest["js/main.js"] + ".gz"))
+
+    with app.test_request_context():
+        url = assets.asset_url("css/main.css")
+        assert url == f"/assets/{hashed}"
+        assert assets.asset_url("post_pics/default.png") == "/static/post_pics/default.png"
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.mimetype == "text/css"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data) == css
+    response.close()
+
+    response = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.data == css
+    response.close()
+
+    # Zmiana treści zmienia nazwę pliku
+    _write(str(source / "css" / "main.css"), css + b"a {}\n")
+    assert assets.build_assets(str(source), str(output))["css/main.css"] != hashed
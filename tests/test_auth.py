@@ -1,3 +1,10 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
 def test_registration_page(client):
     """
     GIVEN Aplikacja Flask
@@ -63,3 +70,59 @@ def test_valid_login_logout(client, new_user):
     response = client.get("/wyloguj", follow_redirects=True)
     assert response.status_code == 200
     assert "Zaloguj się" in response.data.decode("utf-8")
+
+
+def test_profanity_model_is_not_loaded_on_import():
+    """
+    GIVEN świeży interpreter
+    WHEN importowany jest pakiet aplikacji
+    THEN sprawdź, czy model profanity_check (scikit-learn) nie jest jeszcze wczytany
+    """
+    code = "import sys, app; assert 'profanity_check' not in sys.modules"
+    env = dict(os.environ, SECRET_KEY=os.environ.get("SECRET_KEY", "test"))
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+
+@pytest.mark.parametrize("identifier", ["TestUser", " TEST@user.com"])
+def test_login_identifier_ignores_case(app, new_user, count_queries, identifier):
+    """
+    GIVEN zarejestrowany użytkownik testuser / test@user.com
+    WHEN loguje się nazwą lub e-mailem zapisanym innymi literami
+    THEN sprawdź, czy logowanie się udaje, a konto jest szukane jednym zapytaniem
+    """
+    client = app.test_client()
+    with count_queries() as queries:
+        response = client.post(
+            "/logowanie",
+            data=dict(login_identifier=identifier, password="Password123!"),
+        )
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/index")
+    assert len([q for q in queries if "user.email_lower =" in q]) == 1
+
+
+def test_registration_rejects_identity_differing_only_by_case(
+    app, new_user, count_queries
+):
+    """
+    GIVEN zarejestrowany użytkownik testuser / test@user.com
+    WHEN ktoś rejestruje konto TESTUSER / Test@User.com
+    THEN sprawdź, czy oba pola są odrzucone po jednym zapytaniu do bazy
+    """
+    client = app.test_client()
+    with count_queries() as queries:
+        response = client.post(
+            "/rejestracja",
+            data=dict(
+                first_name="Jan",
+                last_name="Kowalski",
+                username="TESTUSER",
+                email="Test@User.com",
+                password="Password123!",
+                confirm_password="Password123!",
+            ),
+        )
+    page = response.data.decode("utf-8")
+    assert "Ta nazwa użytkownika jest już zajęta" in page
+    assert "Ten adres email jest już zajęty" in page
+    assert len([q for q in queries if "FROM user" in q]) == 1
@@ -0,0 +1,81 @@
+from sqlalchemy import func
+
+from app import db
+from app.fixtures import generate
+from app.models import (
+    Post,
+    SearchDocument,
+    Tournament,
+    TournamentRegistration,
+    TournamentWinner,
+    User,
+)
+
+
+def _snapshot():
+    return (
+        db.session.query(User.username, User.first_name, User.is_admin).order_by(User.id).all(),
+        db.session.query(Post.title, Post.date_posted, Post.user_id).order_by(Post.id).all(),
+        db.session.query(Tournament.title, Tournament.start_date, Tournament.registered_count)
+        .order_by(Tournament.id)
+        .all(),
+    )
+
+
+def test_generate_bulk_fixtures(init_database, new_admin):
+    """
+    GIVEN pusta baza z jednym administratorem
+    WHEN generowane są dane testowe małymi partiami
+    THEN sprawdź, czy powstały spójne rekordy, a to samo ziarno daje te same dane
+    """
+    progress = []
+    counts = generate(
+        users=1200,
+        posts=30,
+        tournaments=40,
+        seed=5,
+        processes=1,
+        batch_size=500,
+        on_progress=lambda kind, done, total: progress.append((kind, done)),
+    )
+    assert counts["user"] == 1200 and counts["post"] == 30 and counts["tournament"] == 40
+    assert ("user", 1000) in progress and ("user", 1200) in progress
+    assert User.query.count() == 1201
+    assert User.query.filter_by(is_admin=True).count() == 2
+
+    registrations = dict(
+        db.session.query(TournamentRegistration.tournament_id, func.count())
+        .group_by(TournamentRegistration.tournament_id)
+        .all()
+    )
+    for tournament in Tournament.query:
+        assert tournament.registered_count == registrations.get(tournament.id, 0)
+        assert tournament.registered_count <= tournament.max_players
+        assert tournament.excerpt
+    assert TournamentWinner.query.count() == counts["tournament_winner"] > 0
+    assert {post.author.is_admin for post in Post.query} == {True}
+
+    first = _snapshot()
+    for model in (
+        SearchDocument,
+        TournamentWinner,
+        TournamentRegistration,
+        Post,
+        Tournament,
+    ):
+        model.query.delete()
+    User.query.filter(User.id != new_admin.id).delete()
+    db.session.commit()
+    generate(users=1200, posts=30, tournaments=40, seed=5, processes=1, batch_size=500)
+    assert _snapshot() == first
+
+
+def test_generate_posts_without_admins(init_database, new_user):
+    """
+    GIVEN baza z jednym zwykłym użytkownikiem (bez administratorów)
+    WHEN generowane są same posty
+    THEN sprawdź, czy autorem jest ten użytkownik
+    """
+    counts = generate(posts=5, seed=1, processes=1)
+    assert counts["post"] == 5
+    assert {post.user_id for post in Post.query} == {new_user.id}
@@ -0,0 +1,150 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from app import images
+
+
+@pytest.fixture
+def pictures_dir(tmp_path, monkeypatch):
+    (tmp_path / "post_pics").mkdir()
+    monkeypatch.setattr(images, "PICTURES_DIR", str(tmp_path / "post_pics"))
+    monkeypatch.setattr(images, "ORIGINALS_DIR", str(tmp_path / "originals"))
+    monkeypatch.setattr(images, "_variants_ready", {})
+    return tmp_path / "post_pics"
+
+
+def _upload(fmt="JPEG", size=(1600, 1200), color="orange"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, fmt)
+    buffer.seek(0)
+    return FileStorage(stream=buffer, filename="zdjecie.jpg")
+
+
+def test_save_picture_generates_variants(app, pictures_dir):
+    """
+    GIVEN przesłane zdjęcie JPEG
+    WHEN plik jest zapisywany, a następnie przetwarzany
+    THEN sprawdź, czy powstają warianty srcset, obraz OG i nazwa zależy od treści
+    """
+    filename = images.save_picture(_upload())
+    assert len(filename) <= 20 and filename.endswith(".jpg")
+    # Zapis w żądaniu nie przetwarza obrazu
+    assert images.picture_status(filename) == "pending"
+    # Oryginał nie trafia do static - nie ma do niego adresu URL
+    assert os.listdir(pictures_dir) == []
+    assert os.listdir(images.ORIGINALS_DIR) == [filename]
+
+    images.process_picture(filename, str(pictures_dir), images.ORIGINALS_DIR)
+    assert images.picture_status(filename) == "ready"
+    files = set(os.listdir(pictures_dir))
+    for variant, size in images.VARIANTS.items():
+        for ext, _, _ in images.available_formats():
+            name = images.variant_filename(filename, variant, ext)
+            assert name in files
+            with Image.open(pictures_dir / name) as variant_image:
+                assert variant_image.width <= size[0]
+    with Image.open(pictures_dir / images.variant_filename(filename, "og", "jpg")) as og:
+        assert og.size == images.OG_SIZE
+
+    # Ten sam plik przesłany ponownie nie tworzy kopii
+    assert images.save_picture(_upload()) == filename
+    assert set(os.listdir(pictures_dir)) == files
+    assert images.save_picture(_upload(color="blue")) != filename
+
+
+def test_image_worker_processes_pending_uploads(app, init_database, new_user, pictures_dir):
+    """
+    GIVEN post z obrazem czekającym na przetworzenie
+    WHEN worker przetwarza oczekujące obrazy w puli procesów
+    THEN sprawdź, czy do tego czasu wyświetlany jest default.png, a potem nowy obraz
+    """
+    from app.models import Post
+
+    filename = images.save_picture(_upload())
+    post = Post(
+        title="Post ze zdjęciem",
+        content="Treść",
+        author=new_user,
+        image_file=filename,
+        image_status=images.picture_status(filename),
+    )
+    init_database.session.add(post)
+    init_database.session.commit()
+    assert post.display_image == "default.png"
+
+    assert images.run_worker(processes=1, once=True) == (1, 0)
+    init_database.session.refresh(post)
+    assert post.image_status == "ready"
+    assert post.display_image == filename
+
+
+def test_save_picture_rejects_non_images(app, pictures_dir):
+    upload = FileStorage(stream=io.BytesIO(b"<?php echo 1; ?>"), filename="x.jpg")
+    assert images.save_picture(upload) is None
+    assert os.listdir(pictures_dir) == []
+
+
+def test_responsive_image_markup(app, pictures_dir):
+    """
+    GIVEN obraz z wygenerowanymi wariantami i stary obraz bez wariantów
+    WHEN szablon wywołuje responsive_image
+    THEN sprawdź, czy nowy obraz dostaje <picture> z srcset, a stary zwykły <img>
+    """
+    filename = images.save_picture(_upload(fmt="PNG"))
+    images.process_picture(filename, str(pictures_dir), images.ORIGINALS_DIR)
+    with app.test_request_context():
+        html = images.responsive_image(filename, "Turniej <finał>", sizes="50vw")
+        legacy = images.responsive_image("default.png", "Domyślny")
+
+    assert html.startswith("<picture")
+    assert 'type="image/webp"' in html
+    # 1600x1200 mieści się w 480x270 jako 360x270
+    assert images.variant_filename(filename, "card", "webp") + " 360w" in html
+    assert "Turniej &lt;finał&gt;" in html
+    assert legacy.startswith("<img") and "srcset" not in legacy
+
+
+def test_srcset_uses_actual_variant_widths(app, pictures_dir):
+    """
+    GIVEN małe zdjęcie pionowe (300x600)
+    WHEN szablon wywołuje responsive_image
+    THEN sprawdź, czy srcset podaje rzeczywiste szerokości plików, bez duplikatów
+    """
+    filename = images.save_picture(_upload(size=(300, 600)))
+    images.process_picture(filename, str(pictures_dir), images.ORIGINALS_DIR)
+    with app.test_request_context():
+        html = images.responsive_image(filename, "Portret")
+
+    card = images.variant_filename(filename, "card", "webp")
+    with Image.open(pictures_dir / card) as image:
+        assert image.width == 135
+    srcset = html.split('type="image/webp" srcset="')[1].split('"')[0]
+    # card 135x270, list 225x450, hero 300x600 (bez powiększania)
+    assert [entry.rsplit(" ", 1)[1] for entry in srcset.split(", ")] == [
+        "135w",
+        "225w",
+        "300w",
+    ]
+
+
+def test_originals_are_kept_outside_static(app, pictures_dir):
+    """
+    GIVEN oryginał zapisany dawniej w static/post_pics/originals
+    WHEN uruchamiane jest przeniesienie oryginałów
+    THEN sprawdź, czy plik trafia do katalogu poza static, a stary katalog znika
+    """
+    assert not os.path.abspath(app.config["IMAGE_ORIGINALS_FOLDER"]).startswith(
+        os.path.abspath(app.static_folder) + os.sep
+    )
+    legacy = pictures_dir / images.LEGACY_ORIGINALS_DIR
+    legacy.mkdir()
+    (legacy / "aaaaaaaaaaaaaaaa.jpg").write_bytes(b"x")
+
+    assert images.move_legacy_originals() == 1
+    assert not legacy.exists()
+    assert os.listdir(images.ORIGINALS_DIR) == ["aaaaaaaaaaaaaaaa.jpg"]
+    assert images.move_legacy_originals() == 0
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from sqlalchemy import func
+
+from app import db
+from app.fixtures import generate
+from app.lifecycle import delete_rows, delete_user
+from app.models import Post, Tournament, TournamentRegistration, TournamentWinner, User
+from app.registrations import recount_registrations
+
+
+def _registered_counts():
+    actual = dict(
+        db.session.query(TournamentRegistration.tournament_id, func.count())
+        .group_by(TournamentRegistration.tournament_id)
+        .all()
+    )
+    stored = {t.id: t.registered_count for t in Tournament.query.all()}
+    return actual, stored
+
+
+def test_delete_rows_in_chunks_with_dependents(init_database, new_admin, count_queries):
+    """
+    GIVEN gracze zapisani na turnieje, w tym zwycięzcy
+    WHEN gracze usuwani są partiami po 4 wiersze
+    THEN sprawdź, czy zniknęły też ich zapisy i miejsca na podium, liczniki
+         zapisów się zgadzają, a wynik podaje liczbę usuniętych wierszy w tabelach
+    """
+    generate(users=10, tournaments=3, seed=2, processes=1)
+    players = User.query.filter_by(is_admin=False).count()
+    registrations = TournamentRegistration.query.join(User).filter(User.is_admin.is_(False)).count()
+    winners = TournamentWinner.query.join(User).filter(User.is_admin.is_(False)).count()
+    assert registrations and winners
+
+    with count_queries() as queries:
+        counts = delete_rows(User, User.is_admin.is_(False), chunk_size=4)
+    assert counts["user"] == players == 10
+    assert counts["tournament_registration"] == registrations
+    assert counts.get("tournament_winner", 0) == winners
+    # 10 graczy = 3 partie po maks. 4 wiersze
+    assert len([q for q in queries if q.startswith("DELETE FROM user")]) == 3
+
+    assert User.query.count() == 1
+    assert TournamentRegistration.query.count() == 0
+    actual, stored = _registered_counts()
+    assert all(stored[tournament_id] == actual.get(tournament_id, 0) for tournament_id in stored)
+
+
+def test_delete_user_removes_posts(init_database, new_admin, new_user):
+    """
+    GIVEN użytkownik z postem i zapisem na turniej
+    WHEN jego konto jest usuwane
+    THEN sprawdź, czy usunięto też post i zapis, a inne konta zostały
+    """
+    tournament = Tournament(
+        title="Turniej", description="Opis", start_date=datetime(2030, 1, 1), max_players=8
+    )
+    db.session.add(tournament)
+    db.session.add(Post(title="Post gracza", content="Treść", author=new_user))
+    db.session.flush()
+    db.session.add(TournamentRegistration(user_id=new_user.id, tournament_id=tournament.id))
+    recount_registrations([tournament.id])
+    db.session.commit()
+    assert tournament.registered_count == 1
+    user_id = new_user.id
+
+    counts = delete_user(user_id)
+    assert counts["user"] == 1 and counts["post"] == 1
+    assert counts["tournament_registration"] == 1
+    assert db.session.get(User, user_id) is None
+    assert Post.query.filter_by(user_id=user_id).count() == 0
+    assert db.session.get(User, new_admin.id) is not None
+    assert db.session.get(Tournament, tournament.id).registered_count == 0
@@ -0,0 +1,63 @@
+from app import mail
+from app.mail_queue import drain_queue, enqueue_email
+from app.models import OutboundEmail
+
+
+def test_registration_enqueues_email(client, init_database):
+    """
+    GIVEN Aplikacja Flask
+    WHEN nowy użytkownik się rejestruje
+    THEN sprawdź, czy mail weryfikacyjny trafia do kolejki zamiast na serwer SMTP
+    """
+    client.post(
+        "/rejestracja",
+        data=dict(
+            first_name="Anna",
+            last_name="Nowak",
+            username="annanowak",
+            email="anna.nowak@test.pl",
+            password="Password123!",
+            confirm_password="Password123!",
+        ),
+    )
+    email = OutboundEmail.query.one()
+    assert email.status == "pending"
+    assert "anna.nowak@test.pl" in email.recipients
+
+
+def test_drain_queue_sends_pending_emails(app, init_database):
+    """
+    GIVEN dwie wiadomości w kolejce
+    WHEN worker opróżnia kolejkę
+    THEN sprawdź, czy obie zostały wysłane przez jedno połączenie i oznaczone jako wysłane
+    """
+    with app.app_context():
+        enqueue_email("Temat 1", ["a@test.pl"], "Treść 1", sender="ipba@test.pl")
+        enqueue_email("Temat 2", ["b@test.pl"], "Treść 2", sender="ipba@test.pl")
+
+        with mail.record_messages() as outbox:
+            sent, failed = drain_queue()
+
+        assert (sent, failed) == (2, 0)
+        assert [msg.subject for msg in outbox] == ["Temat 1", "Temat 2"]
+        assert {e.status for e in OutboundEmail.query.all()} == {"sent"}
+        assert drain_queue() == (0, 0)
+
+
+def test_drain_queue_retries_with_backoff(app, init_database, monkeypatch):
+    """
+    GIVEN wiadomość bez nadawcy, której nie da się wysłać
+    WHEN worker próbuje ją wysłać
+    THEN sprawdź, czy wraca do kolejki z opóźnieniem i licznikiem prób
+    """
+    with app.app_context():
+        monkeypatch.setitem(app.config, "MAIL_DEFAULT_SENDER", None)
+        email = enqueue_email("Temat", ["a@test.pl"], "Treść")
+        assert drain_queue() == (0, 1)
+
+        email = init_database.session.get(OutboundEmail, email.id)
+        assert email.status == "pending"
+        assert email.attempts == 1
+        assert email.next_attempt_at > email.created_at
+        # Przed upływem backoffu wiadomość nie jest ponownie pobierana
+        assert drain_queue() == (0, 0)
@@ -0,0 +1,98 @@
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app import images, media
+from app.models import Post, Tournament
+
+
+@pytest.fixture
+def pictures_dir(app, tmp_path, monkeypatch):
+    (tmp_path / "post_pics").mkdir()
+    monkeypatch.setattr(images, "PICTURES_DIR", str(tmp_path / "post_pics"))
+    monkeypatch.setattr(images, "ORIGINALS_DIR", str(tmp_path / "originals"))
+    monkeypatch.setitem(app.config, "MEDIA_GC_GRACE_SECONDS", 0)
+    (tmp_path / "post_pics" / "default.png").write_bytes(b"x")
+    return tmp_path / "post_pics"
+
+
+def _store(pictures_dir, digest, size=100):
+    """Tworzy plik główny, warianty i oryginał jednego obrazu."""
+    Path(images.ORIGINALS_DIR).mkdir(exist_ok=True)
+    paths = [
+        pictures_dir / f"{digest}.jpg",
+        pictures_dir / f"{digest}-card.webp",
+        pictures_dir / f"{digest}-og.jpg",
+        Path(images.ORIGINALS_DIR) / f"{digest}.jpg",
+    ]
+    for path in paths:
+        path.write_bytes(b"x" * size)
+        os.utime(path, (time.time() - 60, time.time() - 60))
+    return f"{digest}.jpg"
+
+
+def test_pictures_are_released_when_no_longer_referenced(
+    init_database, new_user, pictures_dir
+):
+    """
+    GIVEN obraz współdzielony przez post i turniej
+    WHEN rekordy są usuwane lub dostają nowy obraz
+    THEN sprawdź, czy pliki znikają dopiero po usunięciu ostatniego odwołania
+    """
+    shared = _store(pictures_dir, "aaaaaaaaaaaaaaaa")
+    replacement = _store(pictures_dir, "bbbbbbbbbbbbbbbb")
+    post = Post(title="Post", content="Treść", author=new_user, image_file=shared)
+    tournament = Tournament(
+        title="Turniej",
+        description="Opis",
+        start_date=datetime.utcnow(),
+        max_players=8,
+        banner_image=shared,
+    )
+    init_database.session.add_all([post, tournament])
+    init_database.session.commit()
+
+    init_database.session.delete(post)
+    init_database.session.commit()
+    assert (pictures_dir / shared).exists()
+
+    tournament.banner_image = replacement
+    init_database.session.commit()
+    assert not any(name.startswith("aaaa") for name in os.listdir(pictures_dir))
+    assert not (Path(images.ORIGINALS_DIR) / shared).exists()
+    assert (pictures_dir / replacement).exists()
+    assert (pictures_dir / "default.png").exists()
+
+
+def test_collect_garbage_removes_orphans(init_database, new_user, pictures_dir):
+    """
+    GIVEN obrazy osierocone (np. po hurtowym usunięciu postów) i obraz używany
+    WHEN uruchamiane jest odśmiecanie
+    THEN sprawdź, czy usuwane są tylko osierocone i dostatecznie stare pliki
+    """
+    used = _store(pictures_dir, "cccccccccccccccc")
+    _store(pictures_dir, "dddddddddddddddd", size=10)
+    fresh = Path(images.ORIGINALS_DIR) / "eeeeeeeeeeeeeeee.png"
+    fresh.write_bytes(b"x")
+    init_database.session.add(
+        Post(title="Post", content="Treść", author=new_user, image_file=used)
+    )
+    init_database.session.commit()
+
+    stats = media.storage_stats()
+    assert stats["pictures"] == 4
+    assert stats["references"] == 1
+    assert stats["orphans"] == 2
+    assert stats["orphan_bytes"] == 41
+
+    assert media.collect_garbage(min_age=30, dry_run=True) == [
+        ("dddddddddddddddd", 40)
+    ]
+    assert (pictures_dir / "dddddddddddddddd.jpg").exists()
+    assert media.collect_garbage(min_age=30) == [("dddddddddddddddd", 40)]
+    assert not any(name.startswith("dddd") for name in os.listdir(pictures_dir))
+    assert fresh.exists()
+    assert (pictures_dir / used).exists()
@@ -0,0 +1,121 @@
+import json
+import logging
+
+from app import app
+from app.metrics import registry, request_logger
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_server_timing_and_request_log(client, init_database):
+    """
+    GIVEN dowolna strona publiczna
+    WHEN jest pobierana
+    THEN sprawdź, czy odpowiedź ma nagłówek Server-Timing z liczbą zapytań SQL
+         i czasem renderowania, a w logu jest linia JSON z tymi samymi danymi
+    """
+    # Poziom loggera nie jest zmieniany - linia musi przejść z konfiguracją aplikacji
+    handler = _Collect()
+    request_logger.addHandler(handler)
+    try:
+        response = client.get("/news")
+    finally:
+        request_logger.removeHandler(handler)
+    timing = response.headers["Server-Timing"]
+    assert 'db;desc="SQL (' in timing and "render;" in timing and "total;dur=" in timing
+
+    entries = [json.loads(message) for message in handler.messages]
+    entry = next(e for e in entries if e["path"] == "/news")
+    assert entry["endpoint"] == "news" and entry["status"] == 200
+    assert entry["db_count"] >= 1 and entry["render_ms"] >= 0
+
+
+def test_metrics_endpoint(client, new_admin, monkeypatch):
+    """
+    GIVEN kilka obsłużonych żądań
+    WHEN /metrics jest pobierane anonimowo, z tokenem i przez administratora
+    THEN sprawdź, czy anonimowy dostęp jest zablokowany, a metryki zawierają
+         liczniki żądań i histogram czasu odpowiedzi dla endpointu
+    """
+    registry.clear()
+    client.get("/news")
+    client.get("/news")
+    assert client.get("/metrics").status_code == 403
+
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "sekret")
+    assert (
+        client.get("/metrics", headers={"Authorization": "Bearer zly"}).status_code
+        == 403
+    )
+    # Nagłówek spoza ASCII to zły token, a nie błąd serwera
+    assert (
+        client.get("/metrics", headers={"Authorization": "Bearer \xe9"}).status_code
+        == 403
+    )
+    response = client.get("/metrics", headers={"Authorization": "Bearer sekret"})
+    body = response.data.decode("utf-8")
+    assert response.content_type.startswith("text/plain")
+    assert (
+        'ipba_http_requests_total{endpoint="news",method="GET",status="200"} 2' in body
+    )
+    assert (
+        'ipba_http_request_duration_seconds_bucket{endpoint="news",le="+Inf"} 2' in body
+    )
+    assert 'ipba_http_request_duration_seconds_count{endpoint="news"} 2' in body
+    assert 'ipba_phase_calls_total{endpoint="news",phase="db"}' in body
+
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", None)
+    client.post(
+        "/logowanie",
+        data=dict(login_identifier="admin@user.com", password="AdminPass123!"),
+    )
+    assert client.get("/metrics").status_code == 200
+
+
+def test_n_plus_one_is_reported_with_template_line(
+    init_database, app, caplog, monkeypatch
+):
+    """
+    GIVEN szablon, który w pętli odwołuje się do leniwie ładowanej relacji
+    WHEN jest renderowany w żądaniu
+    THEN sprawdź, czy raport zawiera powtarzane zapytanie z linią szablonu,
+         a w logu jest ostrzeżenie o N+1
+    """
+    from flask import render_template_string
+    from app import db
+    from app.metrics import query_report, query_shape
+    from app.models import Post, User
+
+    assert query_shape("SELECT a FROM t WHERE id IN (?, ?,  ?)") == query_shape(
+        "SELECT a FROM t\n WHERE id IN (?)"
+    )
+    for i in range(4):
+        user = User(
+            username=f"autor{i}",
+            email=f"autor{i}@example.com",
+            password_hash="x",
+            first_name="Jan",
+            last_name="Kowalski",
+        )
+        db.session.add(Post(title=f"Post {i}", content="Treść", author=user))
+    db.session.commit()
+    db.session.expunge_all()
+
+    template = "{% for post in posts %}\n{{ post.author.username }}\n{% endfor %}"
+    monkeypatch.setitem(app.config, "QUERY_REPEAT_THRESHOLD", 3)
+    with app.test_request_context("/news"), caplog.at_level(logging.WARNING):
+        app.preprocess_request()
+        render_template_string(template, posts=Post.query.all())
+        report = query_report()
+        app.process_response(app.response_class())
+
+    ((count, origin),) = report["repeated"].values()
+    assert count == 4 and origin.endswith("<string>:2")
+    assert any("Możliwe N+1: 4 razy" in r.getMessage() for r in caplog.records)
@@ -1,4 +1,7 @@
-from app.models import Post
+import pytest
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from app.models import Post, Tournament, TournamentRegistration
 from werkzeug.security import check_password_hash
 
 
@@ -35,3 +38,49 @@ def test_new_post(new_user, init_database):
     init_database.session.commit()
     assert post.title == "Testowy Post"
     assert post.author.username == "testuser"
+
+
+def test_excerpt_is_maintained_on_write(new_user, init_database):
+    """
+    GIVEN post i turniej z treścią w HTML
+    WHEN treść jest zapisywana i zmieniana
+    THEN sprawdź, czy zajawka to zwykły tekst skrócony po całym słowie
+    """
+    post = Post(
+        title="Post",
+        content="<p>Ala &amp; <b>kot</b></p><p>" + "słowo " * 40 + "</p>",
+        author=new_user,
+    )
+    init_database.session.add(post)
+    init_database.session.commit()
+    assert post.excerpt.startswith("Ala & kot słowo")
+    assert post.excerpt.endswith("słowo…") and len(post.excerpt) <= 151
+
+    post.content = "<h2>Nowa</h2>treść"
+    tournament = Tournament(
+        title="Turniej", description="Krótki opis", start_date=datetime(2030, 1, 1), max_players=8
+    )
+    init_database.session.add(tournament)
+    init_database.session.commit()
+    assert post.excerpt == "Nowa treść"
+    assert tournament.excerpt == "Krótki opis"
+
+
+def test_registration_is_unique_per_player(new_user, init_database):
+    """
+    GIVEN model TournamentRegistration
+    WHEN gracz zostaje zapisany na ten sam turniej drugi raz
+    THEN sprawdź, czy baza odrzuca duplikat
+    """
+    tournament = Tournament(
+        title="Turniej", description="Opis", start_date=datetime(2030, 1, 1), max_players=8
+    )
+    init_database.session.add(tournament)
+    init_database.session.add(TournamentRegistration(player=new_user, tournament=tournament))
+    init_database.session.commit()
+
+    init_database.session.add(TournamentRegistration(player=new_user, tournament=tournament))
+    with pytest.raises(IntegrityError):
+        init_database.session.commit()
+    init_database.session.rollback()
+    assert tournament.registrations.count() == 1
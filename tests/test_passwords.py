@@ -0,0 +1,57 @@
+import threading
+
+from werkzeug.security import generate_password_hash
+
+from app import db, passwords
+from app.models import User
+
+
+def test_login_upgrades_outdated_hash(app, init_database):
+    """
+    GIVEN użytkownik z hasłem zapisanym starym algorytmem (pbkdf2)
+    WHEN loguje się poprawnym hasłem
+    THEN sprawdź, czy hash został przeliczony z bieżącymi parametrami, a stary nadal nie przechodzi
+    """
+    user = User(
+        username="stary",
+        email="stary@user.com",
+        password_hash=generate_password_hash("Password123!", "pbkdf2:sha256:1000"),
+        first_name="Stary",
+        last_name="Hash",
+        email_verified=True,
+    )
+    db.session.add(user)
+    db.session.commit()
+    assert passwords.needs_rehash(user.password_hash)
+
+    client = app.test_client()
+    response = client.post(
+        "/logowanie",
+        data=dict(login_identifier="stary@user.com", password="Password123!"),
+    )
+    assert response.status_code == 302
+
+    user = db.session.get(User, user.id)
+    assert user.password_hash.startswith(app.config["PASSWORD_HASH_METHOD"] + "$")
+    assert not passwords.needs_rehash(user.password_hash)
+    assert passwords.check_password(user, "Password123!")
+    assert not passwords.check_password(user, "Zle-haslo1!")
+
+
+def test_hashing_is_bounded(app, init_database, new_user, monkeypatch):
+    """
+    GIVEN pula hashowania, w której nie ma wolnego miejsca
+    WHEN użytkownik próbuje się zalogować
+    THEN sprawdź, czy dostaje 503 z Retry-After zamiast czekać bez końca
+    """
+    monkeypatch.setitem(app.config, "PASSWORD_HASH_TIMEOUT", 0.01)
+    pool, _slots = passwords._executor()
+    monkeypatch.setattr(passwords, "_executor", lambda: (pool, threading.Semaphore(0)))
+
+    client = app.test_client()
+    response = client.post(
+        "/logowanie",
+        data=dict(login_identifier="test@user.com", password="Password123!"),
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
@@ -0,0 +1,134 @@
+import pytest
+from app.models import User
+from app.profanity import (
+    AMBIGUOUS,
+    CLEAN,
+    PROFANE,
+    get_moderator,
+    is_profane,
+    scan_usernames,
+)
+
+
+@pytest.mark.parametrize(
+    "username, verdict",
+    [
+        ("testuser", CLEAN),
+        ("Łukasz", CLEAN),
+        ("kurwa", PROFANE),
+        ("K_u_r_w@", PROFANE),
+        ("kuuurwa", PROFANE),
+        ("zjebany", PROFANE),
+        ("Sh1tHead", PROFANE),
+        ("ass123", PROFANE),
+        ("bass_player", AMBIGUOUS),
+        ("scunthorpe", AMBIGUOUS),
+        # Słowo z listy na początku słowa nazwy, także po separatorze
+        ("Michal_jebek", PROFANE),
+        ("MichalJebek", PROFANE),
+        # Trafienie tylko w środku słowa rozstrzyga model
+        ("kur_wa", AMBIGUOUS),
+        # Nazwiska z listy wyjątków
+        ("Wańkowicz", CLEAN),
+        ("Jan_Wankowicz", CLEAN),
+        ("Peniston", CLEAN),
+        ("Chujan", CLEAN),
+        ("Shittu", CLEAN),
+    ],
+)
+def test_moderator_verdicts(username, verdict):
+    """
+    GIVEN skompilowana lista niedozwolonych słów
+    WHEN sprawdzana jest nazwa użytkownika (z leetspeakiem, polskimi znakami, separatorami)
+    THEN sprawdź, czy werdykt jest poprawny
+    """
+    assert get_moderator().check(username) == verdict
+
+
+REAL_NAMES = [
+    "Nazir",
+    "Fukuda",
+    "Fukushima",
+    "Jebediah",
+    "Jebson",
+    "Hujer",
+    "Kutasi",
+    "Dupalski",
+    "Penistone",
+    "Wankel",
+    "Shitake",
+    "Fiutek",
+    "Szmatala",
+    "Cwelich",
+]
+OBSCENE = ["kurwa", "chuj", "chujowy", "dupa", "kutasy", "nazi", "Sh1t", "wanker"]
+
+
+@pytest.mark.parametrize("username", REAL_NAMES)
+def test_real_names_starting_with_listed_words_are_accepted(app, username):
+    """
+    GIVEN imię lub nazwisko zaczynające się od słowa z listy ("Nazir", "Fukuda")
+    WHEN sprawdzana jest nazwa użytkownika
+    THEN sprawdź, czy lista słów jej nie blokuje, a model ją przepuszcza
+    """
+    assert get_moderator().check(username) != PROFANE
+    with app.app_context():
+        assert not is_profane(username)
+
+
+@pytest.mark.parametrize("username", OBSCENE)
+def test_listed_words_and_inflections_are_rejected(app, username):
+    """
+    GIVEN słowo z listy albo jego wypisana odmiana
+    WHEN sprawdzana jest nazwa użytkownika
+    THEN sprawdź, czy jest odrzucana bez pytania modelu
+    """
+    assert get_moderator().check(username) == PROFANE
+    with app.app_context():
+        assert is_profane(username)
+
+
+def test_scan_usernames_flags_existing_accounts(app, init_database, new_user):
+    """
+    GIVEN konta zapisane w bazie przed wprowadzeniem filtra
+    WHEN uruchamiany jest hurtowy skan nazw
+    THEN sprawdź, czy zgłaszane są tylko niedozwolone nazwy
+    """
+    with app.app_context():
+        init_database.session.add(
+            User(
+                username="skurwysyn",
+                email="zly@test.pl",
+                password_hash="x",
+                first_name="Zły",
+                last_name="Gracz",
+            )
+        )
+        init_database.session.commit()
+
+        flagged = scan_usernames(batch_size=1)
+
+    assert [(username, verdict) for _, username, verdict in flagged] == [
+        ("skurwysyn", PROFANE)
+    ]
+
+
+def test_registration_rejects_profane_username(client, init_database):
+    """
+    GIVEN formularz rejestracji
+    WHEN nazwa użytkownika zawiera wulgaryzm zapisany leetspeakiem
+    THEN sprawdź, czy konto nie zostaje utworzone
+    """
+    response = client.post(
+        "/rejestracja",
+        data=dict(
+            first_name="Jan",
+            last_name="Kowalski",
+            username="ch_u_j",
+            email="jan@test.pl",
+            password="Password123!",
+            confirm_password="Password123!",
+        ),
+    )
+    assert "Nazwa użytkownika zawiera niedozwolone słowa." in response.data.decode("utf-8")
+    assert User.query.count() == 0
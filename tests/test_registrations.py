@@ -0,0 +1,124 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from app.models import Tournament, TournamentRegistration, User
+from app.registrations import (
+    ALREADY_REGISTERED,
+    CLOSED,
+    FULL,
+    REGISTERED,
+    register_player,
+    unregister_player,
+)
+
+
+def _create_tournament(db, max_players, days=30):
+    tournament = Tournament(
+        title="Otwarty turniej",
+        description="Opis",
+        start_date=datetime.utcnow() + timedelta(days=days),
+        max_players=max_players,
+    )
+    db.session.add(tournament)
+    db.session.commit()
+    return tournament.id
+
+
+def _create_players(db, count):
+    users = [
+        User(
+            username=f"gracz{i}",
+            email=f"gracz{i}@test.pl",
+            password_hash="x",
+            first_name="Gracz",
+            last_name="Testowy",
+        )
+        for i in range(count)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.id for user in users]
+
+
+def _register_concurrently(app, db, tournament_id, user_ids, threads=50):
+    if db.engine.url.database in (None, "", ":memory:"):
+        pytest.skip("Test współbieżności wymaga bazy w pliku.")
+    barrier = threading.Barrier(min(threads, len(user_ids)))
+
+    def register(user_id):
+        with app.app_context():
+            try:
+                barrier.wait(timeout=10)
+            except threading.BrokenBarrierError:
+                pass
+            return register_player(tournament_id, user_id)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(register, user_ids))
+
+
+def test_register_player_statuses(app, init_database, new_user):
+    """
+    GIVEN turniej z jednym wolnym miejscem
+    WHEN gracze zapisują się, zapisują ponownie i wypisują
+    THEN sprawdź, czy silnik zapisów zwraca właściwe statusy i pilnuje licznika
+    """
+    with app.app_context():
+        tournament_id = _create_tournament(init_database, max_players=1)
+        other_id = _create_players(init_database, 1)[0]
+
+        assert register_player(tournament_id, new_user.id) == REGISTERED
+        assert register_player(tournament_id, new_user.id) == ALREADY_REGISTERED
+        assert register_player(tournament_id, other_id) == FULL
+
+        assert unregister_player(tournament_id, new_user.id)
+        assert not unregister_player(tournament_id, new_user.id)
+        assert register_player(tournament_id, other_id) == REGISTERED
+        assert init_database.session.get(Tournament, tournament_id).registered_count == 1
+
+        started_id = _create_tournament(init_database, max_players=8, days=-1)
+        assert register_player(started_id, other_id) == CLOSED
+
+
+def test_concurrent_registrations_never_overbook(app, init_database):
+    """
+    GIVEN turniej z 20 miejscami
+    WHEN 200 graczy zapisuje się jednocześnie
+    THEN sprawdź, czy zapisanych zostało dokładnie 20 graczy
+    """
+    with app.app_context():
+        tournament_id = _create_tournament(init_database, max_players=20)
+        user_ids = _create_players(init_database, 200)
+
+        results = _register_concurrently(app, init_database, tournament_id, user_ids)
+
+        assert results.count(REGISTERED) == 20
+        assert results.count(FULL) == 180
+        init_database.session.expire_all()
+        assert init_database.session.get(Tournament, tournament_id).registered_count == 20
+        assert (
+            TournamentRegistration.query.filter_by(tournament_id=tournament_id).count()
+            == 20
+        )
+
+
+def test_concurrent_duplicate_registrations_are_idempotent(app, init_database):
+    """
+    GIVEN jeden gracz
+    WHEN wysyła 50 równoległych żądań zapisu na ten sam turniej
+    THEN sprawdź, czy zostaje zapisany tylko raz, a licznik wynosi 1
+    """
+    with app.app_context():
+        tournament_id = _create_tournament(init_database, max_players=20)
+        user_id = _create_players(init_database, 1)[0]
+
+        results = _register_concurrently(
+            app, init_database, tournament_id, [user_id] * 50
+        )
+
+        assert results.count(REGISTERED) == 1
+        assert results.count(ALREADY_REGISTERED) == 49
+        init_database.session.expire_all()
+        assert init_database.session.get(Tournament, tournament_id).registered_count == 1
@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_index_page(client, init_database):
     """
     GIVEN Aplikacja Flask
@@ -29,3 +32,311 @@ def test_contact_page(client):
     response = client.get("/kontakt")
     assert response.status_code == 200
     assert "Skontakuj się z nami" in response.data.decode("utf-8")
+
+
+def _create_past_tournaments(db, user, count, prefix="Turniej"):
+    from datetime import datetime, timedelta
+    from app.models import Tournament, TournamentRegistration, TournamentWinner
+
+    for i in range(count):
+        tournament = Tournament(
+            title=f"{prefix} {i}",
+            description="Opis turnieju",
+            start_date=datetime.utcnow() - timedelta(days=i + 1),
+            max_players=16,
+        )
+        db.session.add(tournament)
+        db.session.add(TournamentRegistration(player=user, tournament=tournament))
+        for placing in (1, 2, 3):
+            db.session.add(
+                TournamentWinner(placing=placing, user=user, tournament=tournament)
+            )
+    db.session.commit()
+
+
+@pytest.mark.parametrize("url", ["/", "/tournaments", "/past_tournaments"])
+def test_tournament_lists_query_count_is_bounded(
+    client, init_database, new_user, count_queries, url
+):
+    """
+    GIVEN strony z listami turniejów i ich zwycięzcami
+    WHEN liczba turniejów na stronie rośnie
+    THEN sprawdź, czy liczba zapytań SQL się nie zmienia (brak N+1)
+    """
+    _create_past_tournaments(init_database, new_user, 1, prefix="Stary turniej")
+    with count_queries() as single:
+        assert client.get(url).status_code == 200
+
+    _create_past_tournaments(init_database, new_user, 5)
+    with count_queries() as many:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert "Turniej 0" in response.data.decode("utf-8")
+    assert len(many) == len(single)
+
+
+def test_fragment_cache_is_invalidated_on_commit(
+    client, init_database, new_user, count_queries
+):
+    """
+    GIVEN strona /news zapisana w cache fragmentów
+    WHEN administrator publikuje nowy post
+    THEN sprawdź, czy kolejne wyświetlenie nie odpytuje bazy, a po zmianie pokazuje nowy post
+    """
+    from app.cache import fragment_cache
+    from app.models import Post
+
+    client.get("/news")
+    with count_queries() as queries:
+        response = client.get("/news")
+    assert response.status_code == 200
+    # Tylko wersja listy do ETagu (cache w pamięci procesu nie zna commitów
+    # innych workerów) - bez zapytań o posty
+    assert len(queries) == 1 and "max(post.updated_at)" in queries[0]
+    assert fragment_cache.stats()["news"] == {"hits": 1, "misses": 1}
+
+    init_database.session.add(
+        Post(title="Świeży post", content="Treść", author=new_user)
+    )
+    init_database.session.commit()
+    assert "Świeży post" in client.get("/news").data.decode("utf-8")
+
+
+def test_etag_and_fragment_follow_commits_from_other_workers(
+    client, init_database, new_user, monkeypatch
+):
+    """
+    GIVEN strona /news w cache fragmentów w pamięci procesu
+    WHEN post zostaje dodany w innym workerze (bez unieważnienia tego cache)
+    THEN sprawdź, czy ten worker zwraca nowy ETag razem z nową treścią
+    """
+    from app.cache import fragment_cache
+    from app.models import Post
+
+    etag = client.get("/news").headers["ETag"]
+    with monkeypatch.context() as other_worker:
+        other_worker.setattr(fragment_cache, "invalidate", lambda *regions: None)
+        init_database.session.add(
+            Post(title="Post z innego workera", content="Treść", author=new_user)
+        )
+        init_database.session.commit()
+
+    response = client.get("/news", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "Post z innego workera" in response.data.decode("utf-8")
+
+
+def test_news_keyset_pagination(client, init_database, new_user):
+    """
+    GIVEN 20 postów z tą samą datą publikacji (9 na stronę)
+    WHEN użytkownik przechodzi kolejne strony linkami "Następny" i wraca "Poprzedni"
+    THEN sprawdź, czy każdy post pojawia się dokładnie raz, a kursor wraca na poprzednią stronę
+    """
+    import re
+    from datetime import datetime
+    from app.models import Post
+
+    date_posted = datetime(2024, 5, 1)
+    init_database.session.add_all(
+        Post(title=f"Post nr {i:02d}", content="Treść", author=new_user, date_posted=date_posted)
+        for i in range(20)
+    )
+    init_database.session.commit()
+
+    def visit(url):
+        html = client.get(url).data.decode("utf-8")
+        titles = re.findall(r"<h3[^>]*>(Post nr \d\d)</h3>", html)
+        cursors = re.findall(r'href="(/news\?cursor=[^"]+)"', html)
+        return titles, cursors
+
+    seen, pages = [], []
+    titles, cursors = visit("/news")
+    # Numery stron wynikają z liczby postów zapamiętanej w cache
+    assert 'href="/news?page=3"' in client.get("/news").data.decode("utf-8")
+    while True:
+        seen.extend(titles)
+        pages.append(titles)
+        if len(pages) == 3:
+            break
+        titles, cursors = visit(cursors[-1])
+    assert sorted(seen) == [f"Post nr {i:02d}" for i in range(20)]
+    assert [len(p) for p in pages] == [9, 9, 2]
+
+    previous, _ = visit(cursors[0])
+    assert previous == pages[1]
+    assert visit("/news?cursor=zepsuty")[0] == pages[0]
+
+
+def test_news_cache_keys_do_not_depend_on_query_string(client, init_database, new_user):
+    """
+    GIVEN strona /news z kilkoma stronami postów
+    WHEN klient podaje dowolne kursory i numery stron
+    THEN sprawdź, czy w cache trafiają tylko istniejące strony numerowane
+    """
+    import re
+    from app.cache import fragment_cache
+    from app.models import Post
+
+    init_database.session.add_all(
+        Post(title=f"Post nr {i:02d}", content="Treść", author=new_user)
+        for i in range(12)
+    )
+    init_database.session.commit()
+
+    html = client.get("/news").data.decode("utf-8")
+    cursor = re.findall(r'href="/news\?cursor=([^"]+)"', html)[-1]
+    for url in [f"/news?cursor={cursor}", "/news?page=999", "/news?page=-5"]:
+        assert client.get(url).status_code == 200
+    assert fragment_cache.stats()["news"] == {"hits": 0, "misses": 1}
+    # Błędny kursor jest ignorowany - to zwykła pierwsza strona
+    client.get("/news?cursor=zepsuty")
+    client.get("/news?page=2")
+    assert fragment_cache.stats()["news"] == {"hits": 1, "misses": 2}
+
+
+@pytest.mark.parametrize("url", ["/", "/news", "/tournaments", "/past_tournaments"])
+def test_list_pages_do_not_load_full_bodies(
+    client, init_database, new_user, count_queries, url
+):
+    """
+    GIVEN posty i turnieje z długą treścią
+    WHEN wyświetlana jest lista
+    THEN sprawdź, czy zapytania nie pobierają pełnej treści, a strona pokazuje zajawkę
+    """
+    from app.models import Post
+
+    _create_past_tournaments(init_database, new_user, 2)
+    init_database.session.add(
+        Post(title="Długi post", content="<p>Początek</p>" + "x" * 5000, author=new_user)
+    )
+    init_database.session.commit()
+    with count_queries() as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    selects = [q for q in queries if q.startswith("SELECT")]
+    assert not any("post.content" in q or "tournament.description" in q for q in selects)
+    assert "x" * 200 not in response.data.decode("utf-8")
+
+
+def test_public_pages_stay_within_query_budget(
+    client, init_database, new_admin, query_budget
+):
+    """
+    GIVEN baza z graczami, postami i turniejami z zapisami i zwycięzcami
+    WHEN otwierane są strony publiczne
+    THEN sprawdź, czy żadna nie przekracza budżetu zapytań i nie wykonuje N+1
+    """
+    from app.fixtures import generate
+    from app.models import Post, Tournament
+
+    generate(users=30, posts=12, tournaments=8, seed=4, processes=1)
+    tournament_id = Tournament.query.first().id
+    post_id = Post.query.first().id
+    with query_budget() as reports:
+        for url in ["/", "/news", "/tournaments", "/past_tournaments"]:
+            assert client.get(url).status_code == 200
+        assert client.get(f"/tournament/{tournament_id}").status_code == 200
+        assert client.get(f"/post/{post_id}").status_code == 200
+    assert len(reports) == 6
+
+
+def test_conditional_get_returns_304_until_content_changes(app, init_database, new_user):
+    """
+    GIVEN strona posta i strona turnieju pobrane przez anonimowego użytkownika
+    WHEN przeglądarka pyta ponownie z If-None-Match, a potem treść się zmienia
+    THEN sprawdź, czy dostaje 304 bez treści, a po zmianie nową wersję strony
+    """
+    from datetime import datetime, timedelta
+    from app.models import Post, Tournament, TournamentRegistration
+
+    post = Post(title="Stary tytuł", content="Treść", author=new_user)
+    tournament = Tournament(
+        title="Turniej",
+        description="Opis",
+        start_date=datetime.utcnow() + timedelta(days=7),
+        max_players=16,
+    )
+    init_database.session.add_all([post, tournament])
+    init_database.session.commit()
+    client = app.test_client()
+
+    response = client.get(f"/post/{post.id}")
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert response.headers["Cache-Control"] == "public, max-age=0, s-maxage=300"
+    assert "Cookie" in response.headers["Vary"]
+    assert response.last_modified is not None
+
+    cached = client.get(f"/post/{post.id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.data == b""
+    assert cached.headers["ETag"] == etag
+
+    # Inny język to inna wersja strony
+    with client.session_transaction() as session:
+        session["language"] = "en"
+    response = client.get(f"/post/{post.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    with client.session_transaction() as session:
+        session.clear()
+
+    post.title = "Nowy tytuł"
+    init_database.session.commit()
+    response = client.get(f"/post/{post.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Nowy tytuł" in response.data.decode("utf-8")
+
+    # Zapis na turniej zmienia wersję turnieju
+    etag = client.get(f"/tournament/{tournament.id}").headers["ETag"]
+    init_database.session.add(
+        TournamentRegistration(player=new_user, tournament=tournament)
+    )
+    init_database.session.commit()
+    response = client.get(
+        f"/tournament/{tournament.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    # Lista postów: usunięcie posta zmienia wersję
+    etag = client.get("/news").headers["ETag"]
+    assert client.get("/news", headers={"If-None-Match": etag}).status_code == 304
+    init_database.session.delete(post)
+    init_database.session.commit()
+    assert client.get("/news", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_logged_in_pages_are_private(app, init_database, new_user):
+    """
+    GIVEN zalogowany gracz
+    WHEN otwiera stronę główną
+    THEN sprawdź, czy strona jest prywatna i ma ETag inny niż dla anonimowych
+    """
+    client = app.test_client()
+    anonymous_etag = client.get("/").headers["ETag"]
+    client.post(
+        "/logowanie",
+        data=dict(login_identifier="test@user.com", password="Password123!"),
+        follow_redirects=True,
+    )
+    response = client.get("/")
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert response.headers["ETag"] != anonymous_etag
+    headers = {"If-None-Match": response.headers["ETag"]}
+    assert client.get("/", headers=headers).status_code == 304
+
+
+def test_admin_pages_are_not_stored(app, init_database, new_admin):
+    """
+    GIVEN zalogowany administrator
+    WHEN otwiera stronę główną
+    THEN sprawdź, czy odpowiedź nie ma walidatorów i nie może być zapisana
+    """
+    client = app.test_client()
+    client.post(
+        "/logowanie",
+        data=dict(login_identifier="admin@user.com", password="AdminPass123!"),
+        follow_redirects=True,
+    )
+    response = client.get("/")
+    assert response.headers["Cache-Control"] == "private, no-store"
+    assert "ETag" not in response.headers
@@ -0,0 +1,122 @@
+from datetime import datetime
+
+from app import db
+from app.lifecycle import delete_rows
+from app.models import Post, SearchDocument, Tournament
+from app.search import search, tokens
+
+
+def _create_content(author):
+    posts = [
+        Post(
+            title="Wyniki turnieju w Łodzi",
+            content="<p>Gratulujemy zwycięzcom!</p>",
+            author=author,
+        ),
+        Post(
+            title="Nowe zasady zapisów",
+            content="<p>Od teraz zapisy na turnieje w <b>Łodzi</b> zamykamy wcześniej.</p>",
+            author=author,
+        ),
+        Post(
+            title="Archiwalny post z Łodzi",
+            content="<p>Stary</p>",
+            author=author,
+            archived=True,
+        ),
+    ]
+    tournament = Tournament(
+        title="Mistrzostwa Polski",
+        description="<p>Zapraszamy na mistrzostwa.</p>",
+        location="Łódź, Hala Sportowa",
+        start_date=datetime(2030, 5, 1),
+        max_players=32,
+    )
+    db.session.add_all(posts + [tournament])
+    db.session.commit()
+    return posts, tournament
+
+
+def test_tokens_fold_polish_forms():
+    """
+    GIVEN różne formy tych samych słów, z polskimi znakami i bez
+    WHEN są zamieniane na słowa indeksu
+    THEN sprawdź, czy dają te same rdzenie
+    """
+    assert tokens("Turniejach w Łodzi") == tokens("turniej w lodz")
+    assert tokens("Mistrzostwa MISTRZOSTWACH") == ["mistrzostw", "mistrzostw"]
+    assert tokens("<b>2024</b>!") == ["b", "2024", "b"]
+
+
+def test_search_ranks_and_highlights(init_database, new_admin):
+    """
+    GIVEN posty i turniej wspominające Łódź (w tytule, treści lub miejscu)
+    WHEN wyszukiwana jest fraza bez polskich znaków w innej formie
+    THEN sprawdź, czy wyniki są dopasowane, trafienia w tytule są wyżej,
+         archiwalne posty są pominięte, a fragmenty mają wyróżnione słowa
+    """
+    posts, tournament = _create_content(new_admin)
+
+    results = search("lodz")
+    kinds = [(hit.kind, hit.item.id) for hit in results.items]
+    assert kinds[0] == ("post", posts[0].id)
+    assert set(kinds) == {
+        ("post", posts[0].id),
+        ("post", posts[1].id),
+        ("tournament", tournament.id),
+    }
+    body_hit = next(
+        hit
+        for hit in results.items
+        if hit.item.id == posts[1].id and hit.kind == "post"
+    )
+    assert "<mark>Łodzi</mark>" in body_hit.snippet
+    assert "<b>" not in body_hit.snippet
+    assert "<mark>Łodzi</mark>" in results.items[0].title
+
+    assert [hit.kind for hit in search("łódź", kind="tournament").items] == [
+        "tournament"
+    ]
+    assert [hit.item.id for hit in search("zapisy turniejach").items] == [posts[1].id]
+    assert search("  !!  ").items == []
+
+    page = search("lodz", per_page=2)
+    assert len(page.items) == 2 and page.has_next
+    assert len(search("lodz", page=2, per_page=2).items) == 1
+
+
+def test_search_index_follows_writes(init_database, new_admin, runner):
+    """
+    GIVEN zaindeksowane posty i turniej
+    WHEN tytuł jest zmieniany, a wiersze usuwane (ORM i hurtowo)
+    THEN sprawdź, czy indeks jest aktualny, a przebudowa daje ten sam wynik
+    """
+    posts, tournament = _create_content(new_admin)
+    posts[0].title = "Relacja z Gdańska"
+    db.session.commit()
+    assert [hit.item.id for hit in search("gdansk").items] == [posts[0].id]
+
+    db.session.delete(posts[1])
+    db.session.commit()
+    delete_rows(Tournament, Tournament.id == tournament.id)
+    assert search("lodz").items == []
+    assert SearchDocument.query.count() == 2
+
+    db.session.query(SearchDocument).delete()
+    db.session.commit()
+    result = runner.invoke(args=["search-rebuild"])
+    assert "posty: 2, turnieje: 0" in result.output
+    assert [hit.item.id for hit in search("gdansk").items] == [posts[0].id]
+
+
+def test_search_page(client, init_database, new_admin):
+    """
+    GIVEN zaindeksowane posty i turniej
+    WHEN otwierana jest strona /search z frazą
+    THEN sprawdź, czy pokazuje wyniki z linkami i wyróżnieniem
+    """
+    posts, tournament = _create_content(new_admin)
+    html = client.get("/search?q=mistrzostwach").data.decode("utf-8")
+    assert f"/tournament/{tournament.id}" in html and "<mark>Mistrzostwa</mark>" in html
+    assert "Brak wyników" in client.get("/search?q=xyzzy").data.decode("utf-8")
+    assert client.get("/search").status_code == 200